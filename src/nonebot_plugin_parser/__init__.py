@@ -8,8 +8,12 @@ require("nonebot_plugin_uninfo")
 
 from .utils import safe_unlink
 from .config import Config, pconfig
+from .metrics import METRICS
 from .matchers import clear_result_cache
 
+# 进程池在启动钩子中 fork, 需先于阻塞检测的看门狗线程启动
+from .loop_monitor import LOOP_MONITOR as LOOP_MONITOR
+
 __plugin_meta__ = PluginMetadata(
     name="链接分享解析 Alconna 版",
     description="通用媒体卡片渲染[B站|抖音|快手|微博|小红书|YouTube|TikTok|Twitter|AcFun|NGA]",
@@ -47,3 +51,8 @@ async def clean_plugin_cache():
 
     # 资源清理完毕后，清理 result 缓存
     clear_result_cache()
+
+
+@scheduler.scheduled_job("interval", minutes=10, id="parser-save-metrics")
+async def save_metrics():
+    await METRICS.save()
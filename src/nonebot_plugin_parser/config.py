@@ -1,11 +1,17 @@
+from typing import Any, Literal
 from pathlib import Path
 
 from nonebot import require, get_driver, get_plugin_config
 from pydantic import BaseModel
-from bilibili_api.video import VideoCodecs, VideoQuality
+from nonebot.compat import field_validator
 
 from .constants import PlatformEnum
 
+BiliVideoCode = Literal["avc", "hev", "av01"]
+"""B站视频编码, 对应 bilibili_api.video.VideoCodecs 的 AVC, HEV, AV1"""
+BiliVideoQuality = Literal[16, 32, 64, 80, 100, 112, 116, 120, 125, 126, 127]
+"""B站视频清晰度, 与 bilibili_api.video.VideoQuality 的取值一致"""
+
 require("nonebot_plugin_localstore")
 import nonebot_plugin_localstore as _store
 from nonebot.plugin import PluginMetadata
@@ -58,13 +64,9 @@ class Config(BaseModel):
     """禁用的解析器"""
     parser_blacklist_users: list[str] = []
     """黑名单用户列表，这些用户触发的解析将被忽略"""
-    parser_bili_video_codes: list[VideoCodecs] = [
-        VideoCodecs.AVC,
-        VideoCodecs.AV1,
-        VideoCodecs.HEV,
-    ]
+    parser_bili_video_codes: list[BiliVideoCode] = ["avc", "av01", "hev"]
     """B站视频编码"""
-    parser_bili_video_quality: VideoQuality = VideoQuality._1080P
+    parser_bili_video_quality: BiliVideoQuality = 80
     """B站视频清晰度"""
     parser_need_forward_contents: bool = True
     """是否需要转发原文内容"""
@@ -76,6 +78,26 @@ class Config(BaseModel):
     """触发延迟发送视频的表情ID列表，用于监听group_msg_emoji_like事件"""
     parser_delay_send_lazy_download: bool = False
     """是否开启懒下载模式，仅在用户请求时才下载视频"""
+    parser_ffmpeg_max_jobs: int = 0
+    """ffmpeg 最大并发任务数, 0 表示按 CPU 核数自动设置"""
+    parser_ffmpeg_timeout: float = 600.0
+    """单个 ffmpeg 任务超时时间，单位：秒"""
+    parser_ytdlp_workers: int = 2
+    """yt-dlp 工作进程数, 0 表示在线程中执行"""
+    parser_cpu_workers: int = 1
+    """HTML/JSON/protobuf 解析工作进程数, 0 表示在线程中执行"""
+    parser_metrics_path: str | None = None
+    """Prometheus 指标接口路径, 如 /parser/metrics, 为空时不开启"""
+    parser_loop_monitor_threshold: float = 0.0
+    """事件循环阻塞告警阈值, 单位: 秒, 0 表示不开启"""
+
+    @field_validator("parser_bili_video_quality", mode="before")
+    @classmethod
+    def _coerce_bili_video_quality(cls, value: Any) -> Any:
+        # 环境变量中加了引号的 "80" 也视为 80
+        if isinstance(value, str) and value.strip().isdigit():
+            return int(value)
+        return value
 
     @property
     def nickname(self) -> str:
@@ -113,12 +135,12 @@ class Config(BaseModel):
         return self.parser_disabled_platforms
 
     @property
-    def bili_video_codes(self) -> list[VideoCodecs]:
+    def bili_video_codes(self) -> list[BiliVideoCode]:
         """B站视频编码"""
         return self.parser_bili_video_codes
 
     @property
-    def bili_video_quality(self) -> VideoQuality:
+    def bili_video_quality(self) -> BiliVideoQuality:
         """B站视频清晰度"""
         return self.parser_bili_video_quality
 
@@ -222,6 +244,36 @@ class Config(BaseModel):
         """音频解析超时时间，单位：秒"""
         return self.parser_audio_timeout
 
+    @property
+    def ffmpeg_max_jobs(self) -> int:
+        """ffmpeg 最大并发任务数"""
+        return self.parser_ffmpeg_max_jobs
+
+    @property
+    def ffmpeg_timeout(self) -> float:
+        """单个 ffmpeg 任务超时时间，单位：秒"""
+        return self.parser_ffmpeg_timeout
+
+    @property
+    def ytdlp_workers(self) -> int:
+        """yt-dlp 工作进程数"""
+        return self.parser_ytdlp_workers
+
+    @property
+    def cpu_workers(self) -> int:
+        """HTML/JSON/protobuf 解析工作进程数"""
+        return self.parser_cpu_workers
+
+    @property
+    def metrics_path(self) -> str | None:
+        """Prometheus 指标接口路径"""
+        return self.parser_metrics_path
+
+    @property
+    def loop_monitor_threshold(self) -> float:
+        """事件循环阻塞告警阈值, 单位: 秒"""
+        return self.parser_loop_monitor_threshold
+
     @property
     def kugou_lzkey(self) -> str | None:
         """酷狗音乐API密钥"""
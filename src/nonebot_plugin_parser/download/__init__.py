@@ -1,18 +1,31 @@
 import os
+import errno
+import shutil
 import asyncio
 import hashlib
+import tempfile
+from typing import BinaryIO
 from pathlib import Path
+from contextlib import AsyncExitStack
+from collections.abc import Callable
 
 import aiofiles
-from httpx import HTTPError, AsyncClient
+from httpx import Response, HTTPError, AsyncClient
 from nonebot import logger
 from rich.progress import Progress, BarColumn, TimeElapsedColumn, TimeRemainingColumn
 
 from .task import auto_task
-from ..utils import merge_av, safe_unlink, generate_file_name
+from ..utils import fmt_size, merge_av, safe_unlink, generate_file_name, is_module_available
 from ..config import pconfig
+from ..ffmpeg import FFMPEG, FFmpegPriority
+from ..metrics import METRICS
 from ..constants import COMMON_HEADER, DOWNLOAD_TIMEOUT
-from ..exception import DownloadException, ZeroSizeException, SizeLimitException
+from ..exception import (
+    DownloadException,
+    ZeroSizeException,
+    SizeLimitException,
+    DownloadLimitException,
+)
 
 
 class StreamDownloader:
@@ -22,6 +35,8 @@ class StreamDownloader:
         self.headers: dict[str, str] = COMMON_HEADER.copy()
         self.cache_dir: Path = pconfig.cache_dir
         self.client: AsyncClient = AsyncClient(timeout=DOWNLOAD_TIMEOUT, verify=False)
+        self.active: int = 0
+        """进行中的下载数"""
 
     @auto_task
     async def streamd(
@@ -52,37 +67,41 @@ class StreamDownloader:
         file_path = self.cache_dir / file_name
         # 如果文件存在，则直接返回
         if file_path.exists():
+            METRICS.hit("media", True)
             return file_path
+        METRICS.hit("media", False)
 
         headers = {**self.headers, **(ext_headers or {})}
 
+        self.active += 1
+        try:
+            return await self._streamd(url, file_path, headers, max_retries)
+        finally:
+            self.active -= 1
+
+    async def _streamd(
+        self, url: str, file_path: Path, headers: dict[str, str], max_retries: int
+    ) -> Path:
+        file_name = original_file_name = file_path.name
         retry_count = 0
-        original_file_name = file_name
         while retry_count <= max_retries:
             try:
                 async with self.client.stream(
                     "GET", url, headers=headers, follow_redirects=True
                 ) as response:
                     response.raise_for_status()
-                    content_length = response.headers.get("Content-Length")
-                    content_length = int(content_length) if content_length else 0
-
-                    if content_length == 0:
-                        logger.warning(f"媒体 url: {url}, 大小为 0, 取消下载")
-                        raise ZeroSizeException
-
-                    if (file_size := content_length / 1024 / 1024) > pconfig.max_size:
-                        logger.warning(
-                            f"媒体 url: {url} 大小 {file_size:.2f} MB 超过 {pconfig.max_size} MB, 取消下载"
-                        )
-                        raise SizeLimitException
+                    content_length = self._check_content_length(url, response)
 
-                    with self.get_progress_bar(file_name, content_length) as bar:
+                    with (
+                        METRICS.span("download"),
+                        self.get_progress_bar(file_name, content_length) as bar,
+                    ):
                         task_id = bar.task_ids[0]
                         async with aiofiles.open(file_path, "wb") as file:
                             async for chunk in response.aiter_bytes(1024 * 1024):
                                 await file.write(chunk)
                                 bar.advance(task_id, len(chunk))
+                    METRICS.inc("download_bytes", content_length)
                     # 下载成功，跳出循环
                     break
             except (HTTPError, ConnectionError, TimeoutError, OSError) as e:
@@ -106,6 +125,31 @@ class StreamDownloader:
                 await asyncio.sleep(1 * retry_count)  # 指数退避
         return file_path
 
+    @staticmethod
+    def _check_content_length(url: str, response: Response) -> int:
+        """检查响应的 Content-Length 是否在配置限制内
+
+        Returns:
+            int: 媒体大小, 单位: 字节
+
+        Raises:
+            ZeroSizeException: 大小为 0
+            SizeLimitException: 超过配置的最大大小
+        """
+        content_length = response.headers.get("Content-Length")
+        content_length = int(content_length) if content_length else 0
+
+        if content_length == 0:
+            logger.warning(f"媒体 url: {url}, 大小为 0, 取消下载")
+            raise ZeroSizeException
+
+        if (file_size := content_length / 1024 / 1024) > pconfig.max_size:
+            logger.warning(
+                f"媒体 url: {url} 大小 {file_size:.2f} MB 超过 {pconfig.max_size} MB, 取消下载"
+            )
+            raise SizeLimitException
+        return content_length
+
     @staticmethod
     def get_progress_bar(desc: str, total: int | None = None) -> Progress:
         """获取进度条 bar
@@ -190,7 +234,10 @@ class StreamDownloader:
                 ts_headers["Referer"] = "https://www.taptap.cn/"
                 ts_headers["Origin"] = "https://www.taptap.cn"
 
-            with self.get_progress_bar(video_name, len(ts_urls) * 1024 * 1024) as bar:
+            with (
+                METRICS.span("download"),
+                self.get_progress_bar(video_name, len(ts_urls) * 1024 * 1024) as bar,
+            ):
                 task_id = bar.task_ids[0]
                 async with aiofiles.open(temp_ts_path, "wb") as f:
                     for ts_url in ts_urls:
@@ -216,6 +263,8 @@ class StreamDownloader:
                                 )
                                 await asyncio.sleep(1)
 
+            METRICS.inc("download_bytes", downloaded_bytes)
+
             # 3. 校验文件大小 (防止空文件送给 FFmpeg)
             if downloaded_bytes < 1024:
                 raise DownloadException(
@@ -223,7 +272,7 @@ class StreamDownloader:
                 )
 
             # 4. 转封装处理
-            if await self._has_ffmpeg():
+            if await FFMPEG.probe():
                 await self._remux_to_mp4(temp_ts_path, final_video_path)
             elif temp_ts_path.exists():
                 temp_ts_path.rename(final_video_path)
@@ -303,29 +352,19 @@ class StreamDownloader:
             raise DownloadException(f"请求失败: {resp.status_code}")
         return resp.text
 
-    async def _has_ffmpeg(self) -> bool:
-        try:
-            proc = await asyncio.create_subprocess_shell(
-                "ffmpeg -version",
-                stdout=asyncio.subprocess.DEVNULL,
-                stderr=asyncio.subprocess.DEVNULL,
-            )
-            await proc.communicate()
-            return proc.returncode == 0
-        except Exception:
-            return False
-
     async def _remux_to_mp4(self, input_path: Path, output_path: Path):
-        # 增加 -f mp4 强制格式，增加 probesize 防止开头数据分析失败
-        cmd = (
-            f'ffmpeg -y -v error -probesize 50M -analyzeduration 100M -i "{input_path}"'
-            f' -c copy -bsf:a aac_adtstoasc "{output_path}"'
+        # 增加 probesize 防止开头数据分析失败
+        args = ["-y", "-v", "error", "-probesize", "50M", "-analyzeduration", "100M"]
+        args += ["-i", str(input_path), "-c", "copy", "-bsf:a", "aac_adtstoasc", str(output_path)]
+        await FFMPEG.run(
+            args,
+            name=output_path.name,
+            priority=FFmpegPriority.HIGH,
+            output_path=output_path,
         )
-        proc = await asyncio.create_subprocess_shell(cmd)
-        await proc.communicate()
 
-        if output_path.exists() and input_path.exists():
-            os.remove(input_path)
+        if await asyncio.to_thread(output_path.exists):
+            await safe_unlink(input_path)
 
     @auto_task
     async def download_audio(
@@ -405,24 +444,259 @@ class StreamDownloader:
         a_url: str,
         *,
         output_path: Path,
+        audio_path: Path | None = None,
         ext_headers: dict[str, str] | None = None,
     ) -> Path:
-        """download video and audio file by url with stream and merge"""
+        """download video and audio file by url with stream and merge
+
+        Args:
+            v_url (str): video url
+            a_url (str): audio url
+            output_path (Path): merged video path
+            audio_path (Path | None): keep the audio stream at this path after merging.
+                Defaults to None, the audio file is deleted.
+            ext_headers (dict[str, str] | None): ext headers. Defaults to None.
+
+        Returns:
+            Path: merged video path
+        """
+        if await self._can_stream_merge():
+            try:
+                return await self._stream_merge(
+                    v_url,
+                    a_url,
+                    output_path=output_path,
+                    audio_path=audio_path,
+                    ext_headers=ext_headers,
+                )
+            except DownloadLimitException:
+                raise
+            except Exception as e:
+                logger.warning(f"流式合并失败, 回退为下载后合并: {e}")
+
+        audio_name = audio_path.name if audio_path else None
         v_path, a_path = await asyncio.gather(
             self.download_video(v_url, ext_headers=ext_headers),
-            self.download_audio(a_url, ext_headers=ext_headers),
+            self.download_audio(a_url, audio_name=audio_name, ext_headers=ext_headers),
+        )
+        await merge_av(
+            v_path=v_path,
+            a_path=a_path,
+            output_path=output_path,
+            keep_audio=audio_path is not None,
         )
-        await merge_av(v_path=v_path, a_path=a_path, output_path=output_path)
         return output_path
 
+    @staticmethod
+    async def _can_stream_merge() -> bool:
+        """当前平台是否支持通过命名管道将音视频流直接交给 ffmpeg"""
+        return hasattr(os, "mkfifo") and await FFMPEG.probe()
 
-DOWNLOADER: StreamDownloader = StreamDownloader()
+    async def _stream_merge(
+        self,
+        v_url: str,
+        a_url: str,
+        *,
+        output_path: Path,
+        audio_path: Path | None = None,
+        ext_headers: dict[str, str] | None = None,
+    ) -> Path:
+        """将音视频流经命名管道直接送入 ffmpeg 合并, 只写入最终文件
 
-try:
-    import yt_dlp as yt_dlp  # pyright: ignore[reportMissingModuleSource]
+        先写入临时目录中的 .part 文件, ffmpeg 成功退出后才移动到 output_path 和 audio_path,
+        其他请求不会读到未完成的文件
+
+        Args:
+            v_url (str): video url
+            a_url (str): audio url
+            output_path (Path): merged video path
+            audio_path (Path | None): also write the audio stream to this path. Defaults to None.
+            ext_headers (dict[str, str] | None): ext headers. Defaults to None.
+
+        Returns:
+            Path: merged video path
+        """
+        headers = {**self.headers, **(ext_headers or {})}
+        work_dir = Path(tempfile.mkdtemp(prefix="merge-", dir=self.cache_dir))
+        v_fifo, a_fifo = work_dir / "video", work_dir / "audio"
+        os.mkfifo(v_fifo)
+        os.mkfifo(a_fifo)
+        output_part = work_dir / f"{output_path.name}.part"
+        audio_part = work_dir / f"{audio_path.name}.part" if audio_path else None
+
+        self.active += 1
+        run_task: asyncio.Task[None] | None = None
+        writers: list[asyncio.Task[int]] = []
+        try:
+            # 先占用 ffmpeg 名额再建立连接, 排队期间不占用连接和管道
+            async with FFMPEG.slot(FFmpegPriority.HIGH), AsyncExitStack() as stack:
+                v_resp = await stack.enter_async_context(
+                    self.client.stream("GET", v_url, headers=headers, follow_redirects=True)
+                )
+                v_resp.raise_for_status()
+                a_resp = await stack.enter_async_context(
+                    self.client.stream("GET", a_url, headers=headers, follow_redirects=True)
+                )
+                a_resp.raise_for_status()
+                total = self._check_content_length(v_url, v_resp)
+                total += self._check_content_length(a_url, a_resp)
+
+                logger.info(f"Stream merging to {output_path.name}")
+                args = ["-y", "-v", "error", "-i", str(v_fifo), "-i", str(a_fifo)]
+                args += ["-c", "copy", "-map", "0:v:0", "-map", "1:a:0"]
+                args += ["-f", "mp4", str(output_part)]
+                run_task = asyncio.create_task(
+                    FFMPEG.run(
+                        args,
+                        name=output_path.name,
+                        priority=FFmpegPriority.HIGH,
+                        output_path=output_part,
+                        acquire=False,
+                    )
+                )
+
+                with (
+                    METRICS.span("download"),
+                    self.get_progress_bar(output_path.name, total) as bar,
+                ):
+                    task_id = bar.task_ids[0]
+
+                    def advance(size: int):
+                        bar.advance(task_id, size)
+
+                    writers = [
+                        asyncio.create_task(self._pipe_to_fifo(v_resp, v_fifo, run_task, advance)),
+                        asyncio.create_task(
+                            self._pipe_to_fifo(a_resp, a_fifo, run_task, advance, tee_path=audio_part)
+                        ),
+                    ]
+                    pending: set[asyncio.Task] = {*writers, run_task}
+                    while pending:
+                        done, pending = await asyncio.wait(
+                            pending, return_when=asyncio.FIRST_COMPLETED
+                        )
+                        if run_task in done:
+                            if not run_task.cancelled() and run_task.exception():
+                                # ffmpeg 出错退出, 停止下载
+                                for writer in writers:
+                                    writer.cancel()
+                        elif any(not t.cancelled() and t.exception() for t in done):
+                            # 下载出错, 取消 ffmpeg 任务
+                            run_task.cancel()
+
+                # ffmpeg 自身的错误优先于管道断开导致的写入错误
+                if not run_task.cancelled() and (exc := run_task.exception()):
+                    raise exc
+                for writer in writers:
+                    if not writer.cancelled() and (exc := writer.exception()):
+                        raise exc
+            METRICS.inc("download_bytes", sum(writer.result() for writer in writers))
+
+            if audio_path and audio_part:
+                os.replace(audio_part, audio_path)
+            os.replace(output_part, output_path)
+        finally:
+            self.active -= 1
+            if run_task is not None and not run_task.done():
+                run_task.cancel()
+                await asyncio.gather(run_task, return_exceptions=True)
+            for writer in writers:
+                writer.cancel()
+            await asyncio.gather(*writers, return_exceptions=True)
+            # 失败或取消时 .part 文件随临时目录一起删除
+            await asyncio.to_thread(shutil.rmtree, work_dir, True)
+
+        logger.success(f"Merged {output_path.name}, {fmt_size(output_path)}")
+        return output_path
+
+    @staticmethod
+    async def _pipe_to_fifo(
+        response: Response,
+        fifo_path: Path,
+        reader: asyncio.Task[None],
+        advance: Callable[[int], None],
+        *,
+        tee_path: Path | None = None,
+    ) -> int:
+        """将响应流写入命名管道, 可同时写入一份到 tee_path
+
+        管道以非阻塞方式打开并由事件循环写入, 不占用线程池
+
+        Args:
+            response (Response): 响应流
+            fifo_path (Path): 命名管道路径
+            reader (asyncio.Task[None]): 读取管道的 ffmpeg 任务, 结束后不再等待其打开管道
+            advance (Callable[[int], None]): 进度回调
+            tee_path (Path | None): 同时写入的文件路径. Defaults to None.
+
+        Returns:
+            int: 写入的字节数
+        """
+        # 没有读端时以 O_NONBLOCK 打开写端会返回 ENXIO, 轮询到 ffmpeg 打开读端为止
+        while (pipe := await asyncio.to_thread(StreamDownloader._open_fifo_writer, fifo_path)) is None:
+            if reader.done():
+                raise DownloadException("ffmpeg 已退出, 未读取管道")
+            await asyncio.sleep(0.05)
+
+        loop = asyncio.get_running_loop()
+        transport, protocol = await loop.connect_write_pipe(_PipeProtocol, pipe)
+        written = 0
+        try:
+            async with AsyncExitStack() as stack:
+                tee = await stack.enter_async_context(aiofiles.open(tee_path, "wb")) if tee_path else None
+                async for chunk in response.aiter_bytes(1024 * 1024):
+                    transport.write(chunk)
+                    if tee:
+                        await tee.write(chunk)
+                    await protocol.drain()
+                    written += len(chunk)
+                    advance(len(chunk))
+        finally:
+            transport.close()
+        return written
+
+    @staticmethod
+    def _open_fifo_writer(fifo_path: Path) -> BinaryIO | None:
+        """以非阻塞方式打开命名管道的写端, 读端尚未打开时返回 None"""
+        try:
+            fd = os.open(fifo_path, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError as e:
+            if e.errno != errno.ENXIO:
+                raise
+            return None
+        return open(fd, "wb", buffering=0)
+
+
+class _PipeProtocol(asyncio.BaseProtocol):
+    """命名管道写端的流量控制, 管道写满时暂停写入"""
+
+    def __init__(self):
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self._exc: BaseException | None = None
+
+    def pause_writing(self):
+        self._writable.clear()
+
+    def resume_writing(self):
+        self._writable.set()
+
+    def connection_lost(self, exc: Exception | None):
+        self._exc = exc or BrokenPipeError("管道已关闭")
+        self._writable.set()
+
+    async def drain(self):
+        """等待管道缓冲区可写, 读端关闭时抛出异常"""
+        await self._writable.wait()
+        if self._exc is not None:
+            raise self._exc
+
+
+DOWNLOADER: StreamDownloader = StreamDownloader()
 
+YTDLP_DOWNLOADER = None
+# 只检查 yt_dlp 是否安装, 在第一次下载时才导入
+if is_module_available("yt_dlp"):
     from .ytdlp import YtdlpDownloader
 
     YTDLP_DOWNLOADER = YtdlpDownloader()
-except ImportError:
-    YTDLP_DOWNLOADER = None
@@ -0,0 +1,99 @@
+"""头像缓存
+
+各平台的头像 URL 经常带签名或尺寸后缀, 按 URL 生成文件名无法命中缓存.
+这里按 (平台, 用户 id) 保存缩放后的头像, 尺寸按卡片模板中最大的头像 (64px)
+的两倍预先缩放, 渲染时无需再处理原图
+"""
+
+import time
+import asyncio
+from typing import ClassVar
+from asyncio import Task
+from pathlib import Path
+
+from PIL import Image, ImageOps
+from nonebot import logger
+
+from . import DOWNLOADER
+from ..utils import safe_unlink, keep_zh_en_num
+from ..config import pconfig
+from ..metrics import METRICS
+
+
+class AvatarStore:
+    """按 (平台, 用户 id) 缓存头像缩略图"""
+
+    SIZE: ClassVar[int] = 128
+    """缩略图边长, 单位: 像素"""
+    TTL: ClassVar[float] = 7 * 24 * 3600
+    """头像有效期, 过期后重新下载, 单位: 秒"""
+
+    def __init__(self):
+        # 定时清理只删除缓存目录下的文件, 不会删除子目录
+        self.avatar_dir: Path = pconfig.cache_dir / "avatars"
+        self._tasks: dict[Path, Task[Path]] = {}
+
+    def path(self, platform: str, user_id: str | int) -> Path:
+        return self.avatar_dir / platform / f"{keep_zh_en_num(str(user_id))}.webp"
+
+    def get(
+        self,
+        platform: str,
+        user_id: str | int,
+        url: str,
+        *,
+        ext_headers: dict[str, str] | None = None,
+    ) -> Path | Task[Path]:
+        """获取头像, 缓存有效时直接返回本地路径, 否则返回下载任务
+
+        Args:
+            platform (str): 平台名称
+            user_id (str | int): 用户 id
+            url (str): 头像 URL, 仅在缓存失效时使用
+            ext_headers (dict[str, str] | None): ext headers. Defaults to None.
+
+        Returns:
+            Path | Task[Path]: 头像路径或下载任务
+        """
+        avatar_path = self.path(platform, user_id)
+        try:
+            if time.time() - avatar_path.stat().st_mtime < self.TTL:
+                METRICS.hit("avatar", True)
+                return avatar_path
+        except FileNotFoundError:
+            pass
+        METRICS.hit("avatar", False)
+        # 同一用户并发解析时共用一个下载任务
+        if task := self._tasks.get(avatar_path):
+            return task
+        task = asyncio.create_task(self._download(url, avatar_path, ext_headers))
+        self._tasks[avatar_path] = task
+        task.add_done_callback(lambda _: self._tasks.pop(avatar_path, None))
+        return task
+
+    async def _download(
+        self, url: str, avatar_path: Path, ext_headers: dict[str, str] | None
+    ) -> Path:
+        raw_path = await DOWNLOADER.download_img(url, ext_headers=ext_headers)
+        try:
+            await asyncio.to_thread(self._thumbnail, raw_path, avatar_path)
+        except Exception as e:
+            # 无法识别的格式直接使用原图
+            logger.warning(f"头像缩放失败: {e}, url: {url}")
+            return raw_path
+        await safe_unlink(raw_path)
+        return avatar_path
+
+    @classmethod
+    def _thumbnail(cls, raw_path: Path, avatar_path: Path):
+        with Image.open(raw_path) as img:
+            img = ImageOps.fit(img.convert("RGBA"), (cls.SIZE, cls.SIZE))
+        avatar_path.parent.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再替换, 避免读到写了一半的头像
+        tmp_path = avatar_path.with_suffix(".tmp")
+        img.save(tmp_path, "WEBP", quality=85)
+        tmp_path.replace(avatar_path)
+
+
+AVATAR_STORE: AvatarStore = AvatarStore()
+"""全局头像缓存"""
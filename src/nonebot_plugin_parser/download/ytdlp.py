@@ -1,49 +1,51 @@
 import asyncio
-from typing import TYPE_CHECKING
+import itertools
+import threading
+import multiprocessing
+from typing import TYPE_CHECKING, Any, TypeVar, ClassVar
 from pathlib import Path
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-import yt_dlp  # pyright: ignore[reportMissingModuleSource]
-from msgspec import Struct, convert
+from msgspec import msgpack
+from nonebot import logger, get_driver
+from rich.progress import TaskID, Progress
 
+from . import ytdlp_worker
 from .task import auto_task
-from ..utils import LimitedSizeDict, generate_file_name
+from ..utils import TTLCache, generate_file_name
 from ..config import pconfig
 from ..exception import ParseException, DurationLimitException
+from .ytdlp_worker import VideoInfo as VideoInfo
 
+T = TypeVar("T")
 
-class VideoInfo(Struct):
-    title: str
-    """标题"""
-    channel: str
-    """频道名称"""
-    uploader: str
-    """上传者 id"""
-    duration: int
-    """时长"""
-    timestamp: int
-    """发布时间戳"""
-    thumbnail: str
-    """封面图片"""
-    description: str
-    """简介"""
-    channel_id: str
-    """频道 id"""
 
-    @property
-    def author_name(self) -> str:
-        return f"{self.channel}@{self.uploader}"
+class YtdlpDownloader:
+    """YtdlpDownloader class
 
+    yt-dlp 的提取和下载运行在独立的进程池中, 避免纯 Python 的提取过程占用 GIL
+    阻塞事件循环. 进程池在 nonebot 启动时创建; 平台不支持 fork, parser_ytdlp_workers 为 0
+    或进程池已损坏时退回线程执行
+    """
 
-class YtdlpDownloader:
-    """YtdlpDownloader class"""
+    INFO_TTL: ClassVar[float] = 1800
+    """视频信息缓存时间, 需短于直链有效期, 单位: 秒"""
+    INFO_CACHE_BYTES: ClassVar[int] = 32 * 1024 * 1024
+    """视频信息缓存总大小, 单位: 字节"""
 
     def __init__(self):
         if TYPE_CHECKING:
             from yt_dlp import _Params  # pyright: ignore[reportMissingModuleSource]
 
-        self._video_info_mapping = LimitedSizeDict[str, VideoInfo]()
+        # url -> (VideoInfo, 编码后的 info_dict), 下载时复用 info_dict 避免重复提取
+        self._video_info_mapping = TTLCache[str, tuple[VideoInfo, bytes]](
+            self.INFO_TTL,
+            max_bytes=self.INFO_CACHE_BYTES,
+            sizeof=lambda item: len(item[1]),
+        )
         self._extract_base_opts: _Params = {
-            "quiet": True,
             "skip_download": "1",
             "force_generic_extractor": True,
         }
@@ -52,6 +54,120 @@ class YtdlpDownloader:
             self._download_base_opts["proxy"] = proxy
             self._extract_base_opts["proxy"] = proxy
 
+        self._max_workers: int = pconfig.ytdlp_workers
+        if "fork" not in multiprocessing.get_all_start_methods():
+            # spawn 方式会在子进程中重新导入插件包, 无法在 nonebot 之外初始化
+            self._max_workers = 0
+        self._pool: ProcessPoolExecutor | None = None
+        self._progress_queue: multiprocessing.SimpleQueue | None = None
+        self._progress_bars: dict[int, tuple[Progress, TaskID]] = {}
+        self._job_ids = itertools.count(1)
+        # 在线程中执行时, 下载进度直接更新进度条
+        ytdlp_worker.set_progress_reporter(self._update_progress)
+        get_driver().on_startup(self.start)
+        get_driver().on_shutdown(self.shutdown)
+
+    @property
+    def info_cache_size(self) -> int:
+        """已缓存的视频信息条数"""
+        return len(self._video_info_mapping)
+
+    @property
+    def info_cache_bytes(self) -> int:
+        """已缓存的视频信息占用的字节数"""
+        return self._video_info_mapping.nbytes
+
+    async def start(self):
+        """启动进程池并拉起全部工作进程
+
+        与 CPU 任务进程池一样只在启动阶段 fork, 避免工作进程继承运行期间打开的命名管道
+        """
+        if self._max_workers <= 0 or self._pool is not None:
+            return
+        ctx = multiprocessing.get_context("fork")
+        self._progress_queue = ctx.SimpleQueue()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self._max_workers,
+            mp_context=ctx,
+            initializer=ytdlp_worker.init_worker,
+            initargs=(self._progress_queue,),
+        )
+        try:
+            await asyncio.wrap_future(self._pool.submit(ytdlp_worker.ping))
+        except BrokenProcessPool:
+            logger.warning("yt-dlp 进程池启动失败, 改为在线程中执行")
+            self.shutdown()
+            return
+        threading.Thread(
+            target=self._pump_progress,
+            args=(self._progress_queue,),
+            name="ytdlp-progress",
+            daemon=True,
+        ).start()
+        logger.info(f"yt-dlp 进程池已启动, 工作进程数: {self._max_workers}")
+
+    def _pump_progress(self, queue: multiprocessing.SimpleQueue):
+        """读取工作进程上报的进度并更新进度条"""
+        while (message := queue.get()) is not None:
+            self._update_progress(message)
+
+    def _update_progress(self, message: ytdlp_worker.ProgressMessage):
+        job_id, downloaded, total = message
+        if item := self._progress_bars.get(job_id):
+            bar, task_id = item
+            bar.update(task_id, completed=downloaded, total=total)
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        if self._pool is None:
+            return await asyncio.to_thread(func, *args)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._pool, func, *args)
+        except BrokenProcessPool as e:
+            # 工作进程异常退出, 运行期间不再 fork, 之后的任务都在线程中执行
+            logger.warning("yt-dlp 工作进程异常退出, 后续任务改为在线程中执行")
+            self.shutdown()
+            raise ParseException("yt-dlp 工作进程异常退出") from e
+
+    def shutdown(self):
+        """关闭进程池"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._progress_queue is not None:
+            self._progress_queue.put(None)
+            self._progress_queue = None
+
+    async def _download(
+        self,
+        kind: str,
+        url: str,
+        *,
+        output_path: Path,
+        outtmpl: str,
+        format: str | None = None,
+        opts: dict[str, Any],
+        info: bytes | None = None,
+    ):
+        from . import StreamDownloader
+
+        job_id = next(self._job_ids)
+        with StreamDownloader.get_progress_bar(output_path.name) as bar:
+            self._progress_bars[job_id] = (bar, bar.task_ids[0])
+            try:
+                await self._run(
+                    ytdlp_worker.download,
+                    kind,
+                    url,
+                    opts,
+                    outtmpl,
+                    format,
+                    job_id,
+                    info,
+                )
+            finally:
+                del self._progress_bars[job_id]
+
     async def extract_video_info(
         self, url: str, cookiefile: Path | None = None
     ) -> VideoInfo:
@@ -64,22 +180,26 @@ class YtdlpDownloader:
         Returns:
             dict[str, str]: video info
         """
-        video_info = self._video_info_mapping.get(url, None)
-        if video_info:
-            return video_info
-        ydl_opts = self._extract_base_opts.copy()
+        video_info, _ = await self._extract(url, cookiefile)
+        return video_info
+
+    async def _extract(
+        self, url: str, cookiefile: Path | None = None
+    ) -> tuple[VideoInfo, bytes]:
+        if item := self._video_info_mapping.get(url):
+            return item
+        ydl_opts = dict(self._extract_base_opts)
 
         if cookiefile:
             ydl_opts["cookiefile"] = str(cookiefile)
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info_dict = await asyncio.to_thread(ydl.extract_info, url, download=False)
-            if not info_dict:
-                raise ParseException("获取视频信息失败")
+        info = await self._run(ytdlp_worker.extract_info, url, ydl_opts)
+        if info is None:
+            raise ParseException("获取视频信息失败")
 
-        video_info = convert(info_dict, VideoInfo)
-        self._video_info_mapping[url] = video_info
-        return video_info
+        item = (msgpack.decode(info, type=VideoInfo), info)
+        self._video_info_mapping.set(url, item)
+        return item
 
     @auto_task
     async def download_video(self, url: str, cookiefile: Path | None = None) -> Path:
@@ -92,7 +212,7 @@ class YtdlpDownloader:
         Returns:
             Path: video file path
         """
-        video_info = await self.extract_video_info(url, cookiefile)
+        video_info, info = await self._extract(url, cookiefile)
         duration = video_info.duration
         if duration > pconfig.duration_maximum:
             raise DurationLimitException
@@ -104,21 +224,22 @@ class YtdlpDownloader:
         # 确保缓存目录存在
         pconfig.cache_dir.mkdir(parents=True, exist_ok=True)
 
-        ydl_opts = self._download_base_opts.copy()
-        ydl_opts["outtmpl"] = str(video_path)
-        ydl_opts["merge_output_format"] = "mp4"
-        ydl_opts["format"] = (
-            f"bv[filesize<={duration // 10 + 10}M]+ba/b[filesize<={duration // 8 + 10}M]"
-        )
-        ydl_opts["postprocessors"] = [
-            {"key": "FFmpegVideoConvertor", "preferedformat": "mp4"}
-        ]
-
+        ydl_opts = dict(self._download_base_opts)
         if cookiefile:
             ydl_opts["cookiefile"] = str(cookiefile)
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            await asyncio.to_thread(ydl.download, [url])
+        format = (
+            f"bv[filesize<={duration // 10 + 10}M]+ba/b[filesize<={duration // 8 + 10}M]"
+        )
+        await self._download(
+            "video",
+            url,
+            output_path=video_path,
+            outtmpl=str(video_path),
+            format=format,
+            opts=ydl_opts,
+            info=info,
+        )
         return video_path
 
     @auto_task
@@ -140,19 +261,18 @@ class YtdlpDownloader:
         # 确保缓存目录存在
         pconfig.cache_dir.mkdir(parents=True, exist_ok=True)
 
-        ydl_opts = self._download_base_opts.copy()
-        ydl_opts["outtmpl"] = f"{pconfig.cache_dir / file_name}.%(ext)s"
-        ydl_opts["format"] = "bestaudio/best"
-        ydl_opts["postprocessors"] = [
-            {
-                "key": "FFmpegExtractAudio",
-                "preferredcodec": "flac",
-                "preferredquality": "0",
-            }
-        ]
-
+        ydl_opts = dict(self._download_base_opts)
         if cookiefile:
             ydl_opts["cookiefile"] = str(cookiefile)
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            await asyncio.to_thread(ydl.download, [url])
+
+        # 已解析过的链接直接复用视频信息
+        item = self._video_info_mapping.get(url)
+        await self._download(
+            "audio",
+            url,
+            output_path=audio_path,
+            outtmpl=f"{pconfig.cache_dir / file_name}.%(ext)s",
+            opts=ydl_opts,
+            info=item[1] if item else None,
+        )
         return audio_path
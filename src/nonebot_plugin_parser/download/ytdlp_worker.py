@@ -0,0 +1,184 @@
+"""yt-dlp 工作进程
+
+本模块在 yt-dlp 进程池的工作进程中执行, 只依赖 yt_dlp 和 msgspec,
+不能导入任何 nonebot 相关模块. 未启用进程池时也会直接在线程中调用
+"""
+
+import signal
+import threading
+from typing import TYPE_CHECKING, Any
+from collections.abc import Callable
+from multiprocessing.queues import SimpleQueue
+
+from msgspec import Struct, convert, msgpack
+
+if TYPE_CHECKING:
+    # yt_dlp 导入较慢, 在第一次创建实例时才导入
+    import yt_dlp  # pyright: ignore[reportMissingModuleSource]
+
+
+class VideoInfo(Struct):
+    title: str
+    """标题"""
+    channel: str
+    """频道名称"""
+    uploader: str
+    """上传者 id"""
+    duration: int
+    """时长"""
+    timestamp: int
+    """发布时间戳"""
+    thumbnail: str
+    """封面图片"""
+    description: str
+    """简介"""
+    channel_id: str
+    """频道 id"""
+
+    @property
+    def author_name(self) -> str:
+        return f"{self.channel}@{self.uploader}"
+
+
+ProgressMessage = tuple[int, int, int | None]
+"""进度消息 (job_id, 已下载字节数, 总字节数)"""
+
+_report_progress: Callable[[ProgressMessage], None] | None = None
+_current_job = threading.local()
+_instances: dict[tuple, tuple["yt_dlp.YoutubeDL", threading.Lock]] = {}
+_instances_lock = threading.Lock()
+
+
+def init_worker(progress_queue: "SimpleQueue[ProgressMessage | None] | None"):
+    """进程池初始化函数, 进度经队列发回父进程, 由父进程处理 Ctrl+C"""
+    set_progress_reporter(progress_queue.put if progress_queue else None)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def set_progress_reporter(report: Callable[[ProgressMessage], None] | None):
+    """设置进度上报函数, 在线程中执行时由父进程直接传入更新进度条的回调"""
+    global _report_progress
+    _report_progress = report
+
+
+def ping():
+    """空任务, 用于在启动阶段拉起工作进程"""
+
+
+def _progress_hook(status: dict[str, Any]):
+    job_id: int | None = getattr(_current_job, "job_id", None)
+    if job_id is None or _report_progress is None:
+        return
+    if status.get("status") not in ("downloading", "finished"):
+        return
+    downloaded = status.get("downloaded_bytes") or 0
+    total = status.get("total_bytes") or status.get("total_bytes_estimate")
+    # 每 1 MB 或完成时上报一次, 避免 IPC 过于频繁
+    last = getattr(_current_job, "reported", -1)
+    if status["status"] == "downloading" and downloaded - last < 1 << 20:
+        return
+    _current_job.reported = downloaded
+    _report_progress((job_id, downloaded, int(total) if total else None))
+
+
+def _get_ydl(kind: str, opts: dict[str, Any]) -> tuple["yt_dlp.YoutubeDL", threading.Lock]:
+    """获取常驻的 YoutubeDL 实例, 按用途和选项 (cookiefile, proxy 等) 区分
+
+    提取器在首次使用后保持初始化状态, 后续调用无需重复加载
+    """
+    key = (kind, tuple(sorted(opts.items())))
+    with _instances_lock:
+        if (item := _instances.get(key)) is None:
+            import yt_dlp  # pyright: ignore[reportMissingModuleSource]
+
+            params: dict[str, Any] = {"quiet": True, "noprogress": True, **opts}
+            if kind == "video":
+                params["merge_output_format"] = "mp4"
+                params["postprocessors"] = [
+                    {"key": "FFmpegVideoConvertor", "preferedformat": "mp4"}
+                ]
+            elif kind == "audio":
+                params["format"] = "bestaudio/best"
+                params["postprocessors"] = [
+                    {
+                        "key": "FFmpegExtractAudio",
+                        "preferredcodec": "flac",
+                        "preferredquality": "0",
+                    }
+                ]
+            ydl = yt_dlp.YoutubeDL(params)  # pyright: ignore[reportArgumentType]
+            if kind != "extract":
+                ydl.add_progress_hook(_progress_hook)
+            item = _instances[key] = (ydl, threading.Lock())
+        return item
+
+
+_DROP_KEYS = ("automatic_captions", "subtitles", "heatmap", "thumbnails")
+"""下载时用不到且体积较大的字段"""
+
+
+def extract_info(url: str, opts: dict[str, Any]) -> bytes | None:
+    """提取视频信息
+
+    Returns:
+        bytes | None: msgpack 编码的精简 info_dict, 可直接解码为 VideoInfo,
+            也可传回 download 复用, 提取失败时为 None
+    """
+    ydl, lock = _get_ydl("extract", opts)
+    with lock:
+        info_dict = ydl.extract_info(url, download=False)
+    if not info_dict:
+        return None
+    info_dict = ydl.sanitize_info(info_dict, remove_private_keys=True)
+    for key in _DROP_KEYS:
+        info_dict.pop(key, None)
+    # 提前校验, 字段缺失时在这里报错
+    convert(info_dict, VideoInfo)
+    return msgpack.encode(info_dict)
+
+
+def download(
+    kind: str,
+    url: str,
+    opts: dict[str, Any],
+    outtmpl: str,
+    format: str | None = None,
+    job_id: int | None = None,
+    info: bytes | None = None,
+):
+    """下载视频或音频
+
+    Args:
+        kind (str): video 或 audio
+        url (str): url
+        opts (dict[str, Any]): 基础选项, 用于区分常驻实例
+        outtmpl (str): 输出路径模板
+        format (str | None): 格式选择, 为 None 时使用实例默认值. Defaults to None.
+        job_id (int | None): 任务 id, 用于上报进度. Defaults to None.
+        info (bytes | None): extract_info 的结果, 提供时直接在本地选择格式下载,
+            不再重新提取. Defaults to None.
+    """
+    from yt_dlp.utils import DownloadError, ReExtractInfo  # pyright: ignore[reportMissingModuleSource]
+
+    ydl, lock = _get_ydl(kind, opts)
+    with lock:
+        # outtmpl 和 format 随每次下载变化, 其余状态 (提取器, 后处理器) 保持复用
+        ydl.params["outtmpl"]["default"] = outtmpl  # pyright: ignore[reportIndexIssue]
+        if format is not None:
+            ydl.format_selector = ydl.build_format_selector(format)
+        _current_job.job_id = job_id
+        _current_job.reported = -1
+        try:
+            if info is None:
+                ydl.download([url])
+                return
+            info_dict = msgpack.decode(info)
+            try:
+                # 同 yt-dlp 的 --load-info-json
+                ydl.process_ie_result(info_dict, download=True)
+            except (DownloadError, ReExtractInfo) as e:
+                # 直链过期等情况, 退回重新提取
+                ydl.report_warning(f"复用视频信息下载失败: {e}, 重新提取")
+                ydl.download([info_dict.get("webpage_url") or url])
+        finally:
+            _current_job.job_id = None
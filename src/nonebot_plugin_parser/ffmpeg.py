@@ -0,0 +1,277 @@
+"""ffmpeg 任务管理
+
+启动时探测一次 ffmpeg 及其编码器, 之后所有 ffmpeg 任务都以 exec 方式执行,
+并由按 CPU 核数设定的优先级信号量限制并发
+"""
+
+import os
+import time
+import heapq
+import shutil
+import asyncio
+import itertools
+from enum import IntEnum
+from pathlib import Path
+from contextlib import asynccontextmanager
+from collections import deque
+from dataclasses import dataclass
+from collections.abc import AsyncIterator
+
+from nonebot import logger, get_driver
+
+from .config import pconfig
+from .metrics import METRICS
+
+
+class FFmpegPriority(IntEnum):
+    """任务优先级, 数值越小越先执行"""
+
+    HIGH = 0
+    """转封装/流复制等轻量任务, 用户正在等待结果"""
+    NORMAL = 1
+    """普通任务"""
+    LOW = 2
+    """重新编码等重 CPU 任务"""
+
+
+@dataclass(slots=True)
+class FFmpegJobMetric:
+    """单个 ffmpeg 任务的执行指标"""
+
+    name: str
+    """任务名称"""
+    priority: FFmpegPriority
+    """优先级"""
+    wait_time: float
+    """排队耗时, 单位: 秒"""
+    duration: float
+    """执行耗时, 单位: 秒"""
+    output_size: int
+    """输出文件大小, 单位: 字节"""
+    returncode: int | None
+    """退出码, 超时或取消时为 None"""
+
+
+class _PrioritySemaphore:
+    """按优先级唤醒等待者的信号量, 同优先级先到先得"""
+
+    def __init__(self, value: int):
+        self._value = value
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for *_, fut in self._waiters if not fut.done())
+
+    async def acquire(self, priority: int):
+        if self._value > 0 and not self.waiting:
+            self._value -= 1
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            # 已经分配到名额但在恢复前被取消, 归还名额
+            if fut.done() and not fut.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        while self._waiters:
+            *_, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self._value += 1
+
+
+class FFmpegService:
+    """ffmpeg 任务管理器"""
+
+    def __init__(self, max_jobs: int = 0, timeout: float = 600.0):
+        if max_jobs <= 0:
+            max_jobs = max(1, (os.cpu_count() or 2) // 2)
+        self.max_jobs: int = max_jobs
+        self.timeout: float = timeout
+        self.binary: str | None = None
+        self.encoders: set[str] = set()
+        self.metrics: deque[FFmpegJobMetric] = deque(maxlen=100)
+        self.running: int = 0
+        self._semaphore = _PrioritySemaphore(max_jobs)
+        self._probed: bool = False
+        self._probe_lock = asyncio.Lock()
+
+    @property
+    def available(self) -> bool:
+        """ffmpeg 是否可用, 需要先调用 probe"""
+        return self.binary is not None
+
+    @property
+    def queued(self) -> int:
+        """排队中的任务数"""
+        return self._semaphore.waiting
+
+    def has_encoder(self, name: str) -> bool:
+        """是否支持指定编码器, 如 libx264"""
+        return name in self.encoders
+
+    async def probe(self) -> bool:
+        """探测 ffmpeg 可执行文件及编码器, 只执行一次
+
+        Returns:
+            bool: ffmpeg 是否可用
+        """
+        async with self._probe_lock:
+            if self._probed:
+                return self.available
+            self._probed = True
+
+            if (binary := shutil.which("ffmpeg")) is None:
+                logger.warning("未找到 ffmpeg, 音视频合并和转码功能不可用")
+                return False
+
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    binary,
+                    "-hide_banner",
+                    "-encoders",
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL,
+                )
+                stdout, _ = await asyncio.wait_for(proc.communicate(), 10)
+            except (OSError, asyncio.TimeoutError) as e:
+                logger.warning(f"ffmpeg 探测失败: {e}")
+                return False
+            if proc.returncode != 0:
+                logger.warning(f"ffmpeg 探测失败, 退出码: {proc.returncode}")
+                return False
+
+            # 编码器列表形如 " V....D libx264   libx264 H.264 / AVC / MPEG-4 AVC"
+            for line in stdout.decode(errors="ignore").splitlines():
+                parts = line.split()
+                if len(parts) >= 2 and len(parts[0]) == 6 and parts[0][0] in "VAS":
+                    self.encoders.add(parts[1])
+            self.binary = binary
+            logger.info(
+                f"ffmpeg: {binary}, 编码器 {len(self.encoders)} 个, 最大并发任务数 {self.max_jobs}"
+            )
+            return True
+
+    @asynccontextmanager
+    async def slot(self, priority: FFmpegPriority = FFmpegPriority.NORMAL) -> AsyncIterator[float]:
+        """占用一个并发名额
+
+        通过命名管道输入等需要在 ffmpeg 启动前准备输入的任务, 应先占用名额再准备,
+        之后以 acquire=False 调用 run, 避免输入方在 ffmpeg 排队期间空等
+
+        Yields:
+            float: 排队耗时, 单位: 秒
+        """
+        queued_at = time.perf_counter()
+        await self._semaphore.acquire(priority)
+        self.running += 1
+        try:
+            yield time.perf_counter() - queued_at
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+    async def run(
+        self,
+        args: list[str],
+        *,
+        name: str = "ffmpeg",
+        priority: FFmpegPriority = FFmpegPriority.NORMAL,
+        timeout: float | None = None,
+        output_path: Path | None = None,
+        acquire: bool = True,
+    ) -> None:
+        """执行 ffmpeg 任务
+
+        Args:
+            args (list[str]): ffmpeg 参数, 不含可执行文件
+            name (str): 任务名称, 用于日志和指标. Defaults to "ffmpeg".
+            priority (FFmpegPriority): 优先级. Defaults to NORMAL.
+            timeout (float | None): 执行超时, 单位: 秒. Defaults to self.timeout.
+            output_path (Path | None): 输出文件, 用于统计输出大小. Defaults to None.
+            acquire (bool): 是否占用并发名额, 为 False 时调用方需已通过 slot 占用. Defaults to True.
+
+        Raises:
+            RuntimeError: ffmpeg 不可用, 执行失败或超时
+        """
+        if not await self.probe():
+            raise RuntimeError("ffmpeg 未安装或无法找到可执行文件")
+        if not acquire:
+            await self._exec(args, name, priority, 0.0, timeout, output_path)
+            return
+        async with self.slot(priority) as wait_time:
+            await self._exec(args, name, priority, wait_time, timeout, output_path)
+
+    async def _exec(
+        self,
+        args: list[str],
+        name: str,
+        priority: FFmpegPriority,
+        wait_time: float,
+        timeout: float | None,
+        output_path: Path | None,
+    ) -> None:
+        assert self.binary is not None
+
+        started_at = time.perf_counter()
+        returncode: int | None = None
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                self.binary,
+                *args,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            try:
+                _, stderr = await asyncio.wait_for(proc.communicate(), timeout or self.timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+                if isinstance(e, asyncio.TimeoutError):
+                    raise RuntimeError(f"ffmpeg 执行超时: {name}") from e
+                raise
+            returncode = proc.returncode
+            if returncode != 0:
+                raise RuntimeError(f"ffmpeg 执行失败: {stderr.decode(errors='ignore').strip()}")
+        finally:
+            finished_at = time.perf_counter()
+            output_size = await asyncio.to_thread(self._file_size, output_path) if output_path else 0
+            metric = FFmpegJobMetric(
+                name=name,
+                priority=priority,
+                wait_time=wait_time,
+                duration=finished_at - started_at,
+                output_size=output_size,
+                returncode=returncode,
+            )
+            self.metrics.append(metric)
+            METRICS.observe("ffmpeg_wait", metric.wait_time)
+            METRICS.observe("ffmpeg", metric.duration)
+            logger.debug(
+                f"ffmpeg 任务 {name}: 排队 {metric.wait_time:.2f}s, 执行 {metric.duration:.2f}s, "
+                f"输出 {output_size / 1024 / 1024:.2f} MB, 退出码 {returncode}"
+            )
+
+    @staticmethod
+    def _file_size(path: Path) -> int:
+        """输出文件大小, 文件不存在时为 0"""
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+
+FFMPEG: FFmpegService = FFmpegService(pconfig.ffmpeg_max_jobs, pconfig.ffmpeg_timeout)
+"""全局 ffmpeg 任务管理器"""
+
+get_driver().on_startup(FFMPEG.probe)
@@ -0,0 +1,111 @@
+"""事件循环阻塞检测
+
+心跳协程定时记录调度延迟, 看门狗线程发现心跳停滞超过阈值时,
+抓取事件循环线程当前的调用栈并关联到正在执行的解析 trace, 输出到日志
+"""
+
+import sys
+import time
+import asyncio
+import threading
+import traceback
+from typing import Any, ClassVar
+from collections.abc import Coroutine
+
+from nonebot import logger, get_driver
+
+from .config import pconfig
+from .metrics import METRICS, _task_traces, _current_trace
+
+
+class LoopMonitor:
+    """事件循环阻塞检测器"""
+
+    MAX_INTERVAL: ClassVar[float] = 0.1
+    """最大心跳间隔, 单位: 秒"""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.interval = min(threshold / 2, self.MAX_INTERVAL)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread_id: int = 0
+        self._heartbeat_task: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop_event = threading.Event()
+        self._last_beat: float = time.monotonic()
+        self._beats: int = 0
+        self._reported: int = -1
+        self._previous_factory: Any = None
+
+    def _task_factory(
+        self, loop: asyncio.AbstractEventLoop, coro: Coroutine[Any, Any, Any], **kwargs: Any
+    ):
+        # 在创建者的上下文中执行, 记录任务所属的 trace, 供看门狗线程读取;
+        # 开启 trace 的任务本身由 METRICS.trace 记录
+        if self._previous_factory is not None:
+            task = self._previous_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        if (trace := _current_trace.get()) is not None:
+            _task_traces[task] = trace
+        return task
+
+    async def start(self):
+        loop = self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._previous_factory = loop.get_task_factory()
+        loop.set_task_factory(self._task_factory)  # pyright: ignore[reportArgumentType]
+        self._last_beat = time.monotonic()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="parser-loop-monitor", daemon=True)
+        self._watchdog.start()
+        logger.info(f"事件循环阻塞检测已开启, 阈值 {self.threshold}s")
+
+    async def stop(self):
+        self._stop_event.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+        if self._loop is not None:
+            self._loop.set_task_factory(self._previous_factory)
+
+    async def _heartbeat(self):
+        while True:
+            started_at = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self._last_beat = now = time.monotonic()
+            self._beats += 1
+            lag = max(now - started_at - self.interval, 0)
+            METRICS.observe("loop_lag", lag, platform="")
+            if lag > self.threshold:
+                logger.warning(f"事件循环阻塞 {lag:.3f}s")
+
+    def _watch(self):
+        while not self._stop_event.wait(self.interval):
+            stalled = time.monotonic() - self._last_beat - self.interval
+            # 每次停滞只报告一次
+            if stalled <= self.threshold or self._reported == self._beats:
+                continue
+            self._reported = self._beats
+            self._report(stalled)
+
+    def _report(self, stalled: float):
+        frame = sys._current_frames().get(self._thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame else ""
+        task = asyncio.current_task(self._loop) if self._loop else None
+        trace = _task_traces.get(task) if task is not None else None
+        platform = trace.platform if trace else ""
+        METRICS.inc("loop_blocks", platform=platform)
+        where = f"[{trace.trace_id}] {trace.url}" if trace else "无关联解析"
+        task_name = task.get_name() if task is not None else "-"
+        logger.warning(
+            f"事件循环已阻塞 {stalled:.3f}s, {where}, 任务: {task_name}, 调用栈:\n{stack}"
+        )
+
+
+LOOP_MONITOR: LoopMonitor | None = None
+"""全局事件循环阻塞检测器, 未开启时为 None"""
+
+if pconfig.loop_monitor_threshold > 0:
+    LOOP_MONITOR = LoopMonitor(pconfig.loop_monitor_threshold)
+    get_driver().on_startup(LOOP_MONITOR.start)
+    get_driver().on_shutdown(LOOP_MONITOR.stop)
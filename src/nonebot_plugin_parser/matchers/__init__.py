@@ -1,5 +1,5 @@
 import re
-from typing import TypeVar
+from typing import TypeVar, cast
 from pathlib import Path
 
 from nonebot import logger, get_driver, on_command
@@ -7,52 +7,63 @@ from nonebot.params import CommandArg
 from nonebot.adapters import Message
 
 from .rule import SUPER_PRIVATE, Searched, SearchResult, on_keyword_regex
+from .stats import build_stats
 from ..utils import LimitedSizeDict
 from ..config import pconfig
 from ..helper import UniHelper, UniMessage
-from ..parsers import BaseParser, ParseResult, BilibiliParser
+from ..metrics import METRICS
+from ..parsers import BaseParser, ParseResult
 from ..renders import get_renderer
-from ..download import DOWNLOADER
 from ..parsers.data import AudioContent, VideoContent
+from ..parsers.manifest import MANIFEST, ParserEntry, get_entry, load_parser_class
 
 
-def _get_enabled_parser_classes() -> list[type[BaseParser]]:
+def _get_enabled_entries() -> list[ParserEntry]:
     disabled_platforms = set(pconfig.disabled_platforms)
-    all_subclass = BaseParser.get_all_subclass()
     return [
-        _cls for _cls in all_subclass if _cls.platform.name not in disabled_platforms
+        entry
+        for entry in MANIFEST
+        if entry.platform.name not in disabled_platforms and entry.available
     ]
 
 
-# 关键词 -> Parser 映射
-KEYWORD_PARSER_MAP: dict[str, BaseParser] = {}
+# 关键词 -> 清单项 映射
+KEYWORD_ENTRY_MAP: dict[str, ParserEntry] = {}
+# 类名 -> Parser 实例, 解析器模块在第一次匹配时导入
+_PARSERS: dict[str, BaseParser] = {}
 T = TypeVar("T", bound=BaseParser)
 
 
+def _load_parser(entry: ParserEntry) -> BaseParser:
+    if (parser := _PARSERS.get(entry.class_name)) is None:
+        with METRICS.span("load_parser", entry.platform.name):
+            parser = _PARSERS[entry.class_name] = load_parser_class(entry)()
+        logger.debug(f"已加载解析器: {entry.class_name}")
+    return parser
+
+
 def get_parser(keyword: str) -> BaseParser:
-    return KEYWORD_PARSER_MAP[keyword]
+    return _load_parser(KEYWORD_ENTRY_MAP[keyword])
 
 
 def get_parser_by_type(parser_type: type[T]) -> T:
-    for parser in KEYWORD_PARSER_MAP.values():
-        if isinstance(parser, parser_type):
-            return parser
-    raise ValueError(f"未找到类型为 {parser_type} 的 parser 实例")
+    entry = get_entry(parser_type.__name__)
+    if entry not in KEYWORD_ENTRY_MAP.values():
+        raise ValueError(f"未找到类型为 {parser_type} 的 parser 实例")
+    return cast(T, _load_parser(entry))
 
 
 @get_driver().on_startup
 def register_parser_matcher():
-    enabled_classes = _get_enabled_parser_classes()
-
-    enabled_platforms = []
-    for _cls in enabled_classes:
-        parser = _cls()
-        enabled_platforms.append(parser.platform.display_name)
-        for keyword, _ in _cls._key_patterns:
-            KEYWORD_PARSER_MAP[keyword] = parser
+    enabled_entries = _get_enabled_entries()
+
+    for entry in enabled_entries:
+        for keyword, _ in entry.key_patterns:
+            KEYWORD_ENTRY_MAP[keyword] = entry
+    enabled_platforms = [entry.platform.display_name for entry in enabled_entries]
     logger.info(f"启用平台: {', '.join(sorted(enabled_platforms))}")
 
-    patterns = [p for _cls in enabled_classes for p in _cls._key_patterns]
+    patterns = [p for entry in enabled_entries for p in entry.key_patterns]
     matcher = on_keyword_regex(*patterns)
     matcher.append_handler(parser_handler)
 
@@ -73,14 +84,22 @@ async def parser_handler(
     sr: SearchResult = Searched(),
 ):
     """统一的解析处理器"""
+    parser = get_parser(sr.keyword)
+    with METRICS.trace(parser.platform.name, sr.searched.group(0)):
+        METRICS.observe("match", sr.match_seconds)
+        await _parse_and_send(parser, sr)
+
+
+async def _parse_and_send(parser: BaseParser, sr: SearchResult):
     # 1. 获取缓存结果
     cache_key = sr.searched.group(0)
     result = _RESULT_CACHE.get(cache_key)
+    METRICS.hit("result", result is not None)
 
     if result is None:
-        # 2. 获取对应平台 parser
-        parser = get_parser(sr.keyword)
-        result = await parser.parse(sr.keyword, sr.searched)
+        # 2. 使用对应平台 parser 解析
+        with METRICS.span("parse"):
+            result = await parser.parse(sr.keyword, sr.searched)
         logger.debug(f"解析结果: {result}")
     else:
         logger.debug(f"命中缓存: {cache_key}, 结果: {result}")
@@ -90,7 +109,8 @@ async def parser_handler(
     logger.debug(f"获取渲染器：{renderer}")
     try:
         async for message in renderer.render_messages(result):
-            msg_sent = await message.send()
+            with METRICS.span("send"):
+                msg_sent = await message.send()
             # 保存消息ID与解析结果的关联
             if msg_sent:
                 # 添加详细调试日志，查看msg_sent的类型和属性
@@ -180,17 +200,17 @@ async def _(message: Message = CommandArg()):
         await UniMessage("请发送正确的 BV 号").finish()
 
     bvid, page_num = matched.group(1), matched.group(2)
-    page_idx = int(page_num) if page_num else 0
+    page_idx = max(int(page_num) - 1, 0) if page_num else 0
+
+    from ..parsers import BilibiliParser
 
     parser = get_parser_by_type(BilibiliParser)
 
-    _, audio_url = await parser.extract_download_urls(bvid=bvid, page_index=page_idx)
-    if not audio_url:
+    # 已解析过的视频直接复用缓存的音轨
+    audio_path = await parser.download_audio(bvid, page_idx)
+    if not audio_path:
         await UniMessage("未找到可下载的音频").finish()
 
-    audio_path = await DOWNLOADER.download_audio(
-        audio_url, audio_name=f"{bvid}-{page_idx}.mp3", ext_headers=parser.headers
-    )
     await UniMessage(UniHelper.record_seg(audio_path)).send()
 
     if pconfig.need_upload:
@@ -200,11 +220,12 @@ async def _(message: Message = CommandArg()):
 from ..download import YTDLP_DOWNLOADER
 
 if YTDLP_DOWNLOADER is not None:
-    from ..parsers import YouTubeParser
 
     @on_command("ym", priority=3, block=True).handle()
     @UniHelper.with_reaction
     async def _(message: Message = CommandArg()):
+        from ..parsers import YouTubeParser
+
         text = message.extract_plain_text()
         parser = get_parser_by_type(YouTubeParser)
         _, matched = parser.search_url(text)
@@ -222,6 +243,8 @@ if YTDLP_DOWNLOADER is not None:
 
 @on_command("blogin", block=True, permission=SUPER_PRIVATE).handle()
 async def _():
+    from ..parsers import BilibiliParser
+
     parser = get_parser_by_type(BilibiliParser)
     qrcode = await parser.login_with_qrcode()
     await UniMessage(UniHelper.img_seg(raw=qrcode)).send()
@@ -229,6 +252,43 @@ async def _():
         await UniMessage(msg).send()
 
 
+@on_command("pstats", block=True, permission=SUPER_PRIVATE).handle()
+async def _():
+    stats = await build_stats(len(_RESULT_CACHE), _RESULT_CACHE.max_size)
+    await UniMessage(stats).send()
+
+
+@on_command("pprofile", block=True, permission=SUPER_PRIVATE).handle()
+async def _(message: Message = CommandArg()):
+    from ..profiler import PROFILER
+
+    # pprofile 30 -> 分析 30 秒, pprofile 5次 -> 分析接下来的 5 次解析
+    text = message.extract_plain_text().strip()
+    matched = re.fullmatch(r"(\d+)\s*(秒|s|次)?", text) if text else None
+    if text and not matched:
+        await UniMessage("用法: pprofile [秒数] 或 pprofile [次数]次").finish()
+    if PROFILER.running:
+        await UniMessage("已有正在进行的性能分析").finish()
+
+    seconds = parses = None
+    if matched and matched.group(2) == "次":
+        parses = int(matched.group(1))
+    elif matched:
+        seconds = int(matched.group(1))
+    try:
+        limit = PROFILER.effective_seconds(seconds, parses)
+    except ValueError as e:
+        await UniMessage(str(e)).finish()
+
+    if parses:
+        await UniMessage(f"开始性能分析, 等待接下来的 {parses} 次解析, 最长 {limit:g} 秒").send()
+    else:
+        capped = f" (请求的 {seconds} 秒超过上限)" if seconds and seconds > limit else ""
+        await UniMessage(f"开始性能分析, 持续 {limit:g} 秒{capped}").send()
+    summary = await PROFILER.capture(seconds, parses)
+    await UniMessage(summary).send()
+
+
 # 监听特定表情，触发延迟发送的媒体内容
 # group_msg_emoji_like事件
 from nonebot import on_notice
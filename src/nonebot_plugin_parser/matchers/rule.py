@@ -1,4 +1,5 @@
 import re
+import time
 from typing import Literal
 
 import msgspec
@@ -48,17 +49,19 @@ raw_decoder = msgspec.json.Decoder(RawData)
 class SearchResult:
     """匹配结果"""
 
-    __slots__ = ("keyword", "searched", "text")
+    __slots__ = ("keyword", "match_seconds", "searched", "text")
 
     def __init__(
         self,
         text: str,
         keyword: str,
         searched: re.Match[str],
+        match_seconds: float = 0.0,
     ):
         self.text: str = text
         self.keyword: str = keyword
         self.searched: re.Match[str] = searched
+        self.match_seconds: float = match_seconds
 
 
 def Searched() -> SearchResult:
@@ -161,12 +164,17 @@ class KeywordRegexRule:
         if not text:
             return False
 
+        # 匹配耗时在命中后由处理器记入 trace, 未命中的普通消息不计入
+        started_at = time.perf_counter()
         for keyword, pattern in self.key_pattern_list:
             if keyword not in text:
                 continue
             if searched := pattern.search(text):
                 state[PSR_SEARCHED_KEY] = SearchResult(
-                    text=text, keyword=keyword, searched=searched
+                    text=text,
+                    keyword=keyword,
+                    searched=searched,
+                    match_seconds=time.perf_counter() - started_at,
                 )
                 return True
             logger.debug(f"keyword '{keyword}' is in '{text}', but not matched")
@@ -0,0 +1,103 @@
+"""运行状态统计, 供超级用户在聊天中排查性能问题"""
+
+import time
+import asyncio
+from pathlib import Path
+
+from ..config import pconfig
+from ..ffmpeg import FFMPEG
+from ..metrics import METRICS, quantiles
+from ..download import DOWNLOADER, YTDLP_DOWNLOADER
+from ..parsers.music_cache import MUSIC_CACHE
+
+WINDOW = 3600
+"""统计最近的时间范围, 单位: 秒"""
+STAGES = (
+    "match",
+    "redirect",
+    "parse",
+    "download",
+    "ffmpeg_wait",
+    "ffmpeg",
+    "resolve",
+    "screenshot",
+    "send",
+    "total",
+)
+"""按执行顺序排列的阶段"""
+CACHES = ("result", "render", "media", "avatar", "music")
+
+
+def _fmt_bytes(size: float) -> str:
+    return f"{size / 1024 / 1024:.1f} MB"
+
+
+def _dir_usage(path: Path) -> tuple[int, int]:
+    """目录下所有文件的 (总大小, 文件数)"""
+    total = count = 0
+    for file in path.rglob("*"):
+        try:
+            if file.is_file():
+                total += file.stat().st_size
+                count += 1
+        except OSError:
+            continue
+    return total, count
+
+
+async def build_stats(result_cache_size: int, result_cache_max: int) -> str:
+    """生成运行状态报告"""
+    lines = ["解析统计 (最近 1 小时)"]
+
+    # 解析次数
+    totals = METRICS.recent("total", WINDOW)
+    counts = sorted(((len(v), p) for p, v in totals.items()), reverse=True)
+    lines.append(
+        "解析次数: " + (", ".join(f"{p} {n}" for n, p in counts) if counts else "无")
+    )
+
+    # 阶段耗时
+    stage_lines = []
+    for stage in STAGES:
+        values = [v for vs in METRICS.recent(stage, WINDOW).values() for v in vs]
+        if values:
+            p50, p95 = quantiles(values, 0.5, 0.95)
+            stage_lines.append(f"  {stage}: {p50:.2f}s / {p95:.2f}s ({len(values)})")
+    if stage_lines:
+        lines.append("阶段耗时 p50 / p95 (次数):")
+        lines.extend(stage_lines)
+
+    # 缓存
+    lines.append("缓存命中 (启动以来):")
+    for cache in CACHES:
+        hits = METRICS.counter("cache_hits", cache=cache)
+        misses = METRICS.counter("cache_misses", cache=cache)
+        if total := hits + misses:
+            lines.append(f"  {cache}: {hits:g}/{total:g} ({hits / total:.0%})")
+    sizes = [f"结果 {result_cache_size}/{result_cache_max}", f"音乐 {len(MUSIC_CACHE)}"]
+    if YTDLP_DOWNLOADER is not None:
+        ytdlp = YTDLP_DOWNLOADER
+        sizes.append(f"yt-dlp 信息 {ytdlp.info_cache_size} ({_fmt_bytes(ytdlp.info_cache_bytes)})")
+    lines.append("缓存条目: " + ", ".join(sizes))
+    usage, files = await asyncio.to_thread(_dir_usage, pconfig.cache_dir)
+    lines.append(f"缓存目录: {_fmt_bytes(usage)} ({files} 个文件)")
+
+    # 进行中的任务
+    lines.append(
+        f"进行中: 下载 {DOWNLOADER.active}, ffmpeg 运行 {FFMPEG.running} / 排队 {FFMPEG.queued}"
+    )
+    if retries := sum(v for (name, _), v in METRICS.counters.items() if name == "retries"):
+        lines.append(f"重试次数 (启动以来): {retries:g}")
+
+    # 最慢链接
+    since = time.time() - WINDOW
+    slowest = sorted(
+        (t for t in METRICS.traces if t.started_at >= since),
+        key=lambda t: t.seconds,
+        reverse=True,
+    )[:5]
+    if slowest:
+        lines.append("最慢链接:")
+        lines.extend(f"  {t.seconds:.2f}s [{t.platform}] {t.url}" for t in slowest)
+
+    return "\n".join(lines)
@@ -0,0 +1,279 @@
+"""性能指标
+
+按阶段 (关键词匹配, 重定向, 解析, 下载, ffmpeg, 模板数据, 截图, 发送) 统计耗时直方图,
+以及缓存命中, 下载字节数, 重试次数等计数器.
+同一次解析产生的耗时通过 contextvars 中的 trace 关联, 由解析创建的下载任务会继承 trace
+"""
+
+import time
+import uuid
+import bisect
+import asyncio
+from typing import Any, ClassVar
+from weakref import WeakKeyDictionary
+from contextlib import contextmanager
+from collections import deque
+from contextvars import ContextVar
+from collections.abc import Callable, Iterator
+
+from msgspec import Struct, json
+from nonebot import logger, get_driver
+
+from .config import pconfig
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Span(Struct):
+    stage: str
+    """阶段名称"""
+    seconds: float
+    """耗时, 单位: 秒"""
+
+
+class Trace(Struct):
+    trace_id: str
+    """trace id"""
+    platform: str
+    """平台名称"""
+    url: str
+    """解析的链接"""
+    started_at: float
+    """开始时间戳"""
+    seconds: float = 0.0
+    """总耗时, 单位: 秒"""
+    spans: list[Span] = []
+    """各阶段耗时"""
+
+
+class Histogram:
+    """耗时直方图, 同时保留最近的样本用于计算分位数"""
+
+    BUCKETS: ClassVar[tuple[float, ...]] = (
+        0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300,
+    )
+    """桶上界, 单位: 秒"""
+
+    def __init__(self, max_samples: int = 1024):
+        self.counts: list[int] = [0] * (len(self.BUCKETS) + 1)
+        self.sum: float = 0.0
+        self.count: int = 0
+        self.samples: deque[tuple[float, float]] = deque(maxlen=max_samples)
+        """最近的样本 (时间戳, 耗时)"""
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        self.samples.append((time.time(), seconds))
+
+    def recent(self, window: float = 3600) -> list[float]:
+        """最近 window 秒内的样本"""
+        since = time.time() - window
+        return [v for t, v in self.samples if t >= since]
+
+    def quantiles(self, *qs: float, window: float = 3600) -> list[float]:
+        """最近 window 秒内样本的分位数, 没有样本时为 0"""
+        return quantiles(self.recent(window), *qs)
+
+
+def quantiles(values: list[float], *qs: float) -> list[float]:
+    """计算分位数, 没有样本时为 0"""
+    if not values:
+        return [0.0] * len(qs)
+    values = sorted(values)
+    return [values[min(len(values) - 1, int(q * len(values)))] for q in qs]
+
+
+_current_trace: ContextVar[Trace | None] = ContextVar("parser_trace", default=None)
+_task_traces: WeakKeyDictionary[asyncio.Task[Any], Trace] = WeakKeyDictionary()
+"""任务 -> 所属的 trace, 供事件循环阻塞检测在看门狗线程中读取"""
+
+
+def _has_running_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def current_trace_id() -> str | None:
+    """当前 trace id, 不在解析过程中时为 None"""
+    trace = _current_trace.get()
+    return trace.trace_id if trace else None
+
+
+class Metrics:
+    """全局性能指标"""
+
+    MAX_TRACES: ClassVar[int] = 200
+    """保留的最近 trace 数"""
+
+    def __init__(self):
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+        """(阶段, 平台) -> 耗时直方图"""
+        self.counters: dict[tuple[str, Labels], float] = {}
+        """(名称, 标签) -> 计数"""
+        self.traces: deque[Trace] = deque(maxlen=self.MAX_TRACES)
+        """最近完成的 trace"""
+        self.trace_listeners: list[Callable[[Trace], None]] = []
+        """trace 结束时的回调"""
+        self.file = pconfig.data_dir / "metrics.json"
+
+    def observe(self, stage: str, seconds: float, platform: str | None = None):
+        """记录一次阶段耗时, 未指定平台时使用当前 trace 的平台"""
+        trace = _current_trace.get()
+        if platform is None:
+            platform = trace.platform if trace else ""
+        key = (stage, platform)
+        if (histogram := self.histograms.get(key)) is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(seconds)
+        if trace is not None:
+            trace.spans.append(Span(stage, seconds))
+
+    def inc(self, name: str, value: float = 1, **labels: str):
+        """计数器加 value"""
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def hit(self, cache: str, hit: bool):
+        """记录一次缓存命中或未命中"""
+        self.inc("cache_hits" if hit else "cache_misses", cache=cache)
+
+    @contextmanager
+    def span(self, stage: str, platform: str | None = None) -> Iterator[None]:
+        """统计代码块耗时, 可用于同步或异步代码"""
+        started_at = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc("errors", stage=stage)
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - started_at, platform)
+
+    @contextmanager
+    def trace(self, platform: str, url: str) -> Iterator[Trace]:
+        """开始一次解析的 trace, 期间记录的阶段耗时都归属于该 trace"""
+        trace = Trace(uuid.uuid4().hex[:8], platform, url, time.time())
+        token = _current_trace.set(trace)
+        # 当前任务本身也归属于该 trace, 解析处理器中的阻塞可以被关联
+        task = asyncio.current_task() if _has_running_loop() else None
+        previous = _task_traces.get(task) if task is not None else None
+        if task is not None:
+            _task_traces[task] = trace
+        started_at = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            _current_trace.reset(token)
+            if task is not None:
+                if previous is None:
+                    _task_traces.pop(task, None)
+                else:
+                    _task_traces[task] = previous
+            trace.seconds = time.perf_counter() - started_at
+            self.observe("total", trace.seconds, platform)
+            self.traces.append(trace)
+            for listener in self.trace_listeners:
+                listener(trace)
+            stages = ", ".join(f"{s.stage} {s.seconds:.2f}s" for s in trace.spans)
+            logger.debug(f"[{trace.trace_id}] {url} 总耗时 {trace.seconds:.2f}s: {stages}")
+
+    def recent(self, stage: str, window: float = 3600) -> dict[str, list[float]]:
+        """最近 window 秒内某阶段的样本, 按平台分组"""
+        return {
+            platform: values
+            for (key, platform), histogram in self.histograms.items()
+            if key == stage and (values := histogram.recent(window))
+        }
+
+    def counter(self, name: str, **labels: str) -> float:
+        """读取计数器"""
+        return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def render_prometheus(self) -> str:
+        """导出为 Prometheus 文本格式"""
+        lines = [
+            "# HELP parser_stage_seconds 各阶段耗时",
+            "# TYPE parser_stage_seconds histogram",
+        ]
+        for (stage, platform), histogram in sorted(self.histograms.items()):
+            labels = f'stage="{stage}",platform="{platform}"'
+            cumulative = 0
+            for le, count in zip((*Histogram.BUCKETS, "+Inf"), histogram.counts):
+                cumulative += count
+                lines.append(f'parser_stage_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"parser_stage_seconds_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"parser_stage_seconds_count{{{labels}}} {histogram.count}")
+
+        names = sorted({name for name, _ in self.counters})
+        for name in names:
+            lines.append(f"# TYPE parser_{name}_total counter")
+            for (key, labels), value in sorted(self.counters.items()):
+                if key != name:
+                    continue
+                label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+                label_str = f"{{{label_str}}}" if label_str else ""
+                lines.append(f"parser_{name}_total{label_str} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict[str, Any]:
+        """导出为可 JSON 序列化的字典"""
+        return {
+            "time": time.time(),
+            "stages": [
+                {
+                    "stage": stage,
+                    "platform": platform,
+                    "count": h.count,
+                    "sum": h.sum,
+                    "buckets": dict(zip(map(str, (*Histogram.BUCKETS, "+Inf")), h.counts)),
+                    "p50": (qs := h.quantiles(0.5, 0.95, 0.99))[0],
+                    "p95": qs[1],
+                    "p99": qs[2],
+                }
+                for (stage, platform), h in sorted(self.histograms.items())
+            ],
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self.counters.items())
+            ],
+            "traces": list(self.traces),
+        }
+
+    async def save(self):
+        """保存到 data_dir/metrics.json"""
+        data = json.encode(self.snapshot())
+        await asyncio.to_thread(self.file.write_bytes, data)
+
+
+METRICS: Metrics = Metrics()
+"""全局性能指标"""
+
+
+def _setup_route(path: str):
+    from nonebot.drivers import URL, Request, Response, ASGIMixin, HTTPServerSetup
+
+    driver = get_driver()
+    if not isinstance(driver, ASGIMixin):
+        logger.warning(f"当前驱动器 {driver.type} 不支持 HTTP 服务, 无法开启指标接口")
+        return
+
+    async def handle(_: Request) -> Response:
+        return Response(
+            200,
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+            content=METRICS.render_prometheus(),
+        )
+
+    driver.setup_http_server(HTTPServerSetup(URL(path), "GET", "parser_metrics", handle))
+    logger.info(f"性能指标接口: {path}")
+
+
+if pconfig.metrics_path:
+    _setup_route(pconfig.metrics_path)
+
+get_driver().on_shutdown(METRICS.save)
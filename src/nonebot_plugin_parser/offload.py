@@ -0,0 +1,111 @@
+"""CPU 密集任务卸载
+
+HTML 解析, 大段 JSON 和 protobuf 解码都是纯 Python / 持有 GIL 的同步代码,
+直接在处理器中执行会阻塞整个事件循环. 这里提供两种执行方式:
+
+- 进程池: 用于纯函数, 参数和返回值需可 pickle, 函数需定义在模块顶层或为类的静态方法
+- 线程池: 用于会释放 GIL 的任务 (文件读写, 图片编解码等)
+"""
+
+import signal
+import asyncio
+import functools
+import multiprocessing
+from typing import TypeVar, ParamSpec
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from nonebot import logger, get_driver
+
+from .config import pconfig
+from .metrics import METRICS
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+def _init_worker():
+    """进程池初始化函数, 由父进程处理 Ctrl+C"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _ping():
+    """空任务, 用于在启动阶段拉起工作进程"""
+
+
+class CPUExecutor:
+    """CPU 密集任务执行器
+
+    进程池在 nonebot 启动时创建; 平台不支持 fork, parser_cpu_workers 为 0
+    或进程池已损坏时, 进程池任务退回线程池执行
+    """
+
+    def __init__(self, max_workers: int, max_threads: int = 4):
+        self.max_workers = max_workers
+        if "fork" not in multiprocessing.get_all_start_methods():
+            # spawn 方式会在子进程中重新导入插件包, 无法在 nonebot 之外初始化
+            self.max_workers = 0
+        self._pool: ProcessPoolExecutor | None = None
+        self._threads = ThreadPoolExecutor(max_threads, thread_name_prefix="parser-cpu")
+
+    async def start(self):
+        """启动进程池并拉起全部工作进程
+
+        fork 会复制父进程当时的所有线程状态和文件描述符, 因此只在启动阶段,
+        尚未打开任何命名管道或下载线程时创建, 运行期间不再 fork 新的工作进程
+        """
+        if self.max_workers <= 0 or self._pool is not None:
+            return
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_worker,
+        )
+        try:
+            # fork 方式的进程池在首次提交任务时, 于当前线程中一次性创建全部工作进程
+            await asyncio.wrap_future(self._pool.submit(_ping))
+        except BrokenProcessPool:
+            logger.warning("CPU 任务进程池启动失败, 改为在线程中执行")
+            self.shutdown_pool()
+            return
+        logger.info(f"CPU 任务进程池已启动, 工作进程数: {self.max_workers}")
+
+    async def run_in_process(self, func: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        """在进程池中执行纯函数"""
+        if self._pool is None:
+            return await self.run_in_thread(func, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        with METRICS.span("offload"):
+            try:
+                return await loop.run_in_executor(self._pool, call)
+            except BrokenProcessPool:
+                # 工作进程异常退出, 运行期间 fork 会继承管道等文件描述符, 不再重建进程池,
+                # 之后的任务都在线程中执行
+                logger.warning("CPU 任务工作进程异常退出, 后续任务改为在线程中执行")
+                self.shutdown_pool()
+                return await loop.run_in_executor(self._threads, call)
+
+    async def run_in_thread(self, func: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        """在线程池中执行会释放 GIL 的任务"""
+        loop = asyncio.get_running_loop()
+        with METRICS.span("offload"):
+            return await loop.run_in_executor(self._threads, functools.partial(func, *args, **kwargs))
+
+    def shutdown_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def shutdown(self):
+        """关闭进程池和线程池"""
+        self.shutdown_pool()
+        self._threads.shutdown(wait=False, cancel_futures=True)
+
+
+CPU_EXECUTOR: CPUExecutor = CPUExecutor(pconfig.cpu_workers)
+"""全局 CPU 任务执行器"""
+
+get_driver().on_startup(CPU_EXECUTOR.start)
+get_driver().on_shutdown(CPU_EXECUTOR.shutdown)
@@ -1,26 +1,6 @@
-# 导出所有 Parser 类
-from .nga import NGAParser as NGAParser
-from .base import BaseParser as BaseParser
-from .kuwo import KuWoParser as KuWoParser
-from .acfun import AcfunParser as AcfunParser
-from .kugou import KuGouParser as KuGouParser
-from .tieba import TiebaParser as TiebaParser
-from .weibo import WeiBoParser as WeiBoParser
-from .douyin import DouyinParser as DouyinParser
-from .taptap import TapTapParser as TapTapParser
-from .netease import NCMParser as NCMParser
-from .qsmusic import QSMusicParser as QSMusicParser
-from .toutiao import ToutiaoParser as ToutiaoParser
-from .twitter import TwitterParser as TwitterParser
-from .bilibili import BilibiliParser as BilibiliParser
-from .kuaishou import KuaiShouParser as KuaiShouParser
-from ..download import YTDLP_DOWNLOADER
-from .xiaohongshu import XiaoHongShuParser as XiaoHongShuParser
-
-if YTDLP_DOWNLOADER is not None:
-    from .tiktok import TikTokParser as TikTokParser
-    from .youtube import YouTubeParser as YouTubeParser
+from typing import TYPE_CHECKING
 
+from .base import BaseParser as BaseParser
 from .base import handle
 from .data import (
     Author,
@@ -32,6 +12,36 @@ from .data import (
     DynamicContent,
     GraphicsContent,
 )
+from .manifest import get_entry, load_parser_class
+
+if TYPE_CHECKING:
+    from .nga import NGAParser as NGAParser
+    from .kuwo import KuWoParser as KuWoParser
+    from .acfun import AcfunParser as AcfunParser
+    from .kugou import KuGouParser as KuGouParser
+    from .tieba import TiebaParser as TiebaParser
+    from .weibo import WeiBoParser as WeiBoParser
+    from .douyin import DouyinParser as DouyinParser
+    from .taptap import TapTapParser as TapTapParser
+    from .tiktok import TikTokParser as TikTokParser
+    from .netease import NCMParser as NCMParser
+    from .qsmusic import QSMusicParser as QSMusicParser
+    from .toutiao import ToutiaoParser as ToutiaoParser
+    from .twitter import TwitterParser as TwitterParser
+    from .youtube import YouTubeParser as YouTubeParser
+    from .bilibili import BilibiliParser as BilibiliParser
+    from .kuaishou import KuaiShouParser as KuaiShouParser
+    from .xiaohongshu import XiaoHongShuParser as XiaoHongShuParser
+
+
+def __getattr__(name: str):
+    # 解析器类在被访问时才导入对应模块, 见 manifest.py
+    try:
+        entry = get_entry(name)
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    return load_parser_class(entry)
+
 
 __all__ = [
     "AcfunParser",
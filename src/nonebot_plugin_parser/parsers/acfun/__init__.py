@@ -21,6 +21,7 @@ from ..base import (
     handle,
     pconfig,
 )
+from ..embedded_json import extract_json
 
 
 class AcfunParser(BaseParser):
@@ -76,14 +77,10 @@ class AcfunParser(BaseParser):
             response.raise_for_status()
             raw = response.text
 
-        matched = re.search(r"window\.videoInfo =(.*?)</script>", raw)
-        if not matched:
+        if (video_info := extract_json(raw, "window.videoInfo")) is None:
             raise ParseException("解析 acfun 视频信息失败")
 
-        raw = str(matched[1])
-        raw = re.sub(r'\\{1,4}"', '"', raw)
-        raw = raw.replace('"{', "{").replace('}"', "}")
-        return video.decoder.decode(raw)
+        return video.decoder.decode(video_info)
 
     async def download_video(self, m3u8_url: str, file_name: str, duration: int) -> Path:
         """下载acfun视频
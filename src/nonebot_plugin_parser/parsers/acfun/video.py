@@ -1,5 +1,5 @@
 from msgspec import Struct
-from msgspec.json import Decoder
+from msgspec.json import Decoder, decode
 
 
 class User(Struct):
@@ -12,10 +12,6 @@ class Representation(Struct):
     m3u8Slice: str
     qualityType: str
 
-    @property
-    def m3u8_slice(self) -> str:
-        return self.m3u8Slice.replace("\\\\n", "\n")
-
 
 class AdaptationSet(Struct):
     representation: list[Representation]
@@ -26,12 +22,14 @@ class KsPlay(Struct):
 
 
 class CurrentVideoInfo(Struct):
-    ksPlayJson: KsPlay
+    ksPlayJson: str
+    """播放信息, 为 JSON 字符串"""
     durationMillis: int
 
     @property
     def representations(self) -> list[Representation]:
-        return self.ksPlayJson.adaptationSet[0].representation
+        ks_play = decode(self.ksPlayJson, type=KsPlay)
+        return ks_play.adaptationSet[0].representation
 
 
 class VideoInfo(Struct, kw_only=True):
@@ -14,6 +14,8 @@ R = TypeVar("R")
 
 from .data import Platform, ParseResult, ParseResultKwargs
 from ..config import pconfig as pconfig
+from ..metrics import METRICS
+from ..offload import CPU_EXECUTOR
 from ..download import DOWNLOADER as DOWNLOADER
 from ..constants import IOS_HEADER, COMMON_HEADER, ANDROID_HEADER, COMMON_TIMEOUT
 from ..constants import DOWNLOAD_TIMEOUT as DOWNLOAD_TIMEOUT
@@ -54,6 +56,7 @@ def retry(max_retries: int = 3, delay: float = 1.0):
                     retry_count += 1
                     if retry_count > max_retries:
                         raise
+                    METRICS.inc("retries", func=func.__name__)
 
                     # 指数退避
                     current_delay = delay * (2 ** (retry_count - 1))
@@ -130,6 +133,19 @@ class BaseParser:
         # 按关键字长度降序排序
         cls._key_patterns.sort(key=lambda x: -len(x[0]))
 
+    @staticmethod
+    async def run_in_process(func: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        """在进程池中执行纯函数, 用于 HTML/JSON/protobuf 等 CPU 密集的提取和解码
+
+        参数和返回值需可 pickle, func 需定义在模块顶层或为静态方法
+        """
+        return await CPU_EXECUTOR.run_in_process(func, *args, **kwargs)
+
+    @staticmethod
+    async def run_in_thread(func: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        """在线程池中执行会释放 GIL 的阻塞任务"""
+        return await CPU_EXECUTOR.run_in_thread(func, *args, **kwargs)
+
     @classmethod
     def get_all_subclass(cls) -> list[type["BaseParser"]]:
         """获取所有已注册的 Parser 类"""
@@ -196,7 +212,8 @@ class BaseParser:
             follow_redirects=False,
             timeout=COMMON_TIMEOUT,
         ) as client:
-            response = await client.get(url)
+            with METRICS.span("redirect"):
+                response = await client.get(url)
             if response.status_code >= 400:
                 response.raise_for_status()
             return response.headers.get("Location", url)
@@ -217,7 +234,8 @@ class BaseParser:
             follow_redirects=True,
             timeout=COMMON_TIMEOUT,
         ) as client:
-            response = await client.get(url)
+            with METRICS.span("redirect"):
+                response = await client.get(url)
             if response.status_code >= 400:
                 response.raise_for_status()
             return str(response.url)
@@ -227,14 +245,31 @@ class BaseParser:
         name: str,
         avatar_url: str | None = None,
         description: str | None = None,
+        *,
+        user_id: str | int | None = None,
     ):
-        """创建作者对象"""
+        """创建作者对象
+
+        Args:
+            name (str): 作者名称
+            avatar_url (str | None): 头像 URL. Defaults to None.
+            description (str | None): 个性签名等. Defaults to None.
+            user_id (str | int | None): 平台内的用户 id, 提供时头像按用户缓存. Defaults to None.
+        """
         from .data import Author
+        from .image_url import ImageUse, rewrite_image_url
+        from ..download.avatar import AVATAR_STORE
 
-        avatar_task = None
+        avatar = None
         if avatar_url:
-            avatar_task = DOWNLOADER.download_img(avatar_url, ext_headers=self.headers)
-        return Author(name=name, avatar=avatar_task, description=description)
+            avatar_url = rewrite_image_url(avatar_url, ImageUse.AVATAR)
+            if user_id:
+                avatar = AVATAR_STORE.get(
+                    self.platform.name, user_id, avatar_url, ext_headers=self.headers
+                )
+            else:
+                avatar = DOWNLOADER.download_img(avatar_url, ext_headers=self.headers)
+        return Author(name=name, avatar=avatar, description=description)
 
     def create_video_content(
         self,
@@ -246,6 +281,7 @@ class BaseParser:
         """创建视频内容"""
         from .data import VideoContent
         from ..utils import keep_zh_en_num
+        from .image_url import ImageUse, rewrite_image_url
 
         # 清理文件名，只保留安全字符
         if video_name:
@@ -258,6 +294,8 @@ class BaseParser:
 
         cover_task = None
         if cover_url:
+            # 封面只在卡片中显示
+            cover_url = rewrite_image_url(cover_url, ImageUse.THUMB)
             cover_task = DOWNLOADER.download_img(cover_url, ext_headers=self.headers)
         if isinstance(url_or_task, str):
             url_or_task = DOWNLOADER.download_video(
@@ -272,9 +310,11 @@ class BaseParser:
     ):
         """创建图片内容列表"""
         from .data import ImageContent
+        from .image_url import ImageUse, rewrite_image_url
 
         contents: list[ImageContent] = []
         for url in image_urls:
+            url = rewrite_image_url(url, ImageUse.FULL)
             task = DOWNLOADER.download_img(url, ext_headers=self.headers)
             contents.append(ImageContent(task))
         return contents
@@ -326,6 +366,8 @@ class BaseParser:
     ):
         """创建图文内容 图片不能为空 文字可空 渲染时文字在前 图片在后"""
         from .data import GraphicsContent
+        from .image_url import ImageUse, rewrite_image_url
 
+        image_url = rewrite_image_url(image_url, ImageUse.FULL)
         image_task = DOWNLOADER.download_img(image_url, ext_headers=self.headers)
         return GraphicsContent(image_task, text, alt)
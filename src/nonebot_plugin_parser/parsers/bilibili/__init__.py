@@ -1,15 +1,18 @@
+import os
 import json
+import time
 import asyncio
 from re import Match
-from typing import Any, ClassVar
-from collections.abc import AsyncGenerator
+from typing import TYPE_CHECKING, Any, TypeVar, ClassVar
+from pathlib import Path
+from collections.abc import Awaitable, AsyncGenerator
 
 import httpx
 from msgspec import convert
 from nonebot import logger
 from bilibili_api import HEADERS, Credential, select_client, request_settings
 from bilibili_api.opus import Opus
-from bilibili_api.video import Video
+from bilibili_api.video import Video, VideoCodecs, VideoQuality
 from bilibili_api.login_v2 import QrCodeLogin, QrCodeLoginEvents
 
 from ..base import (
@@ -23,8 +26,23 @@ from ..base import (
     pconfig,
 )
 from ..data import Platform, ImageContent, MediaContent
+from ...utils import TTLCache, safe_unlink, extract_audio
 from ..cookie import ck2dict
 
+if TYPE_CHECKING:
+    from .video import PageInfo
+
+T = TypeVar("T")
+VIDEO_CODECS: dict[str, VideoCodecs] = {
+    "avc": VideoCodecs.AVC,
+    "hev": VideoCodecs.HEV,
+    "av01": VideoCodecs.AV1,
+}
+"""配置中的编码名称 -> VideoCodecs"""
+
+StreamsKey = tuple[str, int, Any, tuple[Any, ...]]
+"""视频流缓存键 (bvid, page_index, quality, codecs)"""
+
 # 选择客户端
 select_client("curl_cffi")
 # 模拟浏览器，第二参数数值参考 curl_cffi 文档
@@ -38,10 +56,30 @@ class BilibiliParser(BaseParser):
         name=PlatformEnum.BILIBILI, display_name="哔哩哔哩"
     )
 
+    # 卡片附属请求的独立超时, 单位: 秒
+    AI_SUMMARY_TIMEOUT: ClassVar[float] = 10.0
+    COMMENTS_TIMEOUT: ClassVar[float] = 8.0
+    PLAYURL_TIMEOUT: ClassVar[float] = 15.0
+    # 视频信息缓存时间, 单位: 秒
+    VIDEO_INFO_TTL: ClassVar[float] = 300.0
+    # 视频流地址缺少 deadline 参数时的缓存时间, 及距离过期的安全余量, 单位: 秒
+    PLAYURL_TTL: ClassVar[float] = 1800.0
+    PLAYURL_EXPIRE_MARGIN: ClassVar[float] = 60.0
+
     def __init__(self):
         self.headers = HEADERS.copy()
         self._credential: Credential | None = None
         self._cookies_file = pconfig.config_dir / "bilibili_cookies.json"
+        # 配置在加载时已校验, 这里只解析一次
+        self._video_quality = VideoQuality(pconfig.bili_video_quality)
+        self._video_codecs = [VIDEO_CODECS[code] for code in pconfig.bili_video_codes]
+        # 视频信息与视频流地址缓存, 由卡片解析, bm 指令和懒下载共用
+        self._video_info_cache = TTLCache[str, dict[str, Any]](
+            ttl=self.VIDEO_INFO_TTL, max_size=64
+        )
+        self._streams_cache = TTLCache[StreamsKey, tuple[str, str | None]](
+            ttl=self.PLAYURL_TTL, max_size=64
+        )
 
     def _format_stat(self, num: int | None) -> str:
         """将数字格式化为 1.2万 的形式"""
@@ -147,6 +185,7 @@ class BilibiliParser(BaseParser):
         bvid: str | None = None,
         avid: int | None = None,
         page_num: int = 1,
+        prefetch_streams: bool = True,
     ):
         """解析视频信息
 
@@ -154,45 +193,106 @@ class BilibiliParser(BaseParser):
             bvid (str | None): bvid
             avid (int | None): avid
             page_num (int): 页码
+            prefetch_streams (bool): 是否预取视频流地址, 只取卡片信息时 (如转发的视频) 不需要
         """
+        side_tasks: list[asyncio.Task[Any]] = []
+        try:
+            return await self._parse_video(
+                side_tasks,
+                bvid=bvid,
+                avid=avid,
+                page_num=page_num,
+                prefetch_streams=prefetch_streams,
+            )
+        except BaseException:
+            # 解析失败时取消尚未完成的附属请求; 成功时预取任务由懒下载继续使用
+            for task in side_tasks:
+                task.cancel()
+            raise
 
-        from .video import VideoInfo, AIConclusion
+    async def _parse_video(
+        self,
+        side_tasks: list[asyncio.Task[Any]],
+        *,
+        bvid: str | None,
+        avid: int | None,
+        page_num: int,
+        prefetch_streams: bool,
+    ):
+        """parse_video 的实现, 创建的附属请求任务记录在 side_tasks 中"""
+        from .video import VideoInfo
 
         video = await self._get_video(bvid=bvid, avid=avid)
+        # aid 可以由 bvid 本地换算, 热评请求无需等待视频信息
+        if not avid and bvid and bvid.startswith(self.PREFIX):
+            avid = self.bv2av(bvid)
+        comments_task = self._create_comments_task(avid) if avid else None
+        if comments_task:
+            side_tasks.append(comments_task)
         # 转换为 msgspec struct
-        video_info = convert(await video.get_info(), VideoInfo)
+        video_info = convert(await self._get_video_info(video), VideoInfo)
+        if comments_task is None:
+            comments_task = self._create_comments_task(
+                video_info.aid or self.bv2av(video_info.bvid)
+            )
+            side_tasks.append(comments_task)
         # 获取简介
         text = f"简介: {video_info.desc}" if video_info.desc else None
         # up
-        author = self.create_author(video_info.owner.name, video_info.owner.face)
+        author = self.create_author(
+            video_info.owner.name, video_info.owner.face, user_id=video_info.owner.mid
+        )
         # 处理分 p
         page_info = video_info.extract_info_with_page(page_num)
 
-        # 获取 AI 总结
+        # cid 已知, 并发获取 AI 总结, 同时预取视频流地址
+        ai_task = None
         if self._credential:
-            cid = await video.get_cid(page_info.index)
-            ai_conclusion = await video.get_ai_conclusion(cid)
-            ai_conclusion = convert(ai_conclusion, AIConclusion)
-            ai_summary = ai_conclusion.summary
-        else:
-            ai_summary: str = "哔哩哔哩 cookie 未配置或失效, 无法使用 AI 总结"
+            ai_task = asyncio.create_task(
+                self._wait_with_timeout(
+                    self._fetch_ai_summary(video, page_info),
+                    self.AI_SUMMARY_TIMEOUT,
+                    "获取 AI 总结",
+                )
+            )
+            side_tasks.append(ai_task)
+        streams_task = None
+        if prefetch_streams and page_info.duration <= pconfig.duration_maximum:
+            streams_task = asyncio.create_task(
+                self._wait_with_timeout(
+                    self.extract_download_urls(
+                        video=video, page_index=page_info.index, cid=page_info.cid
+                    ),
+                    self.PLAYURL_TIMEOUT,
+                    "预取视频流",
+                )
+            )
+            side_tasks.append(streams_task)
 
         url = f"https://bilibili.com/{video_info.bvid}"
         url += f"?p={page_info.index + 1}" if page_info.index > 0 else ""
 
         # 视频下载任务
         async def download_video():
-            output_path = pconfig.cache_dir / f"{video_info.bvid}-{page_num}.mp4"
+            output_path = self.video_cache_path(video_info.bvid, page_info.index)
             if output_path.exists():
                 return output_path
-            v_url, a_url = await self.extract_download_urls(
-                video=video, page_index=page_info.index
-            )
             if page_info.duration > pconfig.duration_maximum:
                 raise DurationLimitException
+            # 等待预取完成, 视频流地址未过期时直接命中缓存
+            if streams_task:
+                await streams_task
+            v_url, a_url = await self.extract_download_urls(
+                video=video, page_index=page_info.index, cid=page_info.cid
+            )
             if a_url is not None:
+                # 保留音轨, 之后 bm 同一视频时无需再次下载
                 return await DOWNLOADER.download_av_and_merge(
-                    v_url, a_url, output_path=output_path, ext_headers=self.headers
+                    v_url,
+                    a_url,
+                    output_path=output_path,
+                    audio_path=self.audio_cache_path(video_info.bvid, page_info.index),
+                    ext_headers=self.headers,
                 )
             else:
                 return await DOWNLOADER.streamd(
@@ -223,25 +323,12 @@ class BilibiliParser(BaseParser):
         except Exception as e:
             logger.warning(f"[BiliParser] 统计数据提取异常: {e}")
 
-        # 使用BV-AV转换算法将BV号转换为AV号
-        bvid = video_info.bvid
-        try:
-            if bvid.startswith("BV"):
-                # 使用类中已封装的bv2av方法进行转换
-                video_oid = self.bv2av(bvid)
-                logger.debug(f"[BiliParser] BV号 {bvid} 转换为AV号 {video_oid}")
-            else:
-                # 如果不是BV号，直接使用
-                video_oid = int(bvid)
-        except Exception as e:
-            logger.error(f"[BiliParser] BV-AV转换失败: {e}")
-            # 转换失败时使用BV号的数值形式作为oid
-            video_oid = int(bvid.replace("BV", ""), 36)
-            logger.debug(f"[BiliParser] 使用备用方法获取oid: {video_oid}")
-
-        # 获取评论数据 - _fetch_comments方法已经处理好所有数据
-        comments = await self._fetch_comments(video_oid, 1)  # type=1 表示视频
-        processed_comments = comments or []
+        # 等待并发的附属请求, 超时或失败的项降级为空
+        comments = await comments_task
+        if ai_task is None:
+            ai_summary = "哔哩哔哩 cookie 未配置或失效, 无法使用 AI 总结"
+        else:
+            ai_summary = await ai_task or "AI 总结获取超时或失败"
 
         # 构造 extra_data
         extra_data = {
@@ -252,7 +339,7 @@ class BilibiliParser(BaseParser):
             "type_icon": "fa-circle-play",
             "author_id": str(video_info.owner.mid),
             "content_id": video_info.bvid,
-            "comments": processed_comments,
+            "comments": comments or [],
         }
         logger.debug(f"Video extra data: {extra_data}")
 
@@ -285,7 +372,11 @@ class BilibiliParser(BaseParser):
         logger.debug(f"B站动态链接 dynamic_info_data 原始：{dynamic_info_data}")
         dynamic_info = convert(dynamic_info_data, DynamicData).item
 
-        author = self.create_author(dynamic_info.name, dynamic_info.avatar)
+        author = self.create_author(
+            dynamic_info.name,
+            dynamic_info.avatar,
+            user_id=dynamic_info.modules.module_author.mid,
+        )
 
         # 下载图片
         contents: list[MediaContent] = []
@@ -403,7 +494,9 @@ class BilibiliParser(BaseParser):
                     bvid = archive_data.get("bvid")
                     if bvid:
                         try:
-                            repost_result = await self.parse_video(bvid=bvid)
+                            repost_result = await self.parse_video(
+                                bvid=bvid, prefetch_streams=False
+                            )
                             # 使用解析结果更新源动态信息
                             if repost_result.title:
                                 orig_title = repost_result.title
@@ -591,7 +684,7 @@ class BilibiliParser(BaseParser):
         if not author_name and hasattr(opus_data, "name_avatar"):
             author_name, author_face = opus_data.name_avatar
 
-        author = self.create_author(author_name, author_face)
+        author = self.create_author(author_name, author_face, user_id=author_mid)
 
         # 按顺序处理图文内容（参考 parse_read 的逻辑）
         contents: list[MediaContent] = []
@@ -838,7 +931,11 @@ class BilibiliParser(BaseParser):
         return self.result(
             title=favdata.title,
             timestamp=favdata.timestamp,
-            author=self.create_author(favdata.info.upper.name, favdata.info.upper.face),
+            author=self.create_author(
+                favdata.info.upper.name,
+                favdata.info.upper.face,
+                user_id=favdata.info.upper.mid,
+            ),
             contents=[
                 self.create_graphics_content(fav.cover, fav.desc)
                 for fav in favdata.medias
@@ -868,6 +965,7 @@ class BilibiliParser(BaseParser):
         bvid: str | None = None,
         avid: int | None = None,
         page_index: int = 0,
+        cid: int | None = None,
     ) -> tuple[str, str | None]:
         """解析视频下载链接
 
@@ -875,6 +973,7 @@ class BilibiliParser(BaseParser):
             bvid (str | None): bvid
             avid (int | None): avid
             page_index (int): 页索引 = 页码 - 1
+            cid (int | None): 分集 cid, 已知时可省去一次分集查询
         """
 
         from bilibili_api.video import (
@@ -886,12 +985,25 @@ class BilibiliParser(BaseParser):
         if video is None:
             video = await self._get_video(bvid=bvid, avid=avid)
 
+        cache_key: StreamsKey = (
+            video.get_bvid(),
+            page_index,
+            self._video_quality,
+            tuple(self._video_codecs),
+        )
+        if (urls := self._streams_cache.get(cache_key)) is not None:
+            logger.debug(f"视频流地址命中缓存: {cache_key}")
+            return urls
+
         # 获取下载数据
-        download_url_data = await video.get_download_url(page_index=page_index)
+        if cid is not None:
+            download_url_data = await video.get_download_url(cid=cid)
+        else:
+            download_url_data = await video.get_download_url(page_index=page_index)
         detecter = VideoDownloadURLDataDetecter(download_url_data)
         streams = detecter.detect_best_streams(
-            video_max_quality=pconfig.bili_video_quality,
-            codecs=pconfig.bili_video_codes,
+            video_max_quality=self._video_quality,
+            codecs=self._video_codecs,
             no_dolby_video=True,
             no_hdr=True,
         )
@@ -904,9 +1016,90 @@ class BilibiliParser(BaseParser):
 
         audio_stream = streams[1]
         if not isinstance(audio_stream, AudioStreamDownloadURL):
-            return video_stream.url, None
-        logger.debug(f"音频流质量: {audio_stream.audio_quality.name}")
-        return video_stream.url, audio_stream.url
+            urls = (video_stream.url, None)
+        else:
+            logger.debug(f"音频流质量: {audio_stream.audio_quality.name}")
+            urls = (video_stream.url, audio_stream.url)
+        self._streams_cache.set(cache_key, urls, ttl=self._playurl_ttl(*urls))
+        return urls
+
+    @staticmethod
+    def video_cache_path(bvid: str, page_index: int = 0) -> Path:
+        """视频缓存路径, 以 bvid 和页码命名"""
+        return pconfig.cache_dir / f"{bvid}-{page_index + 1}.mp4"
+
+    @staticmethod
+    def audio_cache_path(bvid: str, page_index: int = 0) -> Path:
+        """音轨缓存路径, 与视频缓存使用相同的键
+
+        DASH 音轨和从视频中复制的音轨都是 mp4 容器的 AAC, 以 .m4a 保存
+        """
+        return pconfig.cache_dir / f"{bvid}-{page_index + 1}.m4a"
+
+    async def download_audio(self, bvid: str, page_index: int = 0) -> Path | None:
+        """下载视频音轨, 优先复用已缓存的音轨或已下载的视频
+
+        Args:
+            bvid (str): bvid
+            page_index (int): 页索引 = 页码 - 1
+
+        Returns:
+            Path | None: 音频路径, 没有可下载的音频时返回 None
+        """
+        audio_path = self.audio_cache_path(bvid, page_index)
+        if audio_path.exists():
+            logger.debug(f"音轨命中缓存: {audio_path.name}")
+            return audio_path
+
+        video_path = self.video_cache_path(bvid, page_index)
+        if video_path.exists():
+            try:
+                await extract_audio(video_path, audio_path)
+                return audio_path
+            except RuntimeError as e:
+                logger.warning(f"从 {video_path.name} 提取音轨失败: {e}")
+                await safe_unlink(audio_path)
+
+        _, a_url = await self.extract_download_urls(bvid=bvid, page_index=page_index)
+        if not a_url:
+            return None
+        # 先下载为 .part 文件, 完成后才替换为缓存的音轨
+        part_name = f"{audio_path.name}.part"
+        try:
+            part_path = await DOWNLOADER.download_audio(
+                a_url, audio_name=part_name, ext_headers=self.headers
+            )
+        except BaseException:
+            await safe_unlink(audio_path.with_name(part_name))
+            raise
+        os.replace(part_path, audio_path)
+        return audio_path
+
+    async def _get_video_info(self, video: Video) -> dict[str, Any]:
+        """获取视频信息, 短时间内重复解析同一视频时使用缓存"""
+        bvid = video.get_bvid()
+        if (info := self._video_info_cache.get(bvid)) is not None:
+            logger.debug(f"视频信息命中缓存: {bvid}")
+            return info
+        info = await video.get_info()
+        self._video_info_cache.set(bvid, info)
+        return info
+
+    @classmethod
+    def _playurl_ttl(cls, *urls: str | None) -> float:
+        """根据视频流地址中的 deadline 参数计算可缓存时间, 单位: 秒"""
+        from urllib.parse import parse_qs, urlparse
+
+        deadlines: list[int] = []
+        for url in urls:
+            if not url:
+                continue
+            deadline = parse_qs(urlparse(url).query).get("deadline")
+            if deadline and deadline[0].isdigit():
+                deadlines.append(int(deadline[0]))
+        if not deadlines:
+            return cls.PLAYURL_TTL
+        return min(deadlines) - time.time() - cls.PLAYURL_EXPIRE_MARGIN
 
     def _save_credential(self):
         """存储哔哩哔哩登录凭证"""
@@ -970,6 +1163,45 @@ class BilibiliParser(BaseParser):
             logger.info(f"`parser_bili_ck` 已过期, 尝试从 {self._cookies_file} 加载")
             self._load_credential()
 
+    async def _wait_with_timeout(
+        self, aw: Awaitable[T], timeout: float, desc: str
+    ) -> T | None:
+        """限时等待附属请求, 超时或失败时返回 None, 不拖慢卡片生成
+
+        Args:
+            aw: 可等待对象
+            timeout: 超时时间, 单位: 秒
+            desc: 日志中的请求描述
+        """
+        try:
+            return await asyncio.wait_for(aw, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"[BiliParser] {desc}超时({timeout}s), 已跳过")
+        except Exception as e:
+            logger.warning(f"[BiliParser] {desc}失败: {e}")
+        return None
+
+    def _create_comments_task(
+        self, oid: int, type: int = 1
+    ) -> asyncio.Task[list[dict[str, Any]] | None]:
+        """创建限时的热评获取任务, type 默认为 1 (视频)"""
+        return asyncio.create_task(
+            self._wait_with_timeout(
+                self._fetch_comments(oid, type), self.COMMENTS_TIMEOUT, "获取热评"
+            )
+        )
+
+    async def _fetch_ai_summary(self, video: Video, page_info: "PageInfo") -> str:
+        """获取视频 AI 总结"""
+        from .video import AIConclusion
+
+        if page_info.cid is not None:
+            cid = page_info.cid
+        else:
+            cid = await video.get_cid(page_info.index)
+        ai_conclusion = await video.get_ai_conclusion(cid)
+        return convert(ai_conclusion, AIConclusion).summary
+
     async def _fetch_comments(self, oid: int, type: int) -> list[dict[str, Any]] | None:
         """从Bilibili API获取评论数据
 
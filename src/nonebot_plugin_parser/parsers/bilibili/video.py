@@ -29,6 +29,8 @@ class Page(Struct):
     """创建时间戳"""
     duration: int
     """时长"""
+    cid: int | None = None
+    """分集 cid"""
     first_frame: str | None = None
     """封面图片"""
 
@@ -40,6 +42,7 @@ class PageInfo:
     duration: int
     timestamp: int
     cover: str | None = None
+    cid: int | None = None
 
 
 class VideoInfo(Struct):
@@ -63,6 +66,10 @@ class VideoInfo(Struct):
     """封面图片"""
     pages: list[Page] | None = None
     """分集信息"""
+    aid: int | None = None
+    """aid"""
+    cid: int | None = None
+    """首个分集 cid"""
 
     @property
     def title_with_part(self) -> str:
@@ -108,6 +115,7 @@ class VideoInfo(Struct):
         duration = self.duration
         cover = self.pic
         timestamp = self.pubdate
+        cid = self.cid
 
         if self.pages and len(self.pages) > 1:
             page_idx = page_idx % len(self.pages)
@@ -116,6 +124,7 @@ class VideoInfo(Struct):
             duration = page.duration
             cover = page.first_frame
             timestamp = page.ctime
+            cid = page.cid
 
         return PageInfo(
             index=page_idx,
@@ -123,6 +132,7 @@ class VideoInfo(Struct):
             duration=duration,
             timestamp=timestamp,
             cover=cover,
+            cid=cid,
         )
 
 
@@ -12,6 +12,7 @@ from ..base import (
     ParseException,
     handle,
 )
+from ..embedded_json import extract_json
 
 
 class DouyinParser(BaseParser):
@@ -73,16 +74,11 @@ class DouyinParser(BaseParser):
                 raise ParseException(f"status: {response.status_code}")
             text = response.text
 
-        pattern = re.compile(
-            pattern=r"window\._ROUTER_DATA\s*=\s*(.*?)</script>",
-            flags=re.DOTALL,
-        )
-        matched = pattern.search(text)
-
-        if not matched or not matched[1]:
+        raw = extract_json(text, "window._ROUTER_DATA")
+        if raw is None:
             raise ParseException("can't find _ROUTER_DATA in html")
 
-        video_data = video.decoder.decode(matched[1].strip()).video_data
+        video_data = video.decoder.decode(raw).video_data
         # 使用新的简洁构建方式
         contents = []
 
@@ -97,7 +93,11 @@ class DouyinParser(BaseParser):
             contents.append(self.create_video_content(video_url, cover_url, duration))
 
         # 构建作者
-        author = self.create_author(video_data.author.nickname, video_data.avatar_url)
+        author = self.create_author(
+            video_data.author.nickname,
+            video_data.avatar_url,
+            user_id=video_data.author.sec_uid,
+        )
 
         return self.result(
             title=video_data.desc,
@@ -130,7 +130,9 @@ class DouyinParser(BaseParser):
             contents.extend(self.create_dynamic_contents(dynamic_urls))
 
         # 构建作者
-        author = self.create_author(slides_data.name, slides_data.avatar_url)
+        author = self.create_author(
+            slides_data.name, slides_data.avatar_url, user_id=slides_data.author.sec_uid
+        )
 
         return self.result(
             title=slides_data.desc,
@@ -28,6 +28,7 @@ class Avatar(Struct):
 
 class Author(Struct):
     nickname: str
+    sec_uid: str = ""
     # avatar_larger: Avatar
     avatar_thumb: Avatar
 
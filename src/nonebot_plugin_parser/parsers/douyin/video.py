@@ -12,6 +12,7 @@ class Avatar(Struct):
 
 class Author(Struct):
     nickname: str
+    sec_uid: str = ""
     avatar_thumb: Avatar | None = None
     avatar_medium: Avatar | None = None
 
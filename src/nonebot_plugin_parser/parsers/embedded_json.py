@@ -0,0 +1,104 @@
+"""提取服务端渲染页面中内嵌的 JSON 数据
+
+抖音 (window._ROUTER_DATA), 小红书 (window.__INITIAL_STATE__), 快手 (window.INIT_STATE),
+AcFun (window.videoInfo) 和 TapTap (__NUXT_DATA__) 都把页面数据以 JS 字面量的形式写在 <script> 中.
+这里找到赋值位置后确定字面量的范围, 并把字符串之外的 undefined / NaN / Infinity 替换为 null,
+结果可直接交给 msgspec 解码.
+
+浏览器遇到 </script 就会结束脚本, 字面量必然在它之前. 字面量之后通常只有分号和空白,
+此时用 msgspec 校验即可; 否则交给 json 的 C 扫描器做一次括号配对, 找到字面量的结尾
+"""
+
+import re
+import json
+from functools import cache
+
+import msgspec
+
+_JS_ONLY = re.compile(r"undefined|NaN|Infinity")
+"""JSON 中不存在的 JS 字面量, 可能位于字符串中"""
+_ESCAPED_QUOTE = re.compile(r'(?<!\\)\\(?:\\\\)*"')
+"""字符串中转义的引号"""
+_IDENTIFIER_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$.")
+_RAW_DECODER = json.JSONDecoder()
+
+
+@cache
+def _start_pattern(marker: str) -> re.Pattern[str]:
+    # 赋值: marker = {...}, 或 <script id="marker" ...>[...]</script>
+    return re.compile(re.escape(marker) + r"""(?:\s*=\s*|["']?[^<>]*>\s*)(?=[\[{])""")
+
+
+def extract_json(html: str, *markers: str) -> str | None:
+    """提取 marker 之后的 JSON 字面量
+
+    Args:
+        html (str): 页面 HTML
+        *markers (str): 赋值目标或 script 标签 id, 按顺序尝试, 如 "window.__INITIAL_STATE__"
+
+    Returns:
+        str | None: JSON 文本, 找不到或不是合法的字面量时为 None
+    """
+    for marker in markers:
+        if (start := _find_start(html, marker)) is None:
+            continue
+        end = html.find("</script", start)
+        if end == -1:
+            end = len(html)
+        while end > start and html[end - 1] in " \t\r\n;":
+            end -= 1
+
+        raw = _normalize(html, start, end)
+        try:
+            msgspec.json.decode(raw, type=msgspec.Raw)
+            return raw
+        except msgspec.DecodeError:
+            pass
+        # 字面量之后还有其他语句, 按括号配对找到结尾
+        try:
+            _, length = _RAW_DECODER.raw_decode(raw)
+        except ValueError:
+            continue
+        return raw[:length]
+    return None
+
+
+def _find_start(html: str, marker: str) -> int | None:
+    pos = html.find(marker)
+    while pos != -1:
+        if matched := _start_pattern(marker).match(html, pos):
+            return matched.end()
+        pos = html.find(marker, pos + len(marker))
+    return None
+
+
+def _normalize(html: str, start: int, end: int) -> str:
+    """截取 [start, end), 并把字符串之外的 JS 字面量替换为 null"""
+    if all(html.find(word, start, end) == -1 for word in ("undefined", "NaN", "Infinity")):
+        return html[start:end]
+
+    parts: list[str] = []
+    last = scanned = start
+    in_string = False
+    for token in _JS_ONLY.finditer(html, start, end):
+        token_start, token_end = token.span()
+        if html[token_start - 1] in _IDENTIFIER_CHARS or (
+            token_end < end and html[token_end] in _IDENTIFIER_CHARS
+        ):
+            continue
+        # 根据未转义引号数量的奇偶判断是否位于字符串中
+        quotes = html.count('"', scanned, token_start)
+        quotes -= len(_ESCAPED_QUOTE.findall(html, scanned, token_start))
+        in_string ^= quotes % 2 == 1
+        scanned = token_start
+        if in_string:
+            continue
+        if html[token_start - 1] == "-":
+            token_start -= 1
+        parts.append(html[last:token_start])
+        parts.append("null")
+        last = token_end
+    if not parts:
+        return html[start:end]
+    parts.append(html[last:end])
+    return "".join(parts)
@@ -0,0 +1,160 @@
+"""HTML 定点提取
+
+NGA 帖子页, 推特 xdown 结果页和微博文章都只需要页面中的少数节点.
+安装了 lxml 时使用 lxml (libxml2) 解析; 否则退回 BeautifulSoup 的纯 Python 解析器,
+只按 id 提取时通过 SoupStrainer 只构建需要的节点.
+两种后端对外提供相同的接口, 文本提取的语义与 BeautifulSoup 的 get_text 一致
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any
+from collections.abc import Iterable, Iterator
+
+
+class Element(ABC):
+    """HTML 元素"""
+
+    @property
+    @abstractmethod
+    def tag(self) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, attr: str) -> str | None:
+        """读取属性"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def strings(self) -> Iterator[str]:
+        """元素内的文本片段, 不含注释和 script / style"""
+        raise NotImplementedError
+
+    def text(self, separator: str = "", strip: bool = True) -> str:
+        """同 BeautifulSoup 的 get_text"""
+        if strip:
+            return separator.join(s for s in map(str.strip, self.strings()) if s)
+        return separator.join(self.strings())
+
+    def has_class(self, class_: str) -> bool:
+        return class_ in (self.get("class") or "").split()
+
+
+class Document(ABC):
+    """已解析的 HTML 文档"""
+
+    @abstractmethod
+    def by_id(self, id_: str) -> Element | None:
+        """按 id 查找元素"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter(self, *tags: str) -> Iterator[Element]:
+        """按文档顺序遍历指定标签的元素"""
+        raise NotImplementedError
+
+    def find(self, tag: str) -> Element | None:
+        """第一个指定标签的元素"""
+        return next(self.iter(tag), None)
+
+
+try:
+    from lxml import etree
+    from lxml.html import HTMLParser, fromstring
+
+    _PARSER = HTMLParser(encoding="utf-8")
+    _STRINGS = etree.XPath(".//text()[not(ancestor::script or ancestor::style)]")
+    BACKEND = "lxml"
+except ImportError:
+    BACKEND = "html.parser"
+"""当前使用的解析后端"""
+
+
+class _LxmlElement(Element):
+    __slots__ = ("_element",)
+
+    def __init__(self, element: Any):
+        self._element = element
+
+    @property
+    def tag(self) -> str:
+        return self._element.tag
+
+    def get(self, attr: str) -> str | None:
+        return self._element.get(attr)
+
+    def strings(self) -> Iterator[str]:
+        return iter(_STRINGS(self._element))
+
+
+class _LxmlDocument(Document):
+    def __init__(self, html: str):
+        # 页面可能声明了 gbk 等编码, 统一以 utf-8 字节交给 libxml2
+        try:
+            self._root = fromstring(html.encode(), parser=_PARSER)
+        except etree.ParserError:
+            # 空文档
+            self._root = None
+
+    def by_id(self, id_: str) -> Element | None:
+        if self._root is None:
+            return None
+        found = self._root.xpath("//*[@id=$id]", id=id_)
+        return _LxmlElement(found[0]) if found else None
+
+    def iter(self, *tags: str) -> Iterator[Element]:
+        if self._root is None:
+            return
+        for element in self._root.iter(*tags):
+            yield _LxmlElement(element)
+
+
+class _SoupElement(Element):
+    __slots__ = ("_tag",)
+
+    def __init__(self, tag: Any):
+        self._tag = tag
+
+    @property
+    def tag(self) -> str:
+        return self._tag.name
+
+    def get(self, attr: str) -> str | None:
+        value = self._tag.get(attr)
+        if isinstance(value, list):
+            return " ".join(value)
+        return value
+
+    def strings(self) -> Iterator[str]:
+        return self._tag.strings
+
+
+class _SoupDocument(Document):
+    def __init__(self, html: str, ids: Iterable[str]):
+        from bs4 import SoupStrainer, BeautifulSoup
+
+        # 只需要少数几个 id 时跳过其余节点; 按标签过滤时大部分节点仍会被构建, 反而更慢
+        strainer = SoupStrainer(id=ids) if (ids := list(ids)) else None
+        self._soup = BeautifulSoup(html, "html.parser", parse_only=strainer)
+
+    def by_id(self, id_: str) -> Element | None:
+        tag = self._soup.find(id=id_)
+        return _SoupElement(tag) if tag is not None else None
+
+    def iter(self, *tags: str) -> Iterator[Element]:
+        for tag in self._soup.find_all(list(tags)):
+            yield _SoupElement(tag)
+
+
+def parse_html(html: str, ids: Iterable[str] = ()) -> Document:
+    """解析 HTML
+
+    Args:
+        html (str): HTML 文本
+        ids (Iterable[str]): 只需要按 id 查找的元素时传入, BeautifulSoup 后端只构建这些元素
+
+    Returns:
+        Document: 文档
+    """
+    if BACKEND == "lxml":
+        return _LxmlDocument(html)
+    return _SoupDocument(html, ids)
@@ -0,0 +1,106 @@
+"""按用途改写图片 URL
+
+各平台 CDN 都支持在 URL 中指定图片尺寸, 解析结果中的原图往往远大于实际显示尺寸.
+这里按图片用途向 CDN 请求合适的尺寸:
+
+- AVATAR: 头像, 卡片中最大显示 64px
+- THUMB: 视频封面等只在卡片中显示的图片, 显示宽度为几百像素
+- FULL: 合并转发中发送的图片, 使用平台网页端查看大图时的尺寸, 而不是上传的原图
+"""
+
+import re
+from enum import Enum
+from urllib.parse import urlsplit
+from collections.abc import Callable
+
+from nonebot import logger
+
+
+class ImageUse(str, Enum):
+    AVATAR = "avatar"
+    THUMB = "thumb"
+    FULL = "full"
+
+
+Rewriter = Callable[[str, ImageUse], str]
+
+_REWRITERS: dict[str, Rewriter] = {}
+"""CDN 域名后缀 -> 改写函数"""
+
+
+def _register(*host_suffixes: str):
+    def decorator(func: Rewriter) -> Rewriter:
+        for suffix in host_suffixes:
+            _REWRITERS[suffix] = func
+        return func
+
+    return decorator
+
+
+def rewrite_image_url(url: str, use: ImageUse) -> str:
+    """按用途改写图片 URL, 不认识的 CDN 原样返回
+
+    Args:
+        url (str): 图片 URL
+        use (ImageUse): 图片用途
+
+    Returns:
+        str: 改写后的 URL
+    """
+    host = urlsplit(url).hostname or ""
+    for suffix, rewriter in _REWRITERS.items():
+        if host == suffix or host.endswith(f".{suffix}"):
+            try:
+                return rewriter(url, use)
+            except Exception as e:
+                logger.debug(f"图片 URL 改写失败: {e}, url: {url}")
+                return url
+    return url
+
+
+# B站: https://i0.hdslb.com/bfs/archive/xxx.jpg@{w}w_{h}h_1c.webp
+_BILI_SUFFIXES = {
+    ImageUse.AVATAR: "@128w_128h_1c.webp",
+    ImageUse.THUMB: "@720w.webp",
+}
+
+
+@_register("hdslb.com", "biliimg.com")
+def _bilibili(url: str, use: ImageUse) -> str:
+    url = url.split("@", 1)[0]
+    # 动图缩放后会变成静态图, 只处理头像
+    if url.lower().endswith(".gif") and use is not ImageUse.AVATAR:
+        return url
+    return url + _BILI_SUFFIXES.get(use, "")
+
+
+# 微博: https://wx1.sinaimg.cn/{large|mw2000|mw690|orj360|thumb180}/xxx.jpg
+_WEIBO_SIZE = re.compile(
+    r"(?<=sinaimg\.cn/)(?:large|original|woriginal|bmiddle|mw\d+|orj\d+|thumb\d+|wap\d+)(?=/)"
+)
+_WEIBO_SIZES = {
+    ImageUse.AVATAR: "thumb180",
+    ImageUse.THUMB: "mw690",
+    ImageUse.FULL: "mw2000",
+}
+
+
+@_register("sinaimg.cn")
+def _weibo(url: str, use: ImageUse) -> str:
+    # 头像路径形如 /crop.0.0.180.180.180/xxx.jpg, 不匹配时保持原样
+    return _WEIBO_SIZE.sub(_WEIBO_SIZES[use], url, count=1)
+
+
+# 小红书: 笔记图片 https://sns-webpic-qc.xhscdn.com/.../xxx!nd_dft_wlteh_webp_3
+#         头像 https://sns-avatar-qc.xhscdn.com/avatar/xxx?imageView2/2/w/540/format/jpg
+_XHS_AVATAR_WIDTH = re.compile(r"(?<=imageView2/2/w/)\d+")
+
+
+@_register("xhscdn.com")
+def _xiaohongshu(url: str, use: ImageUse) -> str:
+    if use is ImageUse.AVATAR:
+        return _XHS_AVATAR_WIDTH.sub("120", url, count=1)
+    if use is ImageUse.THUMB:
+        # prv 为预览图样式, dft 为详情页大图样式
+        return url.replace("!nd_dft_", "!nd_prv_", 1)
+    return url
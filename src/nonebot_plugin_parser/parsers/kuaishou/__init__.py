@@ -5,6 +5,7 @@ from httpx import AsyncClient
 
 from ..base import BaseParser, PlatformEnum, ParseException, handle
 from ..data import Platform
+from ..embedded_json import extract_json
 
 
 class KuaiShouParser(BaseParser):
@@ -43,13 +44,10 @@ class KuaiShouParser(BaseParser):
             response.raise_for_status()
             response_text = response.text
 
-        pattern = r"window\.INIT_STATE\s*=\s*(.*?)</script>"
-        matched = re.search(pattern, response_text)
-
-        if not matched:
+        raw = extract_json(response_text, "window.INIT_STATE")
+        if raw is None:
             raise ParseException("failed to parse video JSON info from HTML")
 
-        raw = matched[1].strip()
         data_map = states.decoder.decode(raw)
 
         photo = next((d.photo for d in data_map.values() if d.photo is not None), None)
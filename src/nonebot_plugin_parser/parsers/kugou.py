@@ -5,6 +5,8 @@ from re import Match
 from typing import ClassVar
 from difflib import SequenceMatcher
 
+from nonebot import logger
+
 from .base import (
     BaseParser,
     PlatformEnum,
@@ -12,8 +14,14 @@ from .base import (
     handle,
 )
 from .data import Platform, ImageContent, MediaContent
+from ..utils import TTLCache
 from ..config import pconfig
 from ..constants import COMMON_HEADER
+from .music_cache import MUSIC_CACHE, MusicTrack
+
+
+class _StaleMatch(ParseException):
+    """搜索结果中第 n 首已不是之前匹配的歌曲"""
 
 
 class KuGouParser(BaseParser):
@@ -22,6 +30,14 @@ class KuGouParser(BaseParser):
         name=PlatformEnum.KUGOU, display_name="酷狗音乐"
     )
 
+    MATCH_TTL: ClassVar[float] = 24 * 3600
+    """分享页标题 -> 匹配歌曲的缓存时间, 单位: 秒"""
+
+    def __init__(self):
+        super().__init__()
+        # 内嵌 hash 或清理后的搜索标题 -> (搜索结果序号, hash)
+        self._match_cache = TTLCache[str, tuple[int, str]](self.MATCH_TTL, max_size=1024)
+
     async def search_songs(self, title: str, n: int | None = None) -> list:
         """搜索歌曲函数"""
         from httpx import AsyncClient
@@ -55,7 +71,8 @@ class KuGouParser(BaseParser):
             else:
                 raise ParseException("接口返回数据格式未知")
 
-    def _extract_embedded_info(self, html_text: str) -> dict:
+    @staticmethod
+    def _extract_embedded_info(html_text: str) -> dict:
         """提取页面内嵌的歌曲信息"""
         if smarty_match := re.search(
             r"var dataFromSmarty\s*=\s*(\[.*?\]),", html_text, re.DOTALL
@@ -76,6 +93,113 @@ class KuGouParser(BaseParser):
         # 只保留字母(a-zA-Z)、数字(0-9)和汉字(\u4e00-\u9fa5)
         return re.sub(r"[^\w\u4e00-\u9fa5]", "", title)
 
+    def _match_song(self, songs: list, embedded_info: dict, page_title: str, page_author: str) -> dict:
+        """从搜索结果中选出与分享页最匹配的歌曲"""
+        best_match = None
+        best_score = 0
+
+        # 计算匹配分数
+
+        for song in songs:
+            # 1. 优先匹配内嵌hash
+            if (
+                embedded_info
+                and "hash" in embedded_info
+                and song.get("hash", "").upper() == embedded_info["hash"]
+            ):
+                return song
+
+            # 2. 计算标题相似度
+            title_similarity = SequenceMatcher(
+                None, str(song.get("title", "")).lower(), str(page_title).lower()
+            ).ratio()
+
+            # 3. 计算作者相似度
+            author_similarity = SequenceMatcher(
+                None, str(song.get("singer", "")).lower(), str(page_author).lower()
+            ).ratio()
+
+            # 综合评分 = 标题相似度 * 0.6 + 作者相似度 * 0.4
+            total_score = title_similarity * 0.6 + author_similarity * 0.4
+
+            if total_score > best_score:
+                best_score = total_score
+                best_match = song
+
+        # 没有匹配结果时默认选择第一首
+        return best_match or songs[0]
+
+    async def _find_match(
+        self,
+        match_key: str,
+        search_title: str,
+        fallback_title: str,
+        embedded_info: dict,
+        page_title: str,
+        page_author: str,
+    ) -> tuple[int, str]:
+        """搜索并匹配歌曲, 返回 (搜索结果序号, hash), 同一分享页的匹配结果会被缓存"""
+        if (matched := self._match_cache.get(match_key)) is not None:
+            return matched
+
+        # 搜索歌曲
+        try:
+            songs = await self.search_songs(search_title)
+        except Exception:
+            try:
+                songs = await self.search_songs(fallback_title)
+            except Exception as e:
+                raise ParseException(f"使用标题二次搜索失败: {e}") from e
+
+        if not songs:
+            raise ParseException("未搜索到相关歌曲")
+
+        # 匹配最佳歌曲
+        best_match = self._match_song(songs, embedded_info, page_title, page_author)
+        matched = (best_match.get("n", 1), best_match.get("hash", "").upper())
+        self._match_cache.set(match_key, matched)
+        return matched
+
+    async def _fetch_track(
+        self, search_title: str, n: int, hash_value: str, page_title: str, page_author: str
+    ) -> MusicTrack:
+        """获取搜索结果中第 n 首歌曲的详细信息"""
+        try:
+            song_info = await self.search_songs(search_title, n=n)
+        except Exception as e:
+            raise ParseException(f"歌曲信息获取失败: {e}") from e
+
+        # 确保song_info是列表
+        if not isinstance(song_info, list):
+            song_info = [song_info]
+
+        if not song_info:
+            raise ParseException("未获取到歌曲详细信息")
+
+        song_details = song_info[0]
+        # 搜索结果的顺序可能变化, 序号对应的歌曲需与匹配时一致
+        song_hash = str(song_details.get("hash", "")).upper()
+        if hash_value and song_hash and song_hash != hash_value:
+            raise _StaleMatch(f"第 {n} 首搜索结果已变化: {song_hash} != {hash_value}")
+
+        audio_url = song_details.get("music_url", "")
+        if not audio_url:
+            raise ParseException("未找到音频资源")
+
+        duration = float(song_details.get("duration", 0))
+        return MusicTrack(
+            title=song_details.get("title", page_title),
+            artist=song_details.get("singer", page_author),
+            audio_url=audio_url,
+            cover_url=song_details.get("cover", ""),
+            lyric=song_details.get("lyrics", ""),
+            duration=duration,
+            info=f"时长: {int(duration // 60)}:{int(duration % 60):02d}",
+            link=song_details.get(
+                "link", f"https://www.kugou.com/song/#hash={hash_value}"
+            ),
+        )
+
     @handle(
         "kugou.com",
         r"https?://[^\s]*?kugou\.com.*?(?:/share/[a-zA-Z0-9]+\.html|(?:id|chain)=[a-zA-Z0-9]+)",
@@ -95,9 +219,13 @@ class KuGouParser(BaseParser):
             response.raise_for_status()
             html_text = response.text
 
-            # 提取内嵌歌曲信息
-            embedded_info = self._extract_embedded_info(html_text)
+        # 提取内嵌歌曲信息, 有 hash 且已缓存时无需调用搜索接口
+        embedded_info = self._extract_embedded_info(html_text)
+        track = None
+        if embedded_hash := embedded_info.get("hash"):
+            track = MUSIC_CACHE.get(self.platform.name, embedded_hash)
 
+        if track is None:
             # 提取页面标题
             title_match = re.search(r"<title>(.+?)_(.+?)_高音质在线", html_text)
             if not title_match:
@@ -110,122 +238,72 @@ class KuGouParser(BaseParser):
             search_title_clean = self._clean_search_title(search_title)
             page_title_clean = self._clean_search_title(page_title)
 
-            # 搜索歌曲
-            try:
-                songs = await self.search_songs(search_title_clean)
-            except Exception:
+            # 有内嵌 hash 时以 hash 为键, 同名的其他版本不会命中
+            match_key = embedded_hash or search_title_clean
+            for retry in (False, True):
+                n, hash_value = await self._find_match(
+                    match_key,
+                    search_title_clean,
+                    page_title_clean,
+                    embedded_info,
+                    page_title,
+                    page_author,
+                )
                 try:
-                    songs = await self.search_songs(page_title_clean)
-                except Exception as e:
-                    raise ParseException(f"使用标题二次搜索失败: {e}") from e
-
-            if not songs:
-                raise ParseException("未搜索到相关歌曲")
-
-            # 匹配最佳歌曲
-            best_match = None
-            best_score = 0
-
-            # 计算匹配分数
-
-            for song in songs:
-                # 1. 优先匹配内嵌hash
-                if (
-                    embedded_info
-                    and "hash" in embedded_info
-                    and song.get("hash", "").upper() == embedded_info["hash"]
-                ):
-                    best_match = song
+                    track = await MUSIC_CACHE.get_or_fetch(
+                        self.platform.name,
+                        hash_value or embedded_hash or search_title_clean,
+                        lambda: self._fetch_track(
+                            search_title_clean, n, hash_value, page_title, page_author
+                        ),
+                    )
                     break
+                except _StaleMatch as e:
+                    # 缓存的序号已失效, 清除后重新搜索一次
+                    self._match_cache.pop(match_key)
+                    if retry:
+                        raise ParseException(f"歌曲匹配失败: {e}") from e
+                    logger.debug(f"酷狗匹配缓存失效: {e}")
 
-                # 2. 计算标题相似度
-                title_similarity = SequenceMatcher(
-                    None, str(song.get("title", "")).lower(), str(page_title).lower()
-                ).ratio()
-
-                # 3. 计算作者相似度
-                author_similarity = SequenceMatcher(
-                    None, str(song.get("singer", "")).lower(), str(page_author).lower()
-                ).ratio()
+        if track is None:
+            raise ParseException("酷狗音乐解析失败: 未找到匹配的歌曲")
 
-                # 综合评分 = 标题相似度 * 0.6 + 作者相似度 * 0.4
-                total_score = title_similarity * 0.6 + author_similarity * 0.4
+        # 创建有意义的音频文件名
+        audio_name = f"{track.title}-{track.artist}.mp3"
 
-                if total_score > best_score:
-                    best_score = total_score
-                    best_match = song
+        audio_content = self.create_audio_content(
+            track.audio_url, track.duration, audio_name=audio_name
+        )
 
-            # 检查匹配结果
-            if not best_match:
-                best_match = songs[0]  # 默认选择第一首
-
-            # 获取最佳匹配歌曲数据
-            _id = best_match.get("n", 1)
-
-            try:
-                song_info = await self.search_songs(search_title_clean, n=_id)
-            except Exception as e:
-                raise ParseException(f"歌曲信息获取失败: {e}") from e
+        # 创建封面图片内容
+        contents: list[MediaContent] = []
 
-            # 确保song_info是列表
-            if not isinstance(song_info, list):
-                song_info = [song_info]
-
-            if not song_info:
-                raise ParseException("未获取到歌曲详细信息")
-
-            song_details = song_info[0]
-
-            # 创建音频内容
-            audio_url = song_details.get("music_url", "")
-            if not audio_url:
-                raise ParseException("未找到音频资源")
-
-            # 创建有意义的音频文件名
-            audio_name = f"{song_details.get('title', 'unknown')}-{song_details.get('singer', 'unknown')}.mp3"
-
-            audio_content = self.create_audio_content(
-                audio_url, float(song_details.get("duration", 0)), audio_name=audio_name
-            )
-
-            # 创建封面图片内容
-            cover_url = song_details.get("cover", "")
-            contents: list[MediaContent] = []
-
-            if cover_url:
-                from ..download import DOWNLOADER
-
-                cover_content = ImageContent(
-                    DOWNLOADER.download_img(cover_url, ext_headers=self.headers)
-                )
-                contents.append(cover_content)
-
-            contents.append(audio_content)
-
-            # 构建歌词文本
-            lyric = song_details.get("lyrics", "")
-            text = f"歌词:\n{lyric}" if lyric else None
-
-            # 构建链接
-            hash_value = best_match.get("hash", "")
-            link = song_details.get(
-                "link", f"https://www.kugou.com/song/#hash={hash_value}"
-            )
+        if track.cover_url:
+            from ..download import DOWNLOADER
 
-            # 构建额外信息
-            extra = {
-                "info": f"时长: {int(float(song_details.get('duration', 0)) // 60)}"
-                f":{int(float(song_details.get('duration', 0)) % 60):02d}",
-                "type": "audio",
-                "type_tag": "音乐",
-                "type_icon": "fa-music",
-            }
-
-            return self.result(
-                title=song_details.get("title", page_title),
-                author=self.create_author(song_details.get("singer", page_author)),
-                url=link,
-                text=text,
-                contents=contents,
-                extra=extra,
+            cover_content = ImageContent(
+                DOWNLOADER.download_img(track.cover_url, ext_headers=self.headers)
             )
+            contents.append(cover_content)
+
+        contents.append(audio_content)
+
+        # 构建歌词文本
+        text = f"歌词:\n{track.lyric}" if track.lyric else None
+
+        # 构建额外信息
+        extra = {
+            "info": track.info,
+            "type": "audio",
+            "type_tag": "音乐",
+            "type_icon": "fa-music",
+        }
+
+        return self.result(
+            title=track.title,
+            author=self.create_author(track.artist),
+            url=track.link,
+            text=text,
+            contents=contents,
+            extra=extra,
+        )
@@ -0,0 +1,235 @@
+"""解析器清单
+
+记录每个平台的关键词, 正则和所在模块, 用于注册匹配规则.
+解析器模块 (以及 bilibili_api, protobuf 等依赖) 在第一次匹配到对应链接时才导入,
+禁用的平台不会被导入.
+
+新增或修改 @handle 时需同步更新这里, 导入解析器时会校验两者是否一致
+"""
+
+import importlib
+from typing import TYPE_CHECKING
+
+from msgspec import Struct
+from nonebot import logger
+
+from .data import Platform
+from ..utils import is_module_available
+from ..constants import PlatformEnum
+
+if TYPE_CHECKING:
+    from .base import BaseParser
+
+
+class ParserEntry(Struct, frozen=True):
+    platform: Platform
+    """平台, 与解析器的 platform 一致"""
+    module: str
+    """模块路径, 相对于 parsers 包"""
+    class_name: str
+    """解析器类名"""
+    key_patterns: tuple[tuple[str, str], ...]
+    """(关键词, 正则), 与解析器中 @handle 的参数一致"""
+    requires: str | None = None
+    """依赖的可选模块, 未安装时不启用"""
+
+    @property
+    def available(self) -> bool:
+        return self.requires is None or is_module_available(self.requires)
+
+
+MANIFEST: tuple[ParserEntry, ...] = (
+    ParserEntry(
+        Platform(name=PlatformEnum.NGA, display_name="NGA"),
+        ".nga",
+        "NGAParser",
+        (
+            ("nga.178.com", r"tid=(?P<tid>\d+)"),
+            ("bbs.nga.cn", r"tid=(?P<tid>\d+)"),
+            ("ngabbs.com", r"tid=(?P<tid>\d+)"),
+        ),
+    ),
+    ParserEntry(
+        Platform(name=PlatformEnum.KUWO, display_name="酷我音乐"),
+        ".kuwo",
+        "KuWoParser",
+        (
+            ("kuwo.cn", r"https?://[^\s]*?kuwo\.cn/play_detail/(\d+)"),
+        ),
+    ),
+    ParserEntry(
+        Platform(name=PlatformEnum.ACFUN, display_name="猴山"),
+        ".acfun",
+        "AcfunParser",
+        (
+            ("acfun.cn", r"(?:ac=|/ac)(?P<acid>\d+)"),
+        ),
+    ),
+    ParserEntry(
+        Platform(name=PlatformEnum.KUGOU, display_name="酷狗音乐"),
+        ".kugou",
+        "KuGouParser",
+        (
+            ("kugou.com", r"https?://[^\s]*?kugou\.com.*?(?:/share/[a-zA-Z0-9]+\.html|(?:id|chain)=[a-zA-Z0-9]+)"),
+        ),
+    ),
+    ParserEntry(
+        Platform(name=PlatformEnum.TIEBA, display_name="百度贴吧"),
+        ".tieba",
+        "TiebaParser",
+        (
+            ("tieba.baidu.com", r"tieba\.baidu\.com/p/(?P<post_id>\d+)"),
+        ),
+    ),
+    ParserEntry(
+        Platform(name=PlatformEnum.WEIBO, display_name="微博"),
+        ".weibo",
+        "WeiBoParser",
+        (
+            ("weibo.com/ttarticle", r"id=(?P<id>\d+)"),
+            ("weibo.com/article", r"/id/(?P<id>\d+)"),
+            ("mapp.api.weibo", r"mapp\.api\.weibo\.cn/fx/[0-9A-Za-z]+\.html"),
+            ("weibo.com/tv", r"weibo\.com/tv/show/\d{4}:\d+\?mid=(?P<mid>\d+)"),
+            ("video.weibo", r"video\.weibo\.com/show\?fid=(?P<fid>\d+:\d+)"),
+            ("m.weibo.cn", r"weibo\.cn/(?:status|detail|\d+)/(?P<wid>[0-9a-zA-Z]+)"),
+            ("weibo.com", r"weibo\.com/\d+/(?P<wid>[0-9a-zA-Z]+)"),
+        ),
+    ),
+    ParserEntry(
+        Platform(name=PlatformEnum.DOUYIN, display_name="抖音"),
+        ".douyin",
+        "DouyinParser",
+        (
+            ("jingxuan.douyin", r"jingxuan\.douyin.com/m/(?P<ty>slides|video|note)/(?P<vid>\d+)"),
+            ("iesdouyin", r"iesdouyin\.com/share/(?P<ty>slides|video|note)/(?P<vid>\d+)"),
+            ("jx.douyin", r"jx\.douyin\.com/[a-zA-Z0-9_\-]+"),
+            ("m.douyin", r"m\.douyin\.com/share/(?P<ty>slides|video|note)/(?P<vid>\d+)"),
+            ("v.douyin", r"v\.douyin\.com/[a-zA-Z0-9_\-]+"),
+            ("douyin", r"douyin\.com/(?P<ty>video|note)/(?P<vid>\d+)"),
+        ),
+    ),
+    ParserEntry(
+        Platform(name=PlatformEnum.TAPTAP, display_name="TapTap"),
+        ".taptap",
+        "TapTapParser",
+        (
+            ("taptap.cn/moment", r"taptap\.cn/moment/(\d+)"),
+            ("taptap.cn/review", r"taptap\.cn/review/(\d+)"),
+            ("taptap.cn/topic", r"taptap\.cn/topic/(\d+)"),
+            ("taptap.cn/user", r"taptap\.cn/user/(\d+)"),
+        ),
+    ),
+    ParserEntry(
+        Platform(name=PlatformEnum.NETEASE, display_name="网易云音乐"),
+        ".netease",
+        "NCMParser",
+        (
+            ("music.163.com", r"https?://[^\s]*?music\.163\.com.*?(?:id=\d+|song/\d+)"),
+            ("163cn.tv", r"https?://[^\s]*?163cn\.tv/[a-zA-Z0-9]+"),
+        ),
+    ),
+    ParserEntry(
+        Platform(name=PlatformEnum.QSMUSIC, display_name="汽水音乐"),
+        ".qsmusic",
+        "QSMusicParser",
+        (
+            ("qishui.douyin.com", r"https?://[^\s]*?qishui\.douyin\.com/s/([a-zA-Z0-9]+)/"),
+        ),
+    ),
+    ParserEntry(
+        Platform(name=PlatformEnum.TOUTIAO, display_name="今日头条"),
+        ".toutiao",
+        "ToutiaoParser",
+        (
+            ("toutiao.com", r"https?://[^\s]*?(?:toutiao\.com|ixigua\.com)/(?:is|video)/[^\s/]+/?"),
+            ("ixigua.com", r"https?://[^\s]*?(?:toutiao\.com|ixigua\.com)/(?:is|video)/[^\s/]+/?"),
+        ),
+    ),
+    ParserEntry(
+        Platform(name=PlatformEnum.TWITTER, display_name="小蓝鸟"),
+        ".twitter",
+        "TwitterParser",
+        (
+            ("x.com", r"x.com/[0-9-a-zA-Z_]{1,20}/status/([0-9]+)"),
+        ),
+    ),
+    ParserEntry(
+        Platform(name=PlatformEnum.BILIBILI, display_name="哔哩哔哩"),
+        ".bilibili",
+        "BilibiliParser",
+        (
+            ("/dynamic/", r"bilibili\.com/dynamic/(?P<dynamic_id>\d+)"),
+            ("live.bili", r"live\.bilibili\.com/(?P<room_id>\d+)"),
+            ("/favlist", r"favlist\?fid=(?P<fav_id>\d+)"),
+            ("bili2233", r"bili2233\.cn/[A-Za-z\d\._?%&+\-=/#]+"),
+            ("/opus/", r"bilibili\.com/opus/(?P<dynamic_id>\d+)"),
+            ("t.bili", r"t\.bilibili\.com/(?P<dynamic_id>\d+)"),
+            ("/read/", r"bilibili\.com/read/cv(?P<read_id>\d+)"),
+            ("b23.tv", r"b23\.tv/[A-Za-z\d\._?%&+\-=/#]+"),
+            ("/av", r"bilibili\.com(?:/video)?/av(?P<avid>\d{6,})(?:\?p=(?P<page_num>\d{1,3}))?"),
+            ("/BV", r"bilibili\.com(?:/video)?/(?P<bvid>BV[0-9a-zA-Z]{10})(?:\?p=(?P<page_num>\d{1,3}))?"),
+            ("av", r"^av(?P<avid>\d{6,})(?:\s)?(?P<page_num>\d{1,3})?$"),
+            ("BV", r"^(?P<bvid>BV[0-9a-zA-Z]{10})(?:\s)?(?P<page_num>\d{1,3})?$"),
+        ),
+    ),
+    ParserEntry(
+        Platform(name=PlatformEnum.KUAISHOU, display_name="快手"),
+        ".kuaishou",
+        "KuaiShouParser",
+        (
+            ("chenzhongtech", r"(?:v\.m\.)?chenzhongtech\.com/fw/[A-Za-z\d._?%&+\-=/#]+"),
+            ("v.kuaishou", r"v\.kuaishou\.com/[A-Za-z\d._?%&+\-=/#]+"),
+            ("kuaishou", r"(?:www\.)?kuaishou\.com/[A-Za-z\d._?%&+\-=/#]+"),
+        ),
+    ),
+    ParserEntry(
+        Platform(name=PlatformEnum.XIAOHONGSHU, display_name="小红书"),
+        ".xiaohongshu",
+        "XiaoHongShuParser",
+        (
+            (
+                "xiaohongshu.com",
+                r"(explore|discovery/item)/(?P<query>(?P<xhs_id>[0-9a-zA-Z]+)\?[A-Za-z0-9._%&+=/#@-]+)",
+            ),
+            ("xhslink.com", r"xhslink\.com/[A-Za-z0-9._?%&+=/#@-]+"),
+        ),
+    ),
+    ParserEntry(
+        Platform(name=PlatformEnum.TIKTOK, display_name="TikTok"),
+        ".tiktok",
+        "TikTokParser",
+        (
+            ("tiktok.com", r"(www|vt|vm)\.tiktok\.com/[A-Za-z0-9._?%&+\-=/#@]*"),
+        ),
+        requires="yt_dlp",
+    ),
+    ParserEntry(
+        Platform(name=PlatformEnum.YOUTUBE, display_name="油管"),
+        ".youtube",
+        "YouTubeParser",
+        (
+            ("youtube", r"youtube\.com/(?:watch|shorts)(?:/[A-Za-z\d_\-]+|\?v=[A-Za-z\d_\-]+)"),
+            ("youtu", r"youtu\.be/[A-Za-z\d\._\?%&\+\-=/#]+"),
+        ),
+        requires="yt_dlp",
+    ),
+)
+"""所有解析器"""
+
+
+def get_entry(class_name: str) -> ParserEntry:
+    """按类名查找清单项"""
+    for entry in MANIFEST:
+        if entry.class_name == class_name:
+            return entry
+    raise KeyError(class_name)
+
+
+def load_parser_class(entry: ParserEntry) -> "type[BaseParser]":
+    """导入解析器类"""
+    module = importlib.import_module(entry.module, __package__)
+    cls: type[BaseParser] = getattr(module, entry.class_name)
+    handled = {(keyword, pattern.pattern) for keyword, pattern in cls._key_patterns}
+    if handled != set(entry.key_patterns):
+        logger.warning(f"{entry.class_name} 的 @handle 与解析器清单不一致, 请同步 parsers/manifest.py")
+    return cls
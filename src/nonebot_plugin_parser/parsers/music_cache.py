@@ -0,0 +1,125 @@
+"""音乐解析结果缓存
+
+酷狗, 网易云, 酷我, 汽水音乐都依赖第三方接口解析, 热门歌曲经常在多个群里被重复分享.
+这里按 (平台, 歌曲 id) 缓存歌曲信息和解析出的音频地址, 缓存时间不超过音频地址的有效期
+"""
+
+import time
+import asyncio
+from typing import ClassVar
+from asyncio import Task
+from urllib.parse import urlsplit, parse_qsl
+from collections.abc import Callable, Awaitable
+
+from msgspec import Struct
+from nonebot import logger
+
+from ..utils import TTLCache
+from ..metrics import METRICS
+
+
+class MusicTrack(Struct):
+    title: str
+    """标题"""
+    artist: str
+    """歌手"""
+    audio_url: str
+    """音频地址"""
+    cover_url: str = ""
+    """封面地址"""
+    lyric: str = ""
+    """歌词"""
+    duration: float = 0.0
+    """时长, 单位: 秒"""
+    info: str = ""
+    """卡片中显示的附加信息, 如音质, 时长"""
+    detail: str = ""
+    """歌词前显示的文本, 如专辑, 发行时间"""
+    link: str = ""
+    """歌曲页面链接"""
+
+
+TrackFetcher = Callable[[], Awaitable[MusicTrack]]
+
+_EXPIRE_PARAMS = ("expires", "expire", "x-expires", "e", "deadline", "vuutv")
+"""音频地址中常见的过期时间戳参数"""
+
+
+def _url_ttl(url: str) -> float | None:
+    """从带签名的音频地址中读取剩余有效期, 无法识别时返回 None"""
+    now = time.time()
+    for name, value in parse_qsl(urlsplit(url).query):
+        if name.lower() not in _EXPIRE_PARAMS or not value.isdigit():
+            continue
+        expire_at = int(value)
+        # 毫秒时间戳
+        if expire_at > 1e12:
+            expire_at /= 1000
+        # 只接受看起来像未来时间戳的值
+        if now < expire_at < now + 30 * 24 * 3600:
+            return expire_at - now
+    return None
+
+
+class MusicCache:
+    """按 (平台, 歌曲 id) 缓存音乐解析结果"""
+
+    TTL: ClassVar[float] = 2 * 3600
+    """默认缓存时间, 单位: 秒"""
+    EXPIRE_MARGIN: ClassVar[float] = 300
+    """距音频地址过期不足该时间时不再使用缓存, 留出下载时间, 单位: 秒"""
+    MAX_SIZE: ClassVar[int] = 512
+    """最大缓存条目数"""
+
+    def __init__(self):
+        self._tracks = TTLCache[tuple[str, str], MusicTrack](self.TTL, self.MAX_SIZE)
+        self._tasks: dict[tuple[str, str], Task[MusicTrack]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def get(self, platform: str, song_id: str) -> MusicTrack | None:
+        """读取缓存, 不存在或已过期时返回 None"""
+        return self._tracks.get((platform, song_id))
+
+    async def get_or_fetch(
+        self, platform: str, song_id: str, fetcher: TrackFetcher
+    ) -> MusicTrack:
+        """读取缓存, 未命中时调用 fetcher 解析, 同一歌曲并发解析时共用一次请求
+
+        Args:
+            platform (str): 平台名称
+            song_id (str): 歌曲 id 或 hash
+            fetcher (TrackFetcher): 解析函数
+
+        Returns:
+            MusicTrack: 歌曲信息
+        """
+        key = (platform, song_id)
+        track = self._tracks.get(key)
+        METRICS.hit("music", track is not None)
+        if track is not None:
+            logger.debug(f"命中音乐缓存: {platform} {song_id}")
+            return track
+        if (task := self._tasks.get(key)) is None:
+            task = asyncio.create_task(self._fetch(key, fetcher))
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        # 单个请求被取消时不影响其他等待者
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: tuple[str, str], fetcher: TrackFetcher) -> MusicTrack:
+        track = await fetcher()
+        self.set(*key, track)
+        return track
+
+    def set(self, platform: str, song_id: str, track: MusicTrack):
+        """写入缓存, 缓存时间取默认值和音频地址有效期中较小者"""
+        ttl = self.TTL
+        if (url_ttl := _url_ttl(track.audio_url)) is not None:
+            ttl = min(ttl, url_ttl - self.EXPIRE_MARGIN)
+        self._tracks.set((platform, song_id), track, ttl)
+
+
+MUSIC_CACHE: MusicCache = MusicCache()
+"""全局音乐缓存"""
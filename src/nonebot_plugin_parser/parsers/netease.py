@@ -3,6 +3,7 @@ import asyncio
 from re import Match
 from typing import ClassVar
 
+from httpx import AsyncClient
 from nonebot import logger
 
 from .base import (
@@ -10,9 +11,12 @@ from .base import (
     PlatformEnum,
     ParseException,
     handle,
+    pconfig,
 )
 from .data import Platform, ImageContent, MediaContent
+from ..utils import TTLCache
 from ..constants import COMMON_HEADER
+from .music_cache import MUSIC_CACHE, MusicTrack
 
 
 class NCMParser(BaseParser):
@@ -21,6 +25,13 @@ class NCMParser(BaseParser):
         name=PlatformEnum.NETEASE, display_name="网易云音乐"
     )
 
+    HEDGE_SIZE: ClassVar[int] = 3
+    """同时探测的音质数"""
+    HEDGE_GRACE: ClassVar[float] = 2.0
+    """已有音质成功后, 继续等待更好音质的时间, 单位: 秒"""
+    QUALITY_TTL: ClassVar[float] = 7 * 24 * 3600
+    """歌曲可用音质的缓存时间, 单位: 秒"""
+
     def __init__(self):
         super().__init__()
         self.short_url_pattern = re.compile(r"(http:|https:)//163cn\.tv/([a-zA-Z0-9]+)")
@@ -34,11 +45,13 @@ class NCMParser(BaseParser):
             "exhigh",  # 极高音质
             "standard",  # 标准音质
         ]
+        # 歌曲 id -> 上次解析成功的音质
+        self._quality_cache = TTLCache[str, str](self.QUALITY_TTL, max_size=1024)
+        self._api_headers = COMMON_HEADER.copy()
+        self._api_headers.update({"Content-Type": "application/json", "User-Agent": "API-Client/1.0"})
 
     async def _get_redirect_url(self, url: str) -> str:
         """获取重定向后的URL"""
-        from httpx import AsyncClient
-
         headers = COMMON_HEADER.copy()
         async with AsyncClient(
             headers=headers, verify=False, follow_redirects=True, timeout=self.timeout
@@ -47,7 +60,84 @@ class NCMParser(BaseParser):
             response.raise_for_status()
             return str(response.url)
 
-    async def parse_ncm(self, ncm_url: str) -> dict:
+    async def _fetch_quality(self, client: AsyncClient, ncm_id: str, quality: str) -> dict:
+        """按指定音质请求解析接口, 失败时抛出异常"""
+        api_url = "https://api.bugpk.com/api/163_music"
+        # 使用GET请求，参数包括ids、level和type
+        params = {"ids": ncm_id, "level": quality, "type": "json"}
+        resp = await client.get(api_url, params=params)
+        resp.raise_for_status()
+        data = resp.json()
+
+        # 检查接口返回状态
+        if data.get("status") != 200 or not data.get("url"):
+            raise ParseException(f"网易云接口返回错误: {data}")
+        return data
+
+    async def _probe_qualities(
+        self, client: AsyncClient, ncm_id: str, qualities: list[str], deadline: float
+    ) -> tuple[str, dict]:
+        """并发探测多个音质, 返回已完成的结果中排序最靠前的一个
+
+        每次同时请求 HEDGE_SIZE 个音质. 有音质成功后, 最多再等待 HEDGE_GRACE 秒,
+        看排在前面的音质是否也能成功; 到达 deadline 时直接返回已有的最好结果
+
+        Args:
+            client (AsyncClient): 请求解析接口的客户端
+            ncm_id (str): 歌曲 id
+            qualities (list[str]): 按优先级排列的音质
+            deadline (float): 截止时间, 以事件循环时钟计
+
+        Raises:
+            asyncio.TimeoutError: 截止前没有任何音质成功
+            ParseException: 所有音质都失败
+        """
+        loop = asyncio.get_running_loop()
+        for start in range(0, len(qualities), self.HEDGE_SIZE):
+            window = qualities[start : start + self.HEDGE_SIZE]
+            tasks = {
+                asyncio.create_task(self._fetch_quality(client, ncm_id, quality)): index
+                for index, quality in enumerate(window)
+            }
+            best: tuple[int, dict] | None = None
+            grace_deadline = deadline
+            pending = set(tasks)
+            try:
+                while pending:
+                    if best is not None:
+                        # 只继续等待排在更前面的音质
+                        pending = {task for task in pending if tasks[task] < best[0]}
+                        if not pending:
+                            break
+                    timeout = min(deadline, grace_deadline) - loop.time()
+                    if timeout <= 0:
+                        break
+                    done, pending = await asyncio.wait(
+                        pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        index = tasks[task]
+                        try:
+                            data = task.result()
+                        except Exception as e:
+                            logger.warning(f"音质 {window[index]} 请求失败: {e}")
+                            continue
+                        if best is None:
+                            grace_deadline = loop.time() + self.HEDGE_GRACE
+                        if best is None or index < best[0]:
+                            best = (index, data)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                # 等待取消完成, 之后才能关闭客户端
+                await asyncio.gather(*tasks, return_exceptions=True)
+            if best is not None:
+                return window[best[0]], best[1]
+            if loop.time() >= deadline:
+                raise asyncio.TimeoutError
+        raise ParseException("所有音质解析均失败")
+
+    async def parse_ncm(self, ncm_url: str) -> MusicTrack:
         """解析网易云音乐链接"""
         # 处理短链接
         if matched := self.short_url_pattern.search(ncm_url):
@@ -64,69 +154,58 @@ class NCMParser(BaseParser):
 
         ncm_id = matched.group(1)
         logger.info(f"成功提取ID: {ncm_id} 来自 {ncm_url}")
+        return await MUSIC_CACHE.get_or_fetch(
+            self.platform.name, ncm_id, lambda: self._fetch_track(ncm_id)
+        )
 
-        # 使用新API解析
-        try:
-            # 尝试多种音质直到成功
-            for quality in self.audio_qualities:
-                try:
-                    from httpx import AsyncClient
-
-                    headers = COMMON_HEADER.copy()
-                    headers.update(
-                        {
-                            "Content-Type": "application/json",
-                            "User-Agent": "API-Client/1.0",
-                        }
-                    )
-
-                    async with AsyncClient(
-                        headers=headers, verify=False, timeout=self.timeout
-                    ) as client:
-                        api_url = "https://api.bugpk.com/api/163_music"
-                        # 使用GET请求，参数包括ids、level和type
-                        params = {"ids": ncm_id, "level": quality, "type": "json"}
-                        resp = await client.get(api_url, params=params)
-                        resp.raise_for_status()
-                        data = resp.json()
-
-                        # 检查接口返回状态
-                        if data.get("status") != 200:
-                            logger.warning(
-                                f"网易云接口返回错误: {data}，尝试下一种音质"
-                            )
-                            continue
+    async def _fetch_track(self, ncm_id: str) -> MusicTrack:
+        """请求接口解析歌曲"""
+        qualities = self.audio_qualities
+        if not pconfig.prefer_high_quality:
+            qualities = qualities[::-1]
 
-                        logger.info(
-                            f"使用音质: {quality} 解析成功: {data['name']} - {data['ar_name']}"
+        # 缓存音质的请求和完整探测共用一个截止时间
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + pconfig.audio_timeout
+        try:
+            async with AsyncClient(
+                headers=self._api_headers, verify=False, timeout=self.timeout
+            ) as client:
+                data = None
+                # 上次成功的音质优先单独请求, 最多占用一半时间
+                if quality := self._quality_cache.get(ncm_id):
+                    try:
+                        data = await asyncio.wait_for(
+                            self._fetch_quality(client, ncm_id, quality), pconfig.audio_timeout / 2
                         )
-                        audio_info = f"音质: {quality} | 大小: {data.get('size', '')}"
-
-                        # 提取歌词信息
-                        lyric = ""
-                        if data.get("lyric"):
-                            lyric = data["lyric"]
-                            logger.info(f"找到歌词，长度: {len(lyric)}字符")
-
-                        # 成功获取，返回结果
-                        return {
-                            "title": data["name"],
-                            "author": data["ar_name"],
-                            "audio_info": audio_info,
-                            "cover_url": data["pic"],
-                            "audio_url": data["url"],
-                            "mv_info": {},  # 新API没有返回MV信息
-                            "lyric": lyric,
-                        }
-                except Exception as e:
-                    logger.warning(f"请求失败: {e}，尝试下一种音质")
-                    # 延时
-                    await asyncio.sleep(1)
-            raise ParseException("所有音质解析均失败")
-
+                    except Exception as e:
+                        logger.warning(f"缓存音质 {quality} 请求失败: {e}，重新探测")
+                if data is None:
+                    quality, data = await self._probe_qualities(client, ncm_id, qualities, deadline)
+                    self._quality_cache.set(ncm_id, quality)
+        except asyncio.TimeoutError as e:
+            raise ParseException("网易云音乐解析超时") from e
         except Exception as e:
             raise ParseException(f"网易云音乐解析失败: {e}") from e
 
+        logger.info(f"使用音质: {quality} 解析成功: {data['name']} - {data['ar_name']}")
+        audio_info = f"音质: {quality} | 大小: {data.get('size', '')}"
+
+        # 提取歌词信息
+        lyric = ""
+        if data.get("lyric"):
+            lyric = data["lyric"]
+            logger.info(f"找到歌词，长度: {len(lyric)}字符")
+
+        return MusicTrack(
+            title=data["name"],
+            artist=data["ar_name"],
+            audio_url=data["url"],
+            cover_url=data["pic"],
+            lyric=lyric,
+            info=audio_info,
+        )
+
     @handle("music.163.com", r"https?://[^\s]*?music\.163\.com.*?(?:id=\d+|song/\d+)")
     @handle("163cn.tv", r"https?://[^\s]*?163cn\.tv/[a-zA-Z0-9]+")
     async def _parse_netease(self, searched: Match[str]):
@@ -135,41 +214,41 @@ class NCMParser(BaseParser):
         logger.debug(f"触发网易云解析: {share_url}")
 
         # 解析网易云音乐
-        result = await self.parse_ncm(share_url)
+        track = await self.parse_ncm(share_url)
 
         # 创建有意义的音频文件名
-        audio_name = f"{result['title']}-{result['author']}.mp3"
+        audio_name = f"{track.title}-{track.artist}.mp3"
         # 创建音频内容
         audio_content = self.create_audio_content(
-            result["audio_url"], 0.0, audio_name=audio_name  # 暂时无法从API获取准确时长
+            track.audio_url, 0.0, audio_name=audio_name  # 暂时无法从API获取准确时长
         )
 
         # 创建封面图片内容
         from ..download import DOWNLOADER
 
         cover_content = ImageContent(
-            DOWNLOADER.download_img(result["cover_url"], ext_headers=self.headers)
+            DOWNLOADER.download_img(track.cover_url, ext_headers=self.headers)
         )
 
         # 构建内容列表
         contents: list[MediaContent] = [cover_content, audio_content]
 
         # 构建文本内容
-        text = f"{result['audio_info']}"
-        if result["lyric"]:
-            text += f"\n歌词:\n{result['lyric']}"
+        text = track.info
+        if track.lyric:
+            text += f"\n歌词:\n{track.lyric}"
 
         # 构建额外信息
         extra = {
-            "info": result["audio_info"],
+            "info": track.info,
             "type": "audio",
             "type_tag": "音乐",
             "type_icon": "fa-music",
         }
 
         return self.result(
-            title=result["title"],
-            author=self.create_author(result["author"]),
+            title=track.title,
+            author=self.create_author(track.artist),
             url=share_url,
             text=text,
             contents=contents,
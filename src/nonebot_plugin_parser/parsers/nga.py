@@ -4,19 +4,59 @@ import time
 import random
 import asyncio
 import contextlib
-from typing import ClassVar
+from typing import Any, ClassVar
 
-from bs4 import Tag, BeautifulSoup
 from httpx import HTTPError, AsyncClient
 
 from .base import Platform, BaseParser, PlatformEnum, handle
 from ..exception import ParseException
+from .html_scraper import parse_html
 
 
 class NGAParser(BaseParser):
     # 平台信息
     platform: ClassVar[Platform] = Platform(name=PlatformEnum.NGA, display_name="NGA")
 
+    POST_IDS: ClassVar[tuple[str, ...]] = (
+        "postsubject0",
+        "postauthor0",
+        "postdate0",
+        "postcontent0",
+    )
+    """主楼中需要提取的元素 id"""
+    GUEST_JS_PATTERN: ClassVar[re.Pattern[str]] = re.compile(
+        r"document\.cookie\s*=\s*['\"]guestJs=([^;'\"]+)"
+    )
+    UID_PATTERN: ClassVar[re.Pattern[str]] = re.compile(r"[?&]uid=(\d+)")
+    USER_INFO_PATTERN: ClassVar[re.Pattern[str]] = re.compile(
+        r"commonui\.userInfo\.setAll\s*\(\s*(\{.*?\})\s*\)", re.DOTALL
+    )
+    IMG_PATTERN: ClassVar[re.Pattern[str]] = re.compile(r"\[img\](.*?)\[/img\]")
+    CLEAN_RULES: ClassVar[list[tuple[re.Pattern[str], str]]] = [
+        (re.compile(pattern, flags), replacement)
+        for pattern, replacement, flags in (
+            # 移除图片标签（完整和不完整的）
+            (r"\[img\][^\[\]]*\[/img\]", "", 0),
+            (r"\[img\][^\[\]]*", "", 0),
+            # 处理URL标签，保留链接文本
+            (r"\[url=[^\]]*\]([^\[]*?)\[/url\]", r"\1", 0),
+            (r"\[url\]([^\[]*?)\[/url\]", r"\1", 0),
+            # 移除引用标签
+            (r"\[quote\].*?\[/quote\]", "", re.DOTALL),
+            # 处理格式标签，保留文本内容（b, i, u）
+            (r"\[(b|i|u)\](.*?)\[/\1\]", r"\2", re.DOTALL),
+            # 处理带属性的格式标签（color, size）
+            (r"\[(color|size)=[^\]]*\](.*?)\[/\1\]", r"\2", re.DOTALL),
+            # 移除其他未配对的标签
+            (r"\[[^]]+\]", "", 0),
+            # 清理空白字符
+            (r"\n{3,}", "\n\n", 0),  # 多个换行符压缩为两个
+            (r"[ \t]+", " ", 0),  # 多个空格/制表符压缩为一个空格
+            (r"\n\s+\n", "\n\n", 0),  # 清理空行中的空白字符
+        )
+    ]
+    """BBCode 清理规则, 按顺序执行"""
+
     def __init__(self):
         super().__init__()
         extra_headers = {
@@ -54,10 +94,7 @@ class NGAParser(BaseParser):
 
                 # 如果返回403且包含guestJs cookie设置，提取cookie并重试
                 if resp.status_code == 403 and "guestJs" in resp.text:
-                    if cookie_match := re.search(
-                        r"document\.cookie\s*=\s*['\"]guestJs=([^;'\"]+)",
-                        resp.text,
-                    ):
+                    if cookie_match := self.GUEST_JS_PATTERN.search(resp.text):
                         guest_js = cookie_match[1]
                         # 设置cookie并重试
                         client.cookies.set("guestJs", guest_js, domain=".178.com")
@@ -83,87 +120,78 @@ class NGAParser(BaseParser):
         if "需要" in html and ("登录" in html or "请登录" in html):
             raise ParseException("页面可能需要登录后访问")
 
-        # 使用 BeautifulSoup 解析 HTML
-        soup = BeautifulSoup(html, "html.parser")
+        # 解析 HTML 较慢, 放到进程池中执行
+        thread = await self.run_in_process(self._extract_thread, html)
+
+        author = thread["author"]
+        author = self.create_author(author) if author else None
+        contents = []
+        if img_paths := thread["img_paths"]:
+            img_urls = [self.base_img_url + path for path in img_paths]
+            contents.extend(self.create_image_contents(img_urls))
+
+        return self.result(
+            title=thread["title"],
+            text=thread["text"],
+            url=url,
+            author=author,
+            contents=contents,
+            timestamp=thread["timestamp"],
+        )
+
+    @classmethod
+    def _extract_thread(cls, html: str) -> dict[str, Any]:
+        """从帖子页面提取主楼的标题, 作者, 时间, 文本和图片路径"""
+        doc = parse_html(html, cls.POST_IDS)
 
         # 提取 title - 从 postsubject0
         title = None
-        title_tag = soup.find(id="postsubject0")
-        if title_tag and isinstance(title_tag, Tag):
-            title = title_tag.get_text(strip=True)
+        if title_tag := doc.by_id("postsubject0"):
+            title = title_tag.text()
 
         # 提取作者 - 先从 postauthor0 标签提取 uid，再从 JavaScript 中查找用户名
         author = None
-        author_tag = soup.find(id="postauthor0")
-        if author_tag and isinstance(author_tag, Tag):
+        if author_tag := doc.by_id("postauthor0"):
             # 从 href 属性中提取 uid: href="nuke.php?func=ucp&uid=24278093"
-            href = author_tag.get("href", "")
-            if uid_match := re.search(r"[?&]uid=(\d+)", str(href)):
+            href = author_tag.get("href") or ""
+            if uid_match := cls.UID_PATTERN.search(href):
                 uid = uid_match[1]
                 # 从 JavaScript 的 commonui.userInfo.setAll() 中查找对应用户名
-                script_pattern = r"commonui\.userInfo\.setAll\s*\(\s*(\{.*?\})\s*\)"
-                if script_match := re.search(script_pattern, html, re.DOTALL):
+                if script_match := cls.USER_INFO_PATTERN.search(html):
                     with contextlib.suppress(json.JSONDecodeError, KeyError):
                         user_info_json = script_match[1]
                         user_info = json.loads(user_info_json)
                         # 使用提取的 uid 查找用户名
                         if uid in user_info:
                             author = user_info[uid].get("username")
-        author = self.create_author(author) if author else None
+
         # 提取时间 - 从第一个帖子的 postdate0
         timestamp = None
-        time_tag = soup.find(id="postdate0")
-        if time_tag and isinstance(time_tag, Tag):
-            timestr = time_tag.get_text(strip=True)
+        if time_tag := doc.by_id("postdate0"):
+            timestr = time_tag.text()
             timestamp = int(time.mktime(time.strptime(timestr, "%Y-%m-%d %H:%M")))
 
         # 提取文本 - postcontent0
         text = None
-        content_tag = soup.find(id="postcontent0")
-        contents = []
-        if content_tag and isinstance(content_tag, Tag):
-            text = content_tag.get_text("\n", strip=True)
+        img_paths: list[str] = []
+        if content_tag := doc.by_id("postcontent0"):
+            text = content_tag.text("\n")
             # 清理 BBCode 标签并限制长度
-            img_urls: list[str] = re.findall(r"\[img\](.*?)\[/img\]", text)
-            img_urls = [self.base_img_url + url[1:] for url in img_urls]
-            contents.extend(self.create_image_contents(img_urls))
-            text = self.clean_nga_text(text)
-
-        return self.result(
-            title=title,
-            text=text,
-            url=url,
-            author=author,
-            contents=contents,
-            timestamp=timestamp,
-        )
-
-    @staticmethod
-    def clean_nga_text(text: str, max_length: int = 500) -> str:
-        rules: list[tuple[str, str, int]] = [
-            # 移除图片标签（完整和不完整的）
-            (r"\[img\][^\[\]]*\[/img\]", "", 0),
-            (r"\[img\][^\[\]]*", "", 0),
-            # 处理URL标签，保留链接文本
-            (r"\[url=[^\]]*\]([^\[]*?)\[/url\]", r"\1", 0),
-            (r"\[url\]([^\[]*?)\[/url\]", r"\1", 0),
-            # 移除引用标签
-            (r"\[quote\].*?\[/quote\]", "", re.DOTALL),
-            # 处理格式标签，保留文本内容（b, i, u）
-            (r"\[(b|i|u)\](.*?)\[/\1\]", r"\2", re.DOTALL),
-            # 处理带属性的格式标签（color, size）
-            (r"\[(color|size)=[^\]]*\](.*?)\[/\1\]", r"\2", re.DOTALL),
-            # 移除其他未配对的标签
-            (r"\[[^]]+\]", "", 0),
-            # 清理空白字符
-            (r"\n{3,}", "\n\n", 0),  # 多个换行符压缩为两个
-            (r"[ \t]+", " ", 0),  # 多个空格/制表符压缩为一个空格
-            (r"\n\s+\n", "\n\n", 0),  # 清理空行中的空白字符
-        ]
+            img_paths = [url[1:] for url in cls.IMG_PATTERN.findall(text)]
+            text = cls.clean_nga_text(text)
+
+        return {
+            "title": title,
+            "author": author,
+            "timestamp": timestamp,
+            "text": text,
+            "img_paths": img_paths,
+        }
 
-        for rule in rules:
-            pattern, replacement, flags = rule[0], rule[1], rule[2]
-            text = re.sub(pattern, replacement, text, flags=flags)
+    @classmethod
+    def clean_nga_text(cls, text: str, max_length: int = 500) -> str:
+        for pattern, replacement in cls.CLEAN_RULES:
+            text = pattern.sub(replacement, text)
 
         text = text.strip()
 
@@ -0,0 +1,106 @@
+"""TapTap 专用的精简浏览器上下文
+
+TapTap 的浏览器工作只关心页面中的 Nuxt 数据以及 m3u8 / play-info 响应,
+这里复用同一个浏览器上下文, 防检测脚本和请求拦截只在创建上下文时设置一次,
+拦截图片, 媒体, 字体和第三方统计脚本, 并限制同时打开的页面数
+"""
+
+import re
+import asyncio
+from typing import TYPE_CHECKING, ClassVar
+from contextlib import suppress, asynccontextmanager
+from collections.abc import AsyncIterator
+
+from nonebot import logger, get_driver
+from nonebot_plugin_htmlrender.browser import get_browser
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page, Route, BrowserContext
+
+
+class TapTapBrowser:
+    """TapTap 浏览器上下文"""
+
+    MAX_PAGES: ClassVar[int] = 2
+    """同时打开的页面数"""
+    DEFAULT_TIMEOUT: ClassVar[float] = 20000
+    """页面操作默认超时, 单位: 毫秒"""
+    BLOCKED_RESOURCE_TYPES: ClassVar[frozenset[str]] = frozenset(
+        {"image", "media", "font", "texttrack", "eventsource", "manifest"}
+    )
+    """直接拦截的资源类型"""
+    BLOCKED_URL: ClassVar[re.Pattern[str]] = re.compile(
+        r"google-analytics|googletagmanager|hm\.baidu\.com|cnzz\.com|umeng\.com"
+        r"|sensorsdata|growingio|bytegoofy|snssdk\.com|sentry|\.ts(?:\?|$)|\.m4s(?:\?|$)"
+    )
+    """直接拦截的 URL: 第三方统计脚本和视频分片"""
+    INIT_SCRIPT: ClassVar[str] = (
+        "Object.defineProperty(navigator, 'webdriver', {get: () => undefined});"
+        "Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});"
+    )
+    """防检测脚本"""
+
+    def __init__(self, user_agent: str):
+        self.user_agent = user_agent
+        self._context: "BrowserContext | None" = None
+        self._context_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(self.MAX_PAGES)
+        get_driver().on_shutdown(self.close)
+
+    @classmethod
+    async def _route(cls, route: "Route"):
+        request = route.request
+        url = request.url
+        # 视频地址相关的请求一律放行, 即使是 media 类型
+        if ".m3u8" in url or "video/v1/play-info" in url:
+            await route.continue_()
+        elif request.resource_type in cls.BLOCKED_RESOURCE_TYPES or cls.BLOCKED_URL.search(url):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _get_context(self) -> "BrowserContext":
+        async with self._context_lock:
+            if self._context is None:
+                browser = await get_browser()
+                context = await browser.new_context(
+                    user_agent=self.user_agent,
+                    locale="zh-CN",
+                    viewport={"width": 1280, "height": 720},
+                    service_workers="block",
+                )
+                context.set_default_timeout(self.DEFAULT_TIMEOUT)
+                await context.add_init_script(self.INIT_SCRIPT)
+                await context.route("**/*", self._route)
+                context.on("close", lambda _: self._reset(context))
+                self._context = context
+                logger.debug("[TapTap] 浏览器上下文已创建")
+            return self._context
+
+    def _reset(self, context: "BrowserContext"):
+        if self._context is context:
+            self._context = None
+
+    @asynccontextmanager
+    async def new_page(self) -> AsyncIterator["Page"]:
+        """在共享的上下文中打开页面, 受并发数限制"""
+        async with self._semaphore:
+            context = await self._get_context()
+            try:
+                page = await context.new_page()
+            except Exception:
+                # 浏览器被关闭或重启后上下文失效, 重建一次
+                self._reset(context)
+                context = await self._get_context()
+                page = await context.new_page()
+            try:
+                yield page
+            finally:
+                with suppress(Exception):
+                    await page.close()
+
+    async def close(self):
+        if context := self._context:
+            self._context = None
+            with suppress(Exception):
+                await context.close()
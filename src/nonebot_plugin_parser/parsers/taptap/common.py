@@ -2,20 +2,23 @@ import re
 import json
 import asyncio
 import contextlib
-from typing import Any
+from typing import Any, ClassVar
 from datetime import datetime
 
 import httpx
+import msgspec
 from nonebot import logger, require
 
 from ..base import BaseParser, handle
 from ..data import Platform, VideoContent
+from ...utils import TTLCache
 from ...constants import PlatformEnum
 from ...exception import ParseException
+from ..embedded_json import extract_json
 
 require("nonebot_plugin_htmlrender")
 
-from nonebot_plugin_htmlrender import get_new_page
+from .browser import TapTapBrowser
 
 
 class TapTapParser(BaseParser):
@@ -23,6 +26,13 @@ class TapTapParser(BaseParser):
 
     platform = Platform(name=PlatformEnum.TAPTAP.value, display_name="TapTap")
 
+    DETAIL_TTL: ClassVar[float] = 600
+    """动态/评价详情缓存时间, 视频链接带签名, 不宜过长, 单位: 秒"""
+    LATEST_POST_TTL: ClassVar[float] = 120
+    """用户最新动态缓存时间, 单位: 秒"""
+    TOPIC_TTL: ClassVar[float] = 3600
+    """话题名称缓存时间, 单位: 秒"""
+
     def __init__(self):
         super().__init__()
         self.base_url = "https://www.taptap.cn"
@@ -33,6 +43,10 @@ class TapTapParser(BaseParser):
             ),
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
         }
+        self._browser = TapTapBrowser(self.headers["User-Agent"])
+        self._detail_cache = TTLCache[str, dict[str, Any]](self.DETAIL_TTL)
+        self._latest_post_cache = TTLCache[str, dict[str, Any]](self.LATEST_POST_TTL)
+        self._topic_cache = TTLCache[str, str](self.TOPIC_TTL)
 
     def _resolve_nuxt_value(self, root_data: list, value: Any) -> Any:
         """Nuxt数据解压"""
@@ -40,106 +54,68 @@ class TapTapParser(BaseParser):
             return root_data[value] if 0 <= value < len(root_data) else value
         return value
 
+    @staticmethod
+    def _extract_nuxt_data(html: str) -> list:
+        """从页面 HTML 中提取 Nuxt 数据, 找不到时返回空列表"""
+        # <script id="__NUXT_DATA__">[...]</script>, 或旧版页面的 window.__NUXT__ = [...]
+        if (raw := extract_json(html, "__NUXT_DATA__", "window.__NUXT__")) is None:
+            return []
+        try:
+            parsed_data = msgspec.json.decode(raw)
+        except msgspec.DecodeError as e:
+            logger.debug(f"解析 Nuxt 数据失败: {e}")
+            return []
+        return parsed_data if isinstance(parsed_data, list) else []
+
     async def _fetch_nuxt_data(self, url: str) -> list:
-        """获取页面的 Nuxt 数据"""
-        max_retries = 3
+        """获取页面的 Nuxt 数据
+
+        Nuxt 数据由服务端渲染在页面中, 先直接请求页面, 拿不到时才启动浏览器
+        """
+        try:
+            async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
+                response = await client.get(url, headers=self.headers)
+                response.raise_for_status()
+            if nuxt_data := await self.run_in_process(self._extract_nuxt_data, response.text):
+                logger.debug(f"[TapTap] 直接请求获取 Nuxt 数据成功: {url}")
+                return nuxt_data
+        except Exception as e:
+            logger.debug(f"[TapTap] 直接请求页面失败: {e}")
+
+        max_retries = 2
         retry_count = 0
 
         while retry_count <= max_retries:
             try:
-                async with get_new_page() as page:
-                    # 导航到 URL，增加等待时间确保页面完全加载
-                    await page.goto(
-                        url, wait_until="networkidle"
-                    )  # 等待网络空闲，确保资源加载完成
-                    await page.wait_for_timeout(
-                        5000
-                    )  # 增加等待时间到5秒，确保页面完全渲染
-
-                    # 获取页面内容
-                    response_text = await page.content()
-
-                    # 调试：记录页面基本信息
-                    logger.debug(f"页面 URL: {url}")
-                    logger.debug(f"页面大小: {len(response_text)} 字节")
-
-                    # 尝试多种方式提取 Nuxt 数据
-                    nuxt_data: list = []  # 明确类型标注为列表
-
-                    if "__NUXT_DATA__" in response_text:
-                        # 尝试多种正则表达式匹配
-                        patterns = [
-                            r'<script id="__NUXT_DATA__"[^>]*>(.*?)</script>',
-                            r'<script[^>]*id=["\']__NUXT_DATA__["\'][^>]*>(.*?)</script>',
-                            r"<script[^>]*>(.*?__NUXT_DATA__.*?)</script>",
-                        ]
-
-                        for pattern in patterns:
-                            if match := re.search(pattern, response_text, re.DOTALL):
-                                logger.debug(
-                                    f"使用正则表达式匹配成功: {pattern[:50]}..."
-                                )
-                                try:
-                                    if json_match := re.search(
-                                        r"__NUXT_DATA__\s*=\s*(\[.*?\])",
-                                        match[1],
-                                        re.DOTALL,
-                                    ):
-                                        parsed_data = json.loads(json_match[1])
-                                        if isinstance(parsed_data, list):
-                                            nuxt_data = parsed_data
-                                            break
-                                    # 尝试直接解析整个匹配内容
-                                    parsed_data = json.loads(match[1])
-                                    if isinstance(parsed_data, list):
-                                        nuxt_data = parsed_data
-                                        break
-                                except json.JSONDecodeError as e:
-                                    logger.debug(
-                                        f"解析 Nuxt 数据失败，尝试下一个正则表达式: {e}"
-                                    )
-                                    continue
+                async with self._browser.new_page() as page:
+                    await page.goto(url, wait_until="domcontentloaded")
+                    # 等待 Nuxt 数据节点出现, 而不是等待网络空闲后再固定等待
+                    nuxt_data: list = []
+                    with contextlib.suppress(Exception):
+                        await page.wait_for_selector(
+                            "#__NUXT_DATA__", timeout=15000, state="attached"
+                        )
+                        json_str = await page.evaluate(
+                            'document.getElementById("__NUXT_DATA__").textContent'
+                        )
+                        if json_str:
+                            parsed_data = json.loads(json_str)
+                            if isinstance(parsed_data, list):
+                                nuxt_data = parsed_data
 
-                    # 方式2: 如果找不到 __NUXT_DATA__，尝试从 window.__NUXT__ 中提取
-                    if not nuxt_data and "window.__NUXT__" in response_text:
-                        logger.debug("尝试从 window.__NUXT__ 中提取数据")
-                        if match := re.search(
-                            r"window\.__NUXT__\s*=\s*(\[.*?\])",
-                            response_text,
-                            re.DOTALL,
-                        ):
-                            try:
-                                parsed_data = json.loads(match[1])
-                                if isinstance(parsed_data, list):
-                                    nuxt_data = parsed_data
-                            except json.JSONDecodeError as e:
-                                logger.debug(f"解析 window.__NUXT__ 失败: {e}")
-
-                    # 方式3: 尝试从 window.__NUXT_DATA__ 中提取
-                    if not nuxt_data and "window.__NUXT_DATA__" in response_text:
-                        logger.debug("尝试从 window.__NUXT_DATA__ 中提取数据")
-                        if match := re.search(
-                            r"window\.__NUXT_DATA__\s*=\s*(\[.*?\])",
-                            response_text,
-                            re.DOTALL,
-                        ):
-                            try:
-                                parsed_data = json.loads(match[1])
-                                if isinstance(parsed_data, list):
-                                    nuxt_data = parsed_data
-                            except json.JSONDecodeError as e:
-                                logger.debug(f"解析 window.__NUXT_DATA__ 失败: {e}")
+                    if not nuxt_data:
+                        # 获取页面内容
+                        response_text = await page.content()
+                        logger.debug(f"页面 URL: {url}")
+                        logger.debug(f"页面大小: {len(response_text)} 字节")
+                        nuxt_data = await self.run_in_process(
+                            self._extract_nuxt_data, response_text
+                        )
 
                     # 如果仍然没有找到数据，抛出异常
                     if not nuxt_data:
-                        # # 保存页面内容到临时文件，便于调试
-                        # temp_file = f"taptap_debug_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-                        # with open(temp_file, "w", encoding="utf-8") as f:
-                        #     f.write(response_text)
-                        # logger.debug(f"页面内容已保存到临时文件: {temp_file}")
                         raise ParseException(f"无法找到 Nuxt 数据: {url}")
 
-                    # 确保返回的是列表
                     return nuxt_data
 
             except Exception as e:
@@ -632,17 +608,11 @@ class TapTapParser(BaseParser):
 
             # 使用 set 自动去重完全相同的 URL
             captured_videos: set[str] = set()
+            video_captured = asyncio.Event()
 
-            async with get_new_page() as page:
+            # 防检测脚本, 请求拦截和并发限制由 TapTapBrowser 统一处理
+            async with self._browser.new_page() as page:
                 try:
-                    # 注入防检测脚本
-                    await page.add_init_script(
-                        "Object.defineProperty(navigator, 'webdriver', {get: () => undefined});"
-                    )
-                    await page.add_init_script(
-                        "Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});"
-                    )
-
                     page.set_default_timeout(40000)
 
                     # --- 定义监听器 ---
@@ -660,6 +630,7 @@ class TapTapParser(BaseParser):
                                     f"[TapTap] 嗅探到 M3U8: {resp_url[:50]}..."
                                 )
                                 captured_videos.add(resp_url)
+                                video_captured.set()
 
                             # 2. 捕获 play-info 接口
                             if (
@@ -673,6 +644,7 @@ class TapTapParser(BaseParser):
                                     ):
                                         real_url = json_data["data"]["url"]
                                         captured_videos.add(real_url)
+                                        video_captured.set()
 
                     page.on("response", handle_response)
 
@@ -972,10 +944,14 @@ class TapTapParser(BaseParser):
 
                             result["images"] = images
 
-                    # 额外等待，确保视频请求发出
-                    with contextlib.suppress(Exception):
-                        await page.evaluate("window.scrollTo(0, 200)")
-                        await asyncio.sleep(3)
+                    # 有视频时等待播放请求返回, 而不是固定等待
+                    if result.get("video_id") and not captured_videos:
+                        with contextlib.suppress(Exception):
+                            await page.evaluate("window.scrollTo(0, 200)")
+                        with contextlib.suppress(asyncio.TimeoutError):
+                            await asyncio.wait_for(video_captured.wait(), timeout=10)
+                        # 同一视频各清晰度的 m3u8 几乎同时返回, 稍等以便选择最高清晰度
+                        await asyncio.sleep(0.5)
                     # === 视频去重和智能选择逻辑 (适用于所有浏览器模式) ===
                     unique_videos = []
 
@@ -1039,9 +1015,6 @@ class TapTapParser(BaseParser):
 
                 except Exception as e:
                     logger.error(f"[TapTap] 详情页抓取流程失败: {e}")
-                finally:
-                    if page:
-                        await page.close()
 
         logger.debug(
             f"解析结果: videos={len(result['videos'])}, images={len(result['images'])},"
@@ -1288,23 +1261,45 @@ class TapTapParser(BaseParser):
 
         return result
 
+    @staticmethod
+    def _is_complete(detail: dict[str, Any]) -> bool:
+        """详情是否完整, 只缓存完整的结果"""
+        if not detail["author"]["name"]:
+            return False
+        # 有视频但没拿到播放链接, 下次需要重新嗅探
+        return not (detail.get("video_id") and not detail["videos"])
+
+    async def _get_post_detail(self, post_id: str) -> dict[str, Any]:
+        """获取动态详情, 优先使用缓存"""
+        key = f"moment:{post_id}"
+        if (detail := self._detail_cache.get(key)) is not None:
+            return detail
+        detail = await self._parse_post_detail(post_id)
+        if self._is_complete(detail):
+            self._detail_cache.set(key, detail)
+        return detail
+
     @handle(keyword="taptap.cn/user", pattern=r"taptap\.cn/user/(\d+)")
     async def handle_user(self, matched):
         """处理用户链接，返回最新动态"""
         user_id = matched.group(1)
-        latest_post = await self._parse_user_latest_post(user_id)
+        latest_post = self._latest_post_cache.get(user_id)
+        if latest_post is None:
+            latest_post = await self._parse_user_latest_post(user_id)
+            if latest_post:
+                self._latest_post_cache.set(user_id, latest_post)
 
         if not latest_post:
             raise ParseException(f"用户 {user_id} 暂无动态")
 
-        detail = await self._parse_post_detail(latest_post["id"])
+        detail = await self._get_post_detail(latest_post["id"])
         return self._build_result(detail)
 
     @handle(keyword="taptap.cn/moment", pattern=r"taptap\.cn/moment/(\d+)")
     async def handle_moment(self, matched):
         """处理动态链接"""
         post_id = matched.group(1)
-        detail = await self._parse_post_detail(post_id)
+        detail = await self._get_post_detail(post_id)
         return self._build_result(detail)
 
     @handle(keyword="taptap.cn/topic", pattern=r"taptap\.cn/topic/(\d+)")
@@ -1313,16 +1308,18 @@ class TapTapParser(BaseParser):
         topic_id = matched.group(1)
         # 话题链接暂时返回动态列表，这里简化处理
         url = f"{self.base_url}/topic/{topic_id}"
-        data = await self._fetch_nuxt_data(url)
-
-        # 简单提取话题名称
-        topic_name = "TapTap 话题"
-        for item in data:
-            if isinstance(item, dict) and "title" in item:
-                title = self._resolve_nuxt_value(data, item["title"])
-                if title and isinstance(title, str):
-                    topic_name = title
-                    break
+        if (topic_name := self._topic_cache.get(topic_id)) is None:
+            data = await self._fetch_nuxt_data(url)
+
+            # 简单提取话题名称
+            topic_name = "TapTap 话题"
+            for item in data:
+                if isinstance(item, dict) and "title" in item:
+                    title = self._resolve_nuxt_value(data, item["title"])
+                    if title and isinstance(title, str):
+                        topic_name = title
+                        break
+            self._topic_cache.set(topic_id, topic_name)
 
         return self.result(title=topic_name, text=f"查看话题详情: {url}", url=url)
 
@@ -1330,7 +1327,11 @@ class TapTapParser(BaseParser):
     async def handle_review(self, matched):
         """处理评论详情链接"""
         review_id = matched.group(1)
-        detail = await self._parse_review_detail(review_id)
+        key = f"review:{review_id}"
+        if (detail := self._detail_cache.get(key)) is None:
+            detail = await self._parse_review_detail(review_id)
+            if self._is_complete(detail):
+                self._detail_cache.set(key, detail)
         return self._build_result(detail)
 
     def _build_result(self, detail: dict[str, Any]):
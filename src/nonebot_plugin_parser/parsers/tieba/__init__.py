@@ -32,6 +32,7 @@ class TiebaParser(BaseParser):
         author = self.create_author(
             name=thread.user.show_name,
             avatar_url=f"http://tb.himg.baidu.com/sys/portraith/item/{thread.user.portrait}",
+            user_id=thread.user.portrait,
         )
 
         # 主楼正文内容
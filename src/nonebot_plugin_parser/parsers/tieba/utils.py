@@ -1,15 +1,19 @@
 # pyright: reportAttributeAccessIssue=false
 
 from pathlib import Path
+from functools import cache
 
 from httpx import AsyncClient, NetworkError
 from google.protobuf import descriptor_pb2, descriptor_pool
 from google.protobuf.message_factory import GetMessageClass
 
 from .models import Posts
+from ...offload import CPU_EXECUTOR
 
 
+@cache
 def get_message(name: str):
+    """加载 protobuf 描述文件并生成消息类, 结果会被缓存"""
     fds = descriptor_pb2.FileDescriptorSet()
     fds.ParseFromString((Path(__file__).parent / f"{name}.desc").read_bytes())
     pool = descriptor_pool.DescriptorPool()
@@ -85,4 +89,5 @@ def parse_res(data: bytes) -> Posts:
 async def get_post(tid: int) -> Posts:
     req = make_req(tid)
     data = await pack_req(req)
-    return parse_res(data)
+    # 结果中可能保留原始 protobuf 对象, 无法跨进程传递, 放到线程池中解码
+    return await CPU_EXECUTOR.run_in_thread(parse_res, data)
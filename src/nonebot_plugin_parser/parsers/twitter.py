@@ -7,6 +7,7 @@ from httpx import AsyncClient
 from .base import BaseParser, PlatformEnum, handle
 from .data import Platform, ParseResult
 from ..exception import ParseException
+from .html_scraper import parse_html
 
 
 class TwitterParser(BaseParser):
@@ -43,7 +44,9 @@ class TwitterParser(BaseParser):
         if html_content is None:
             raise ParseException("解析失败, 数据为空")
 
-        return self.parse_twitter_html(html_content)
+        # 解析 HTML 较慢, 放到进程池中执行
+        links = await self.run_in_process(self._extract_links, html_content)
+        return self._build_result(links)
 
     def parse_twitter_html(self, html_content: str) -> ParseResult:
         """解析 Twitter HTML 内容
@@ -54,9 +57,12 @@ class TwitterParser(BaseParser):
         Returns:
             ParseResult: 解析结果
         """
-        from bs4 import Tag, BeautifulSoup
+        return self._build_result(self._extract_links(html_content))
 
-        soup = BeautifulSoup(html_content, "html.parser")
+    @staticmethod
+    def _extract_links(html_content: str) -> dict[str, Any]:
+        """从 xdown 返回的 HTML 中提取标题, 封面和下载链接"""
+        doc = parse_html(html_content)
 
         cover_url = None
         video_url = None
@@ -64,23 +70,19 @@ class TwitterParser(BaseParser):
         dynamic_urls = []
 
         # 1. 提取缩略图链接
-        thumb_tag = soup.find("img")
-        if isinstance(thumb_tag, Tag):
-            if cover := thumb_tag.get("src"):
-                cover_url = str(cover)
+        if (thumb_tag := doc.find("img")) and (cover := thumb_tag.get("src")):
+            cover_url = cover
 
         # 2. 提取下载链接
-        tw_button_tags = soup.find_all("a", class_="tw-button-dl")
-        abutton_tags = soup.find_all("a", class_="abutton")
+        anchors = list(doc.iter("a"))
+        tw_button_tags = [tag for tag in anchors if tag.has_class("tw-button-dl")]
+        abutton_tags = [tag for tag in anchors if tag.has_class("abutton")]
         for tag in chain(tw_button_tags, abutton_tags):
-            if not isinstance(tag, Tag):
-                continue
             href = tag.get("href")
             if href is None:
                 continue
 
-            href = str(href)
-            text = tag.get_text(strip=True)
+            text = tag.text()
             if "下载 MP4" in text:
                 video_url = href
                 break
@@ -90,8 +92,24 @@ class TwitterParser(BaseParser):
                 dynamic_urls.append(href)
 
         # 3. 提取标题
-        title_tag = soup.find("h3")
-        title = title_tag.get_text(strip=True) if title_tag else None
+        title_tag = doc.find("h3")
+        title = title_tag.text() if title_tag else None
+
+        return {
+            "title": title,
+            "cover_url": cover_url,
+            "video_url": video_url,
+            "images_urls": images_urls,
+            "dynamic_urls": dynamic_urls,
+        }
+
+    def _build_result(self, links: dict[str, Any]) -> ParseResult:
+        title = links["title"]
+        cover_url = links["cover_url"]
+        video_url = links["video_url"]
+        images_urls = links["images_urls"]
+        dynamic_urls = links["dynamic_urls"]
+
         # 简洁的构建方式
         contents = []
 
@@ -3,12 +3,12 @@ from time import time
 from uuid import uuid4
 from typing import ClassVar
 
-from bs4 import Tag, BeautifulSoup
 from httpx import Cookies, AsyncClient
 
 from . import common, article
 from ..base import Platform, BaseParser, PlatformEnum, ParseException, handle
 from ..data import MediaContent
+from ..html_scraper import parse_html
 
 
 class WeiBoParser(BaseParser):
@@ -65,6 +65,28 @@ class WeiBoParser(BaseParser):
         _id = searched.group("id")
         return await self.parse_article(_id)
 
+    @staticmethod
+    def _split_article(html: str) -> tuple[list[tuple[str, str]], str | None]:
+        """按图片切分文章正文, 返回 [(图片链接, 图片前的文字)] 和末尾文字"""
+        doc = parse_html(html)
+        graphics: list[tuple[str, str]] = []
+        text_buffer: list[str] = []
+
+        for element in doc.iter("p", "img"):
+            if element.tag == "p":
+                text = element.text()
+                # 去除零宽空格
+                text = text.replace("\u200b", "")
+                if text:
+                    text_buffer.append(text)
+            elif element.tag == "img":
+                if src := element.get("src"):
+                    graphics.append((src, "\n\n".join(text_buffer)))
+                    text_buffer.clear()
+
+        end_text = "\n\n".join(text_buffer) if text_buffer else None
+        return graphics, end_text
+
     async def parse_article(self, _id: str):
         url = "https://card.weibo.com/article/m/aj/detail"
         params = {
@@ -87,34 +109,17 @@ class WeiBoParser(BaseParser):
 
         data = detail.data
 
-        soup = BeautifulSoup(data.content, "html.parser")
-        contents: list[MediaContent] = []
-        text_buffer: list[str] = []
-
-        for element in soup.find_all(["p", "img"]):
-            if not isinstance(element, Tag):
-                continue
-
-            if element.name == "p":
-                text = element.get_text(strip=True)
-                # 去除零宽空格
-                text = text.replace("\u200b", "")
-                if text:
-                    text_buffer.append(text)
-            elif element.name == "img":
-                src = element.get("src")
-                if isinstance(src, str):
-                    text = "\n\n".join(text_buffer)
-                    contents.append(self.create_graphics_content(src, text=text))
-                    text_buffer.clear()
+        # 文章正文可能很长, 放到进程池中解析
+        graphics, end_text = await self.run_in_process(self._split_article, data.content)
+        contents: list[MediaContent] = [
+            self.create_graphics_content(src, text=text) for src, text in graphics
+        ]
 
         author = self.create_author(
             data.userinfo.screen_name,
             data.userinfo.profile_image_url,
         )
 
-        end_text = "\n\n".join(text_buffer) if text_buffer else None
-
         return self.result(
             url=data.url,
             title=data.title,
@@ -213,7 +218,9 @@ class WeiBoParser(BaseParser):
             contents.extend(self.create_image_contents(image_urls))
 
         # 构建作者
-        author = self.create_author(data.display_name, data.user.profile_image_url)
+        author = self.create_author(
+            data.display_name, data.user.profile_image_url, user_id=data.user.id
+        )
         repost = None
         if data.retweeted_status:
             repost = self._collect_result(data.retweeted_status)
@@ -6,6 +6,7 @@ from nonebot import logger
 
 from ..base import Platform, BaseParser, PlatformEnum, ParseException, handle, pconfig
 from ..data import MediaContent
+from ..embedded_json import extract_json
 
 
 class XiaoHongShuParser(BaseParser):
@@ -87,7 +88,9 @@ class XiaoHongShuParser(BaseParser):
             contents.extend(self.create_image_contents(image_urls))
 
         # 构建作者
-        author = self.create_author(note_detail.nickname, note_detail.avatar_url)
+        author = self.create_author(
+            note_detail.nickname, note_detail.avatar_url, user_id=note_detail.user.userId
+        )
 
         return self.result(
             title=note_detail.title,
@@ -123,7 +126,9 @@ class XiaoHongShuParser(BaseParser):
         elif img_urls := note_data.image_urls:
             contents.extend(self.create_image_contents(img_urls))
 
-        author = self.create_author(note_data.user.nickName, note_data.user.avatar)
+        author = self.create_author(
+            note_data.user.nickName, note_data.user.avatar, user_id=note_data.user.userId
+        )
 
         return self.result(
             title=note_data.title,
@@ -134,8 +139,6 @@ class XiaoHongShuParser(BaseParser):
         )
 
     def _extract_initial_state_raw(self, html: str) -> str:
-        pattern = r"window\.__INITIAL_STATE__=(.*?)</script>"
-        if matched := re.search(pattern, html):
-            return matched[1].replace("undefined", "null")
-        else:
+        if (raw := extract_json(html, "window.__INITIAL_STATE__")) is None:
             raise ParseException("小红书分享链接失效或内容已删除")
+        return raw
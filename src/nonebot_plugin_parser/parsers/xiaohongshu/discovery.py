@@ -12,6 +12,7 @@ class Image(Struct):
 class User(Struct):
     nickName: str
     avatar: str
+    userId: str = ""
 
 
 class NoteData(Struct):
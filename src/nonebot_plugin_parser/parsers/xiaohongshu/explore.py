@@ -11,6 +11,7 @@ class Image(Struct):
 class User(Struct):
     nickname: str
     avatar: str
+    userId: str = ""
 
 
 class NoteDetail(Struct):
@@ -1,10 +1,12 @@
 import re
+import time
 from typing import ClassVar
 
 from httpx import AsyncClient
 
 from ..base import Platform, BaseParser, PlatformEnum, handle, pconfig
 from ..cookie import save_cookies_with_netscape
+from .channel import ChannelInfo, ChannelCache
 from ...download import YTDLP_DOWNLOADER
 
 
@@ -21,6 +23,7 @@ class YouTubeParser(BaseParser):
                 self.cookies_file,
                 "youtube.com",
             )
+        self._channel_cache = ChannelCache(self._fetch_channel_info)
 
     @handle("youtu", r"youtu\.be/[A-Za-z\d\._\?%&\+\-=/#]+")
     @handle("youtube", r"youtube\.com/(?:watch|shorts)(?:/[A-Za-z\d_\-]+|\?v=[A-Za-z\d_\-]+)")
@@ -80,6 +83,12 @@ class YouTubeParser(BaseParser):
         )
 
     async def _fetch_author_info(self, channel_id: str):
+        info = await self._channel_cache.get(channel_id)
+        return self.create_author(
+            info.name, info.avatar_url, info.description, user_id=channel_id
+        )
+
+    async def _fetch_channel_info(self, channel_id: str) -> ChannelInfo:
         from . import meta
 
         url = "https://www.youtube.com/youtubei/v1/browse?prettyPrint=false"
@@ -110,4 +119,9 @@ class YouTubeParser(BaseParser):
             response.raise_for_status()
 
         browse = meta.decoder.decode(response.content)
-        return self.create_author(browse.name, browse.avatar_url, browse.description)
+        return ChannelInfo(
+            name=browse.name,
+            avatar_url=browse.avatar_url,
+            description=browse.description,
+            updated_at=time.time(),
+        )
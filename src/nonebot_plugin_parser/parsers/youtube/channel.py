@@ -0,0 +1,98 @@
+"""YouTube 频道信息缓存
+
+频道名称, 头像 URL, 简介持久化到数据目录, 头像文件由 AVATAR_STORE 管理
+"""
+
+import time
+import asyncio
+from pathlib import Path
+from collections.abc import Callable, Awaitable
+
+from msgspec import Struct, json
+from nonebot import logger
+
+from ...utils import safe_unlink
+from ...config import pconfig
+from ...download.avatar import AVATAR_STORE
+
+
+class ChannelInfo(Struct):
+    name: str
+    """频道名称"""
+    avatar_url: str | None
+    """头像 URL"""
+    description: str | None
+    """频道简介"""
+    updated_at: float
+    """更新时间戳"""
+
+
+ChannelFetcher = Callable[[str], Awaitable[ChannelInfo]]
+
+
+class ChannelCache:
+    """频道信息缓存
+
+    超过 refresh_after 的条目仍然直接返回, 同时在后台刷新;
+    超过 ttl 的条目视为失效, 需要重新获取
+    """
+
+    def __init__(
+        self,
+        fetcher: ChannelFetcher,
+        *,
+        ttl: float = 30 * 24 * 3600,
+        refresh_after: float = 24 * 3600,
+    ):
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self.refresh_after = refresh_after
+        self.file: Path = pconfig.data_dir / "youtube_channels.json"
+        self._channels: dict[str, ChannelInfo] = self._load()
+        self._refreshing: dict[str, asyncio.Task[None]] = {}
+        self._save_lock = asyncio.Lock()
+
+    def _load(self) -> dict[str, ChannelInfo]:
+        if not self.file.exists():
+            return {}
+        try:
+            return json.decode(self.file.read_bytes(), type=dict[str, ChannelInfo])
+        except Exception:
+            logger.warning(f"读取 {self.file} 失败, 已忽略")
+            return {}
+
+    async def _save(self):
+        async with self._save_lock:
+            data = json.encode(self._channels)
+            await asyncio.to_thread(self.file.write_bytes, data)
+
+    async def get(self, channel_id: str) -> ChannelInfo:
+        """获取频道信息"""
+        info = self._channels.get(channel_id)
+        if info is None or time.time() - info.updated_at > self.ttl:
+            info = await self._update(channel_id)
+        elif (
+            time.time() - info.updated_at > self.refresh_after
+            and channel_id not in self._refreshing
+        ):
+            task = asyncio.create_task(self._refresh(channel_id))
+            self._refreshing[channel_id] = task
+            task.add_done_callback(lambda _: self._refreshing.pop(channel_id, None))
+
+        return info
+
+    async def _update(self, channel_id: str) -> ChannelInfo:
+        info = await self.fetcher(channel_id)
+        old = self._channels.get(channel_id)
+        if old is not None and old.avatar_url != info.avatar_url:
+            await safe_unlink(AVATAR_STORE.path("youtube", channel_id))
+        self._channels[channel_id] = info
+        await self._save()
+        return info
+
+    async def _refresh(self, channel_id: str):
+        try:
+            await self._update(channel_id)
+            logger.debug(f"YouTube 频道 {channel_id} 信息已刷新")
+        except Exception as e:
+            logger.warning(f"刷新 YouTube 频道 {channel_id} 信息失败: {e}")
@@ -0,0 +1,204 @@
+"""按需性能分析
+
+在事件循环线程上同时运行 cProfile 和栈采样线程, 并在前后各拍一次 tracemalloc 快照,
+结果写入 data_dir/profiles:
+
+- {name}.pstats: cProfile 结果, 可用 snakeviz 等工具查看
+- {name}.collapsed.txt: 折叠栈, 可用 flamegraph.pl / speedscope 生成火焰图
+- {name}.memory.txt: 内存分配差异
+"""
+
+import sys
+import time
+import pstats
+import asyncio
+import cProfile
+import threading
+import contextlib
+import tracemalloc
+from typing import ClassVar
+from pathlib import Path
+from collections import Counter
+
+from nonebot import logger
+
+from .config import pconfig
+from .metrics import METRICS, Trace
+
+
+class _StackSampler(threading.Thread):
+    """定时采样指定线程的调用栈"""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="parser-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class Profiler:
+    """性能分析器, 同一时间只允许一次分析"""
+
+    SAMPLE_INTERVAL: ClassVar[float] = 0.005
+    """栈采样间隔, 单位: 秒"""
+    DEFAULT_SECONDS: ClassVar[float] = 10
+    """未指定时长和次数时的分析时长, 单位: 秒"""
+    MAX_SECONDS: ClassVar[float] = 600
+    """单次分析最长时间, 单位: 秒"""
+    TOP_N: ClassVar[int] = 10
+    """摘要中显示的函数数"""
+
+    def __init__(self):
+        self.profile_dir: Path = pconfig.data_dir / "profiles"
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    @classmethod
+    def effective_seconds(cls, seconds: float | None = None, parses: int | None = None) -> float:
+        """实际的分析时长 (按次数分析时为最长时长), 超过 MAX_SECONDS 时截断
+
+        Raises:
+            ValueError: seconds 或 parses 不是正数
+        """
+        if seconds is not None and seconds <= 0:
+            raise ValueError("分析时长必须大于 0")
+        if parses is not None and parses <= 0:
+            raise ValueError("解析次数必须大于 0")
+        if seconds is None:
+            seconds = cls.MAX_SECONDS if parses else cls.DEFAULT_SECONDS
+        return min(seconds, cls.MAX_SECONDS)
+
+    async def capture(self, seconds: float | None = None, parses: int | None = None) -> str:
+        """执行一次性能分析
+
+        Args:
+            seconds (float | None): 分析时长, 单位: 秒. Defaults to None.
+            parses (int | None): 分析接下来的 parses 次解析, 最长 seconds 秒. Defaults to None.
+
+        Returns:
+            str: 结果摘要
+
+        Raises:
+            ValueError: seconds 或 parses 不是正数
+            RuntimeError: 已有正在进行的性能分析
+        """
+        seconds = self.effective_seconds(seconds, parses)
+        if self.running:
+            raise RuntimeError("已有正在进行的性能分析")
+        async with self._lock:
+            return await self._capture(seconds, parses)
+
+    async def _capture(self, seconds: float, parses: int | None) -> str:
+        name = time.strftime("%Y%m%d-%H%M%S")
+        started_tracemalloc = not tracemalloc.is_tracing()
+        if started_tracemalloc:
+            tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+
+        profile = cProfile.Profile()
+        sampler = _StackSampler(threading.get_ident(), self.SAMPLE_INTERVAL)
+        logger.info(f"开始性能分析: {name}")
+        started_at = time.perf_counter()
+        sampler.start()
+        profile.enable()
+        try:
+            if parses:
+                await self._wait_parses(parses, seconds)
+            else:
+                await asyncio.sleep(seconds)
+        finally:
+            profile.disable()
+            sampler.stop()
+            elapsed = time.perf_counter() - started_at
+            after = tracemalloc.take_snapshot()
+            if started_tracemalloc:
+                tracemalloc.stop()
+
+        return await asyncio.to_thread(
+            self._save, name, elapsed, profile, sampler.stacks, before, after
+        )
+
+    @staticmethod
+    async def _wait_parses(parses: int, timeout: float):
+        """等待接下来的 parses 次解析完成, 最长 timeout 秒"""
+        remaining = parses
+        finished = asyncio.Event()
+
+        def on_trace_end(_: Trace):
+            nonlocal remaining
+            remaining -= 1
+            if remaining <= 0:
+                finished.set()
+
+        METRICS.trace_listeners.append(on_trace_end)
+        try:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(finished.wait(), timeout)
+        finally:
+            METRICS.trace_listeners.remove(on_trace_end)
+
+    def _save(
+        self,
+        name: str,
+        elapsed: float,
+        profile: cProfile.Profile,
+        stacks: Counter[str],
+        before: tracemalloc.Snapshot,
+        after: tracemalloc.Snapshot,
+    ) -> str:
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        base = self.profile_dir / name
+
+        profile.dump_stats(f"{base}.pstats")
+        Path(f"{base}.collapsed.txt").write_text(
+            "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+        )
+        # 过滤掉快照本身产生的分配
+        diff = after.filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        ).compare_to(before, "lineno")
+        Path(f"{base}.memory.txt").write_text("\n".join(map(str, diff[:100])))
+
+        stats = pstats.Stats(profile)
+        top = sorted(
+            stats.stats.items(),  # pyright: ignore[reportAttributeAccessIssue]
+            key=lambda item: item[1][2],
+            reverse=True,
+        )[: self.TOP_N]
+
+        lines = [f"性能分析完成, 耗时 {elapsed:.1f}s, 采样 {sum(stacks.values())} 次"]
+        lines.append("自身耗时最多的函数:")
+        for (file, line, func), (_, calls, tottime, _, _) in top:
+            lines.append(f"  {tottime:.3f}s {calls}次 {func} ({Path(file).name}:{line})")
+        if growth := [d for d in diff[:3] if d.size_diff > 0]:
+            lines.append("内存增长最多:")
+            lines.extend(
+                f"  +{d.size_diff / 1024:.1f} KB {d.traceback[0].filename.rsplit('/', 1)[-1]}:"
+                f"{d.traceback[0].lineno}"
+                for d in growth
+            )
+        lines.append(f"结果文件: {base}.*")
+        return "\n".join(lines)
+
+
+PROFILER: Profiler = Profiler()
+"""全局性能分析器"""
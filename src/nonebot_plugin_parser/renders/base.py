@@ -6,11 +6,11 @@ from pathlib import Path
 from itertools import chain
 from collections.abc import AsyncGenerator
 
-import qrcode  # pyright: ignore[reportMissingModuleSource]
 from nonebot import logger, require
 
 from ..config import pconfig, _nickname
 from ..helper import UniHelper, UniMessage, ForwardNodeInner
+from ..metrics import METRICS
 from ..exception import DownloadException, ZeroSizeException, DownloadLimitException
 from ..parsers.data import (
     ParseResult,
@@ -247,7 +247,8 @@ class Renderer:
     async def render_image(self, result: ParseResult) -> bytes:
         """使用 HTML 绘制通用社交媒体帖子卡片"""
         # 准备模板数据
-        template_data = await self._resolve_parse_result(result)
+        with METRICS.span("resolve"):
+            template_data = await self._resolve_parse_result(result)
 
         # 处理模板针对
         template_name = "card.html.jinja"
@@ -265,20 +266,21 @@ class Renderer:
                     template_name = file_name
 
         # 渲染图片
-        return await template_to_pic(
-            template_path=str(self.templates_dir),
-            template_name=template_name,
-            screenshot_timeout=60000,
-            templates={
-                "result": template_data,
-                "rendering_time": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "bot_name": _nickname,
-            },
-            pages={
-                "viewport": {"width": 800, "height": 100},
-                "base_url": f"file://{self.templates_dir}",
-            },
-        )
+        with METRICS.span("screenshot"):
+            return await template_to_pic(
+                template_path=str(self.templates_dir),
+                template_name=template_name,
+                screenshot_timeout=60000,
+                templates={
+                    "result": template_data,
+                    "rendering_time": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "bot_name": _nickname,
+                },
+                pages={
+                    "viewport": {"width": 800, "height": 100},
+                    "base_url": f"file://{self.templates_dir}",
+                },
+            )
 
     async def _resolve_parse_result(self, result: ParseResult) -> dict[str, Any]:
         """解析 ParseResult 为模板可用的字典数据"""
@@ -377,6 +379,8 @@ class Renderer:
 
         # 添加二维码支持
         if pconfig.append_qrcode and result.url:
+            import qrcode  # pyright: ignore[reportMissingModuleSource]
+
             # 生成二维码
             qr = qrcode.QRCode(
                 version=1,
@@ -411,6 +415,7 @@ class Renderer:
         Returns:
             Image: 图片 Segment
         """
+        METRICS.hit("render", result.render_image is not None)
         if result.render_image is None:
             image_raw = await self.render_image(result)
             image_path = await self.save_img(image_raw)
@@ -1,14 +1,19 @@
+import os
 import re
+import time
 import asyncio
 import hashlib
 import importlib.util
-from typing import Any, TypeVar
+from typing import Any, Generic, TypeVar
 from pathlib import Path
 from collections import OrderedDict
 from urllib.parse import urlparse
+from collections.abc import Callable
 
 from nonebot import logger
 
+from .ffmpeg import FFMPEG, FFmpegPriority
+
 K = TypeVar("K")
 V = TypeVar("V")
 
@@ -28,6 +33,84 @@ class LimitedSizeDict(OrderedDict[K, V]):
             self.popitem(last=False)  # 移除最早添加的项
 
 
+class TTLCache(Generic[K, V]):
+    """
+    带过期时间的定长缓存, 超出容量时淘汰最久未使用的项
+
+    指定 sizeof 时, 同时按字节数限制总容量
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int = 128,
+        *,
+        max_bytes: int = 0,
+        sizeof: Callable[[V], int] | None = None,
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes: int = 0
+        """当前缓存的总字节数, 未指定 sizeof 时恒为 0"""
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def _size(self, value: V) -> int:
+        return self.sizeof(value) if self.sizeof else 0
+
+    def _discard(self, key: K) -> tuple[float, V] | None:
+        item = self._data.pop(key, None)
+        if item is not None:
+            self.nbytes -= self._size(item[1])
+        return item
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expire_at, value = item
+        if expire_at <= time.monotonic():
+            self._discard(key)
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None):
+        """写入缓存
+
+        Args:
+            key (K): 键
+            value (V): 值
+            ttl (float | None): 该项的过期时间, 单位: 秒. Defaults to self.ttl.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        size = self._size(value)
+        if ttl <= 0 or (self.max_bytes and size > self.max_bytes):
+            return
+        self._discard(key)
+        self._data[key] = (time.monotonic() + ttl, value)
+        self.nbytes += size
+        while len(self._data) > self.max_size or (
+            self.max_bytes and self.nbytes > self.max_bytes
+        ):
+            self._discard(next(iter(self._data)))
+
+    def pop(self, key: K, default: V | None = None) -> V | None:
+        item = self._discard(key)
+        return default if item is None else item[1]
+
+    def clear(self):
+        self._data.clear()
+        self.nbytes = 0
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key) is not None  # type: ignore[arg-type]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
 def keep_zh_en_num(text: str) -> str:
     """
     保留字符串中的中英文和数字
@@ -45,24 +128,21 @@ async def safe_unlink(path: Path):
         logger.warning(f"删除 {path} 失败")
 
 
-async def exec_ffmpeg_cmd(cmd: list[str]) -> None:
-    """执行命令
+async def exec_ffmpeg_cmd(
+    cmd: list[str],
+    *,
+    priority: FFmpegPriority = FFmpegPriority.NORMAL,
+    output_path: Path | None = None,
+) -> None:
+    """通过 ffmpeg 任务管理器执行命令
 
     Args:
-        cmd (list[str]): 命令序列
+        cmd (list[str]): 命令序列, 首项为 ffmpeg
+        priority (FFmpegPriority): 优先级. Defaults to NORMAL.
+        output_path (Path | None): 输出文件, 用于统计. Defaults to None.
     """
-    try:
-        process = await asyncio.create_subprocess_exec(
-            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-        )
-        _, stderr = await process.communicate()
-        return_code = process.returncode
-    except FileNotFoundError as e:
-        raise RuntimeError("ffmpeg 未安装或无法找到可执行文件") from e
-
-    if return_code != 0:
-        error_msg = stderr.decode().strip()
-        raise RuntimeError(f"ffmpeg 执行失败: {error_msg}")
+    name = output_path.name if output_path else "ffmpeg"
+    await FFMPEG.run(cmd[1:], name=name, priority=priority, output_path=output_path)
 
 
 async def merge_av(
@@ -70,6 +150,7 @@ async def merge_av(
     v_path: Path,
     a_path: Path,
     output_path: Path,
+    keep_audio: bool = False,
 ) -> None:
     """合并视频和音频
 
@@ -77,6 +158,7 @@ async def merge_av(
         v_path (Path): 视频文件路径
         a_path (Path): 音频文件路径
         output_path (Path): 输出文件路径
+        keep_audio (bool): 合并后是否保留音频文件. Defaults to False.
     """
     logger.info(f"Merging {v_path.name} and {a_path.name} to {output_path.name}")
 
@@ -96,11 +178,45 @@ async def merge_av(
         str(output_path),
     ]
 
-    await exec_ffmpeg_cmd(cmd)
-    await asyncio.gather(safe_unlink(v_path), safe_unlink(a_path))
+    await exec_ffmpeg_cmd(cmd, priority=FFmpegPriority.HIGH, output_path=output_path)
+    if keep_audio:
+        await safe_unlink(v_path)
+    else:
+        await asyncio.gather(safe_unlink(v_path), safe_unlink(a_path))
     logger.success(f"Merged {output_path.name}, {fmt_size(output_path)}")
 
 
+async def extract_audio(video_path: Path, audio_path: Path) -> None:
+    """从视频中直接复制音轨, 不重新编码, 输出为 mp4 容器
+
+    先写入 .part 文件, 成功后才替换为 audio_path, 其他请求不会读到未完成的文件
+
+    Args:
+        video_path (Path): 视频文件路径
+        audio_path (Path): 输出音频文件路径, 应以 .m4a 结尾
+    """
+    part_path = audio_path.with_name(f"{audio_path.name}.part")
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-i",
+        str(video_path),
+        "-vn",
+        "-c:a",
+        "copy",
+        "-f",
+        "mp4",
+        str(part_path),
+    ]
+    try:
+        await exec_ffmpeg_cmd(cmd, priority=FFmpegPriority.HIGH, output_path=part_path)
+    except BaseException:
+        await safe_unlink(part_path)
+        raise
+    os.replace(part_path, audio_path)
+    logger.success(f"提取音轨成功: {audio_path.name}, {fmt_size(audio_path)}")
+
+
 async def merge_av_h264(
     *,
     v_path: Path,
@@ -143,7 +259,7 @@ async def merge_av_h264(
         str(output_path),
     ]
 
-    await exec_ffmpeg_cmd(cmd)
+    await exec_ffmpeg_cmd(cmd, priority=FFmpegPriority.LOW, output_path=output_path)
     await asyncio.gather(safe_unlink(v_path), safe_unlink(a_path))
     logger.success(f"Merged {output_path.name} with H.264, {fmt_size(output_path)}")
 
@@ -173,7 +289,7 @@ async def encode_video_to_h264(video_path: Path) -> Path:
         "23",
         str(output_path),
     ]
-    await exec_ffmpeg_cmd(cmd)
+    await exec_ffmpeg_cmd(cmd, priority=FFmpegPriority.LOW, output_path=output_path)
     logger.success(f"视频重新编码为 H.264 成功: {output_path}, {fmt_size(output_path)}")
     await safe_unlink(video_path)
     return output_path
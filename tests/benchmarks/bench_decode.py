@@ -0,0 +1,210 @@
+"""离线解码基准测试
+
+把合成的页面和接口响应直接交给各平台的解码路径, 不访问网络,
+统计每个用例的耗时 (最快, 中位数, p95) 和单次调用的内存分配峰值, 并与 baseline.json 比较.
+
+    python tests/benchmarks/bench_decode.py            # 运行并与基线比较, 退化时返回 1
+    python tests/benchmarks/bench_decode.py --save     # 运行并更新基线
+    python tests/benchmarks/bench_decode.py -k nga -k tieba
+"""
+
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+import tracemalloc
+from typing import Any
+from pathlib import Path
+from collections.abc import Callable
+
+from msgspec import Struct
+
+ROOT = Path(__file__).resolve().parents[2]
+BASELINE = Path(__file__).with_name("baseline.json")
+sys.path.insert(0, str(ROOT / "src"))
+
+
+class Case(Struct, frozen=True):
+    name: str
+    """用例名称"""
+    payload: Callable[[], Any]
+    """生成输入数据"""
+    run: Callable[[Any], Any]
+    """解码路径"""
+    check: Callable[[Any], bool]
+    """校验解码结果, 避免解码失败时测到的只是异常路径"""
+
+
+class Result(Struct):
+    min_ms: float
+    """最快一次的耗时, 受机器负载影响最小, 用于和基线比较"""
+    median_ms: float
+    p95_ms: float
+    peak_kib: float
+    """单次调用的内存分配峰值"""
+    size_kib: float
+    """输入数据大小"""
+    rounds: int
+
+
+def init_nonebot():
+    import nonebot
+
+    store = Path(tempfile.mkdtemp(prefix="parser-bench-"))
+    nonebot.init(
+        driver="~none",
+        log_level="WARNING",
+        localstore_cache_dir=str(store / "cache"),
+        localstore_config_dir=str(store / "config"),
+        localstore_data_dir=str(store / "data"),
+    )
+    nonebot.load_plugin("nonebot_plugin_parser")
+
+
+def build_cases() -> list[Case]:
+    import payloads
+
+    from nonebot_plugin_parser.parsers.nga import NGAParser
+    from nonebot_plugin_parser.parsers.weibo import WeiBoParser, common
+    from nonebot_plugin_parser.parsers.douyin import video
+    from nonebot_plugin_parser.parsers.twitter import TwitterParser
+    from nonebot_plugin_parser.parsers.kuaishou import states
+    from nonebot_plugin_parser.parsers.tieba.utils import parse_res
+    from nonebot_plugin_parser.parsers.xiaohongshu import explore
+    from nonebot_plugin_parser.parsers.embedded_json import extract_json
+    from nonebot_plugin_parser.parsers.taptap.common import TapTapParser
+
+    def douyin(html: str):
+        return video.decoder.decode(extract_json(html, "window._ROUTER_DATA")).video_data  # pyright: ignore
+
+    def xiaohongshu(html: str):
+        return explore.decoder.decode(extract_json(html, "window.__INITIAL_STATE__"))  # pyright: ignore
+
+    def kuaishou(html: str):
+        return states.decoder.decode(extract_json(html, "window.INIT_STATE"))  # pyright: ignore
+
+    def weibo(content: bytes):
+        data = common.decoder.decode(content).data
+        return data, data.text_content
+
+    return [
+        Case("douyin_router_data", payloads.douyin_video_page, douyin, lambda r: r.video_url is not None),
+        Case(
+            "xhs_initial_state",
+            payloads.xhs_explore_page,
+            xiaohongshu,
+            lambda r: len(r.note.noteDetailMap) == 1,
+        ),
+        Case(
+            "kuaishou_init_state",
+            payloads.kuaishou_photo_page,
+            kuaishou,
+            lambda r: any(d.photo is not None for d in r.values()),
+        ),
+        Case("weibo_status", payloads.weibo_status_json, weibo, lambda r: r[0].retweeted_status is not None),
+        Case("weibo_article", payloads.weibo_article_html, WeiBoParser._split_article, lambda r: len(r[0]) == 80),
+        Case("tieba_parse_res", payloads.tieba_page_res, parse_res, lambda r: len(r.objs) == 30),
+        Case("nga_thread", payloads.nga_thread_html, NGAParser._extract_thread, lambda r: r["author"] == "用户0"),
+        Case(
+            "twitter_xdown",
+            payloads.twitter_xdown_html,
+            TwitterParser._extract_links,
+            lambda r: len(r["images_urls"]) == 4,
+        ),
+        Case("taptap_nuxt", payloads.taptap_nuxt_page, TapTapParser._extract_nuxt_data, lambda r: len(r) > 800),
+    ]
+
+
+def measure(case: Case, min_time: float, max_rounds: int) -> Result:
+    payload = case.payload()
+    result = case.run(payload)
+    if not case.check(result):
+        raise AssertionError(f"{case.name}: 解码结果不符合预期: {result!r:.200}")
+
+    tracemalloc.start()
+    case.run(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings: list[float] = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < max_rounds and (len(timings) < 5 or time.perf_counter() < deadline):
+        started_at = time.perf_counter()
+        case.run(payload)
+        timings.append((time.perf_counter() - started_at) * 1000)
+
+    return Result(
+        min_ms=min(timings),
+        median_ms=statistics.median(timings),
+        p95_ms=statistics.quantiles(timings, n=20)[-1],
+        peak_kib=peak / 1024,
+        size_kib=len(payload) / 1024,
+        rounds=len(timings),
+    )
+
+
+def environment() -> dict[str, str]:
+    from nonebot_plugin_parser.parsers import html_scraper
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "html_backend": html_scraper.BACKEND,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="only", action="append", default=[], help="只运行名称包含该字符串的用例")
+    parser.add_argument("--save", action="store_true", help="把本次结果写入基线")
+    parser.add_argument("--threshold", type=float, default=1.5, help="耗时或内存超过基线的倍数时视为退化")
+    parser.add_argument("--min-time", type=float, default=0.5, help="每个用例至少运行的时间, 单位: 秒")
+    parser.add_argument("--max-rounds", type=int, default=500, help="每个用例最多运行的次数")
+    args = parser.parse_args()
+
+    init_nonebot()
+    cases = [case for case in build_cases() if not args.only or any(k in case.name for k in args.only)]
+
+    baseline: dict[str, Any] = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    env = environment()
+    if baseline and baseline.get("environment") != env:
+        print(f"注意: 基线环境 {baseline.get('environment')} 与当前环境 {env} 不同, 比较结果仅供参考")
+
+    results: dict[str, Result] = {}
+    regressions: list[str] = []
+    print(f"{'case':<22}{'size KiB':>10}{'min ms':>9}{'median ms':>11}{'p95 ms':>9}{'peak KiB':>10}{'vs base':>9}")
+    for case in cases:
+        result = results[case.name] = measure(case, args.min_time, args.max_rounds)
+        ratio = ""
+        if base := baseline.get("cases", {}).get(case.name):
+            time_ratio = result.min_ms / base["min_ms"]
+            mem_ratio = result.peak_kib / base["peak_kib"]
+            ratio = f"{time_ratio:.2f}x"
+            if time_ratio > args.threshold:
+                regressions.append(f"{case.name}: 耗时 {base['min_ms']:.3f}ms -> {result.min_ms:.3f}ms")
+            if mem_ratio > args.threshold:
+                regressions.append(f"{case.name}: 内存峰值 {base['peak_kib']:.0f}KiB -> {result.peak_kib:.0f}KiB")
+        print(
+            f"{case.name:<22}{result.size_kib:>10.1f}{result.min_ms:>9.3f}{result.median_ms:>11.3f}"
+            f"{result.p95_ms:>9.3f}{result.peak_kib:>10.0f}{ratio:>9}"
+        )
+
+    if args.save:
+        from msgspec import to_builtins
+
+        saved = baseline.get("cases", {}) if args.only else {}
+        saved |= {name: to_builtins(result) for name, result in results.items()}
+        BASELINE.write_text(json.dumps({"environment": env, "cases": saved}, indent=2, sort_keys=True) + "\n")
+        print(f"基线已写入 {BASELINE.relative_to(ROOT)}")
+        return 0
+
+    for line in regressions:
+        print(f"退化: {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,376 @@
+"""HTTP 录制与回放
+
+record: 解析给定的链接, 把途经 httpx 的请求/响应脱敏后按平台写入 cassettes/<platform>.json
+replay: 用录制的响应代替网络, 重新解析录制时的链接, 输出每条链接的解析耗时
+
+    python tests/benchmarks/cassette.py record "https://www.bilibili.com/video/BV1xx411c7mD"
+    python tests/benchmarks/cassette.py replay --rounds 20
+
+各解析器自行创建 AsyncClient, 这里直接替换 httpx.AsyncHTTPTransport 的请求方法;
+bilibili_api 默认使用 curl_cffi 客户端, 录制和回放时切换为 httpx 客户端.
+yt-dlp 和 ffmpeg 自带网络栈, 不在录制范围内.
+请求按正在解析的平台归档, 包括解析时在后台启动的下载, 其余请求归入 misc.
+"""
+
+import re
+import sys
+import json
+import time
+import base64
+import asyncio
+import argparse
+import tempfile
+import statistics
+from typing import Any
+from pathlib import Path
+from contextlib import contextmanager
+from collections import defaultdict
+from contextvars import ContextVar
+from urllib.parse import urlsplit, parse_qsl, urlencode
+from collections.abc import Callable, Iterator
+
+import httpx
+from msgspec import Struct
+from msgspec import json as msgjson
+
+ROOT = Path(__file__).resolve().parents[2]
+CASSETTES = Path(__file__).with_name("cassettes")
+sys.path.insert(0, str(ROOT / "src"))
+
+REDACTED = "REDACTED"
+
+SECRET_HEADERS = frozenset({"authorization", "x-csrf-token", "x-bili-ticket"})
+"""整个值都需要脱敏的响应头"""
+SECRET_PARAMS = frozenset(
+    {
+        "sessdata",
+        "bili_jct",
+        "dedeuserid",
+        "dedeuserid__ckmd5",
+        "buvid3",
+        "csrf",
+        "access_key",
+        "access_token",
+        "refresh_token",
+        "token",
+        "xsec_token",
+        "web_session",
+        "a1",
+        "lzkey",
+    }
+)
+"""查询参数, 表单和 JSON 中需要脱敏的字段, 不区分大小写"""
+VOLATILE_PARAMS = frozenset(
+    {"_", "t", "ts", "_t", "timestamp", "rand", "wts", "w_rid", "dm_img_list", "dm_cover_img_str"}
+)
+"""每次请求都会变化的查询参数, 回放时不参与匹配"""
+DROP_HEADERS = frozenset(
+    {"content-encoding", "content-length", "transfer-encoding", "connection", "date", "set-cookie"}
+)
+"""录制的是解压后的内容, 这些头不再适用; 回放按链接匹配, 不需要 set-cookie"""
+TEXT_TYPES = ("text/", "json", "javascript", "xml", "x-www-form-urlencoded")
+
+_SECRET_PAIR = re.compile(r"(?i)\b(" + "|".join(sorted(SECRET_PARAMS, key=len, reverse=True)) + r")=([^&;\s\"']+)")
+_SECRET_JSON = re.compile(r'(?i)"(' + "|".join(sorted(SECRET_PARAMS, key=len, reverse=True)) + r')"\s*:\s*"[^"]*"')
+
+current_platform: ContextVar[str] = ContextVar("cassette_platform", default="misc")
+"""正在解析的平台, 解析时创建的下载任务会继承该值"""
+
+
+class Interaction(Struct):
+    method: str
+    url: str
+    """脱敏后的链接"""
+    status: int
+    headers: dict[str, str]
+    """脱敏后的响应头"""
+    body: str
+    """响应体, 文本原样保存, 其余为 base64"""
+    binary: bool = False
+    truncated: bool = False
+    """超过 --max-body 的媒体文件只保存开头部分, 文本总是完整保存"""
+    request_body: str = ""
+    """脱敏后的文本请求体, 仅供查阅"""
+
+
+class Cassette(Struct):
+    platform: str
+    sources: list[str] = []
+    """录制时解析的链接, 回放时按此重新解析"""
+    interactions: list[Interaction] = []
+
+
+def redact_text(text: str) -> str:
+    text = _SECRET_PAIR.sub(lambda m: f"{m[1]}={REDACTED}", text)
+    return _SECRET_JSON.sub(lambda m: f'"{m[1]}": "{REDACTED}"', text)
+
+
+def redact_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = [(k, REDACTED if k.lower() in SECRET_PARAMS else v) for k, v in parse_qsl(parts.query, True)]
+    return parts._replace(query=urlencode(query)).geturl()
+
+
+def redact_headers(headers: httpx.Headers) -> dict[str, str]:
+    return {
+        key: REDACTED if key in SECRET_HEADERS else value
+        for key, value in headers.items()
+        if key not in DROP_HEADERS
+    }
+
+
+def match_key(method: str, url: str) -> str:
+    """回放时的匹配键: 方法 + 去掉易变参数并排序后的脱敏链接"""
+    parts = urlsplit(redact_url(url))
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, True) if k not in VOLATILE_PARAMS)
+    return f"{method} {parts._replace(scheme='https', query=urlencode(query), fragment='').geturl()}"
+
+
+def _is_text(content_type: str) -> bool:
+    return any(kind in content_type for kind in TEXT_TYPES)
+
+
+class CassetteLibrary:
+    """按平台保存的录制内容"""
+
+    def __init__(self, directory: Path = CASSETTES):
+        self.directory = directory
+        self.cassettes: dict[str, Cassette] = {}
+
+    def load(self) -> "CassetteLibrary":
+        for path in sorted(self.directory.glob("*.json")):
+            cassette = msgjson.decode(path.read_bytes(), type=Cassette)
+            self.cassettes[cassette.platform] = cassette
+        return self
+
+    def get(self, platform: str) -> Cassette:
+        if (cassette := self.cassettes.get(platform)) is None:
+            cassette = self.cassettes[platform] = Cassette(platform)
+        return cassette
+
+    def save(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for platform, cassette in self.cassettes.items():
+            content = json.dumps(msgjson.decode(msgjson.encode(cassette)), ensure_ascii=False, indent=1)
+            (self.directory / f"{platform}.json").write_text(content + "\n")
+
+
+class RecordTransport(httpx.AsyncBaseTransport):
+    """转发请求并把脱敏后的请求/响应记入录制内容"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, library: CassetteLibrary, max_body: int = 1 << 20):
+        self.transport = transport
+        self.library = library
+        self.max_body = max_body
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        url = redact_url(str(request.url))
+        response = await self.transport.handle_async_request(request)
+        # 读取解压后的内容, 再以新的响应交给客户端
+        response.request = request
+        content = await response.aread()
+        await response.aclose()
+
+        if binary := not _is_text(response.headers.get("content-type", "")):
+            body = base64.b64encode(content[: self.max_body]).decode()
+        else:
+            body = redact_text(content.decode(response.encoding or "utf-8", "replace"))
+        request_body = ""
+        if _is_text(request.headers.get("content-type", "")) and isinstance(request.stream, httpx.ByteStream):
+            request_body = request.content.decode("utf-8", "replace")
+        self.library.get(current_platform.get()).interactions.append(
+            Interaction(
+                method=request.method,
+                url=url,
+                status=response.status_code,
+                headers=redact_headers(response.headers),
+                body=body,
+                binary=binary,
+                truncated=binary and len(content) > self.max_body,
+                request_body=redact_text(request_body),
+            )
+        )
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in DROP_HEADERS]
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+
+class CassetteMiss(Exception):
+    """回放时没有匹配的录制内容"""
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """只返回录制的响应, 同一请求录制了多次时按顺序返回, 用完后重复最后一次"""
+
+    def __init__(self, library: CassetteLibrary):
+        self.queues: dict[str, list[Interaction]] = defaultdict(list)
+        for cassette in library.cassettes.values():
+            for interaction in cassette.interactions:
+                self.queues[match_key(interaction.method, interaction.url)].append(interaction)
+        self.cursors: dict[str, int] = defaultdict(int)
+
+    def reset(self):
+        self.cursors.clear()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = match_key(request.method, str(request.url))
+        if not (queue := self.queues.get(key)):
+            raise CassetteMiss(f"没有录制 {key}")
+        index = min(self.cursors[key], len(queue) - 1)
+        self.cursors[key] += 1
+        interaction = queue[index]
+        content = base64.b64decode(interaction.body) if interaction.binary else interaction.body.encode()
+        return httpx.Response(interaction.status, headers=interaction.headers, content=content, request=request)
+
+
+@contextmanager
+def use_transport(wrap: Callable[[httpx.AsyncBaseTransport], httpx.AsyncBaseTransport]) -> Iterator[None]:
+    """让所有 httpx 异步客户端经过 wrap(network) 返回的 transport, network 为原本的网络请求"""
+    original = httpx.AsyncHTTPTransport.handle_async_request
+
+    class _Network(httpx.AsyncBaseTransport):
+        def __init__(self, owner: httpx.AsyncHTTPTransport):
+            self.owner = owner
+
+        async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+            return await original(self.owner, request)
+
+    async def handle_async_request(self: httpx.AsyncHTTPTransport, request: httpx.Request) -> httpx.Response:
+        return await wrap(_Network(self)).handle_async_request(request)
+
+    httpx.AsyncHTTPTransport.handle_async_request = handle_async_request
+    try:
+        yield
+    finally:
+        httpx.AsyncHTTPTransport.handle_async_request = original
+
+
+def use_httpx_for_bilibili():
+    """bilibili 解析器导入时选择了 curl_cffi, 切换为 httpx 才能录制和回放"""
+    from nonebot_plugin_parser.utils import is_module_available
+
+    if not is_module_available("bilibili_api"):
+        return
+    from bilibili_api import select_client
+
+    import nonebot_plugin_parser.parsers.bilibili  # noqa: F401
+
+    select_client("httpx")
+
+
+def init_nonebot(store: Path):
+    import nonebot
+
+    nonebot.init(
+        driver="~none",
+        log_level="WARNING",
+        localstore_cache_dir=str(store / "cache"),
+        localstore_config_dir=str(store / "config"),
+        localstore_data_dir=str(store / "data"),
+    )
+    nonebot.load_plugin("nonebot_plugin_parser")
+
+
+def find_parser(url: str):
+    """按清单中的关键词和正则找到解析器, 与 matchers.rule 的匹配方式一致"""
+    from nonebot_plugin_parser.parsers.manifest import MANIFEST, load_parser_class
+
+    for entry in MANIFEST:
+        if not entry.available:
+            continue
+        for keyword, pattern in entry.key_patterns:
+            if keyword in url and (searched := re.search(pattern, url)):
+                return load_parser_class(entry)(), keyword, searched
+    raise SystemExit(f"没有解析器能处理 {url}")
+
+
+async def parse(url: str):
+    parser, keyword, searched = find_parser(url)
+    token = current_platform.set(parser.platform.name)
+    try:
+        return await parser.parse(keyword, searched)
+    finally:
+        current_platform.reset(token)
+
+
+async def drain(existing: set[asyncio.Task[Any]]):
+    """等待解析时在后台启动的下载任务"""
+    pending = asyncio.all_tasks() - existing - {asyncio.current_task()}
+    await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def record(args: argparse.Namespace) -> int:
+    library = CassetteLibrary(args.dir).load()
+    failed = 0
+    with use_transport(lambda network: RecordTransport(network, library, args.max_body)):
+        for url in args.urls:
+            parser, _, _ = find_parser(url)
+            cassette = library.get(parser.platform.name)
+            # 追加录制, 同一链接只回放一次
+            if (source := redact_url(url)) not in cassette.sources:
+                cassette.sources.append(source)
+            existing = asyncio.all_tasks()
+            try:
+                result = await parse(url)
+                await drain(existing)
+                print(f"已录制 {url}: {result.title or result.text or ''!s:.40}")
+            except Exception as e:
+                failed += 1
+                print(f"录制 {url} 时解析失败: {e!r}")
+    library.save()
+    print(f"录制内容已写入 {args.dir}")
+    return 1 if failed else 0
+
+
+async def replay(args: argparse.Namespace) -> int:
+    library = CassetteLibrary(args.dir).load()
+    if not library.cassettes:
+        raise SystemExit(f"{args.dir} 中没有录制内容")
+    transport = ReplayTransport(library)
+    failed = 0
+    # 首次解析之后可能命中解析器内部的缓存, 因此单独列出首次耗时
+    print(f"{'platform':<14}{'first ms':>10}{'min ms':>9}{'median ms':>11}  url")
+    with use_transport(lambda _: transport):
+        for platform, cassette in sorted(library.cassettes.items()):
+            if args.only and platform not in args.only:
+                continue
+            for url in cassette.sources:
+                timings: list[float] = []
+                try:
+                    for _ in range(args.rounds):
+                        transport.reset()
+                        existing = asyncio.all_tasks()
+                        started_at = time.perf_counter()
+                        await parse(url)
+                        timings.append((time.perf_counter() - started_at) * 1000)
+                        await drain(existing)
+                except Exception as e:
+                    failed += 1
+                    print(f"{platform:<14}{'failed':>30}  {url}: {e!r}")
+                    continue
+                print(
+                    f"{platform:<14}{timings[0]:>10.2f}{min(timings):>9.2f}{statistics.median(timings):>11.2f}  {url}"
+                )
+    return 1 if failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", type=Path, default=CASSETTES, help="录制内容目录")
+    sub = parser.add_subparsers(dest="command", required=True)
+    record_parser = sub.add_parser("record", help="访问网络并录制")
+    record_parser.add_argument("urls", nargs="+", help="要解析的链接")
+    record_parser.add_argument("--max-body", type=int, default=1 << 20, help="单个媒体文件最多保存的字节数")
+    replay_parser = sub.add_parser("replay", help="离线回放录制内容")
+    replay_parser.add_argument("-k", dest="only", action="append", default=[], help="只回放指定平台")
+    replay_parser.add_argument("--rounds", type=int, default=10, help="每条链接解析的次数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="parser-cassette-") as store:
+        init_nonebot(Path(store))
+        use_httpx_for_bilibili()
+        run = record if args.command == "record" else replay
+        return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""端到端负载测试
+
+按消息配比并发投递群消息事件, 走完整的 parser_handler -> Renderer.render_messages -> 发送 流程.
+发送由假的 OneBot V11 适配器接收, 所有 httpx 请求改写到 standin.py 启动的本地替身服务器.
+输出吞吐, 端到端与各阶段 (METRICS) 的 p50/p95/p99, 进程内存峰值和打开的文件描述符数.
+
+    python tests/benchmarks/loadtest.py --messages 200 --concurrency 16
+    python tests/benchmarks/loadtest.py --mix douyin=3,weibo=1,weibo_418=1 --no-screenshot
+
+卡片截图依赖 nonebot-plugin-htmlrender 的浏览器, 未安装浏览器时可用 --no-screenshot
+以固定图片代替截图, 其余阶段不变
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import resource
+import tempfile
+import itertools
+import subprocess
+from typing import Any
+from pathlib import Path
+from collections import Counter, defaultdict
+from collections.abc import Callable
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src"))
+
+SCENARIOS: dict[str, Callable[[int], str]] = {
+    "douyin": lambda i: f"https://v.douyin.com/lt{i:06d}/",
+    "douyin_slow": lambda i: f"https://v.douyin.com/slow{i:06d}/",
+    "kuaishou": lambda i: f"https://v.kuaishou.com/lt{i:06d}",
+    "xiaohongshu": lambda i: f"https://www.xiaohongshu.com/explore/68feefe40000000007030c4a?xsec_token=lt{i}",
+    "weibo": lambda i: f"https://m.weibo.cn/detail/{5000000000000000 + i}",
+    "weibo_418": lambda i: f"https://m.weibo.cn/detail/{4180000000000000 + i}",
+    "nga": lambda i: f"https://nga.178.com/read.php?tid={40000000 + i}",
+    "twitter": lambda i: f"https://x.com/user/status/{1800000000000000000 + i}",
+}
+"""场景 -> 第 i 条消息中的链接, 链接各不相同, 不会命中解析结果缓存"""
+
+DEFAULT_MIX = "douyin=4,kuaishou=2,xiaohongshu=2,weibo=2,nga=1,twitter=1,douyin_slow=1,weibo_418=1"
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"未知场景 {name}, 可选: {', '.join(SCENARIOS)}")
+        weights[name] = int(weight or 1)
+    return weights
+
+
+def quantiles(values: list[float]) -> str:
+    values = sorted(values) or [0.0]
+    p50, p95, p99 = (values[min(len(values) - 1, int(q * len(values)))] for q in (0.5, 0.95, 0.99))
+    return f"{p50 * 1000:>9.1f}{p95 * 1000:>9.1f}{p99 * 1000:>9.1f}"
+
+
+def start_standin(args: argparse.Namespace) -> tuple[subprocess.Popen[str], int]:
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            str(Path(__file__).with_name("standin.py")),
+            "--video-kib",
+            str(args.video_kib),
+            "--slow-delay",
+            str(args.slow_delay),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    assert process.stdout is not None
+    return process, int(process.stdout.readline())
+
+
+def init_nonebot(store: Path, args: argparse.Namespace):
+    import nonebot
+
+    nonebot.init(
+        driver="~fastapi",
+        log_level=args.log_level,
+        localstore_cache_dir=str(store / "cache"),
+        localstore_config_dir=str(store / "config"),
+        localstore_data_dir=str(store / "data"),
+        # 每条链接都只发送一次, 不需要延迟发送
+        parser_delay_send_media=False,
+        parser_delay_send_lazy_download=False,
+    )
+    nonebot.load_plugin("nonebot_plugin_parser")
+
+
+def route_to_standin(port: int):
+    """把所有 httpx 请求改写到替身服务器, Host 头保持原样"""
+    import httpx
+
+    handle = httpx.AsyncHTTPTransport.handle_async_request
+
+    async def handle_async_request(self: httpx.AsyncHTTPTransport, request: httpx.Request) -> httpx.Response:
+        request.url = request.url.copy_with(scheme="http", host="127.0.0.1", port=port)
+        return await handle(self, request)
+
+    httpx.AsyncHTTPTransport.handle_async_request = handle_async_request
+
+
+def skip_screenshot():
+    """以固定图片代替卡片截图"""
+    from standin import _png
+
+    from nonebot_plugin_parser.renders import base
+
+    image = _png(800, 600)
+
+    async def template_to_pic(**kwargs: Any) -> bytes:
+        return image
+
+    base.template_to_pic = template_to_pic
+
+
+def create_bot():
+    import nonebot
+    from nonebot.adapters.onebot.v11 import Bot, Adapter
+
+    sent: dict[int, list[str]] = defaultdict(list)
+    """群号 (即消息序号) -> 调用过的发送类 API"""
+    message_ids = itertools.count(1)
+
+    class LoadTestAdapter(Adapter):
+        async def _call_api(self, bot: Bot, api: str, **data: Any) -> Any:
+            if api.startswith("send_"):
+                sent[data.get("group_id", 0)].append(api)
+                return {"message_id": next(message_ids)}
+            # uninfo 获取会话信息时用到的接口
+            user_id = data.get("user_id", 0)
+            group_id = data.get("group_id", 0)
+            if api in ("get_group_member_info", "get_stranger_info", "get_login_info"):
+                return {"user_id": user_id, "nickname": f"用户{user_id}", "card": "", "role": "member"}
+            if api == "get_group_info":
+                return {"group_id": group_id, "group_name": f"群{group_id}", "member_count": 1, "max_member_count": 200}
+            return None
+
+    driver = nonebot.get_driver()
+    bot = Bot(LoadTestAdapter(driver), "10000")
+    driver._bot_connect(bot)
+    return bot, sent
+
+
+def create_event(index: int, text: str):
+    from nonebot.compat import type_validate_python
+    from nonebot.adapters.onebot.v11 import Message, GroupMessageEvent
+
+    return type_validate_python(
+        GroupMessageEvent,
+        {
+            "time": int(time.time()),
+            "self_id": 10000,
+            "post_type": "message",
+            "sub_type": "normal",
+            "user_id": 20000 + index,
+            "message_type": "group",
+            "message_id": index,
+            "message": Message(text),
+            "original_message": Message(text),
+            "raw_message": text,
+            "font": 0,
+            "sender": {"user_id": 20000 + index, "nickname": "load"},
+            "group_id": index,
+        },
+    )
+
+
+class Sampler:
+    """定时采样打开的文件描述符数"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_fds = 0
+
+    @staticmethod
+    def open_fds() -> int:
+        return len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else 0
+
+    async def run(self):
+        while True:
+            self.peak_fds = max(self.peak_fds, self.open_fds())
+            await asyncio.sleep(self.interval)
+
+
+async def run(args: argparse.Namespace, port: int) -> int:
+    import nonebot
+    from nonebot.message import handle_event
+
+    from nonebot_plugin_parser.metrics import METRICS
+
+    driver = nonebot.get_driver()
+    route_to_standin(port)
+    if args.no_screenshot:
+        skip_screenshot()
+    await driver._lifespan.startup()
+    bot, sent = create_bot()
+
+    weights = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    plan = rng.choices(list(weights), weights=list(weights.values()), k=args.messages)
+
+    # 预热: 每个场景先跑一条, 导入解析器并建立连接, 不计入结果
+    for offset, name in enumerate(weights, start=1):
+        await handle_event(bot, create_event(10**6 + offset, SCENARIOS[name](10**6 + offset)))
+    METRICS.histograms.clear()
+    METRICS.counters.clear()
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: dict[str, list[float]] = defaultdict(list)
+    outcomes: Counter[tuple[str, bool]] = Counter()
+
+    async def deliver(index: int, name: str):
+        async with semaphore:
+            started_at = time.perf_counter()
+            await handle_event(bot, create_event(index, SCENARIOS[name](index)))
+            latencies[name].append(time.perf_counter() - started_at)
+            outcomes[name, bool(sent.get(index))] += 1
+
+    sampler = Sampler()
+    sampler_task = asyncio.create_task(sampler.run())
+    fds_before = sampler.open_fds()
+    started_at = time.perf_counter()
+    await asyncio.gather(*(deliver(index, name) for index, name in enumerate(plan, start=1)))
+    elapsed = time.perf_counter() - started_at
+    sampler_task.cancel()
+    fds_after = sampler.open_fds()
+    await driver._lifespan.shutdown()
+
+    throughput = args.messages / elapsed
+    print(f"\n{args.messages} 条消息, 并发 {args.concurrency}, 耗时 {elapsed:.2f}s, 吞吐 {throughput:.1f} 条/s")
+    print(f"\n{'scenario':<14}{'ok':>6}{'failed':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name in weights:
+        print(f"{name:<14}{outcomes[name, True]:>6}{outcomes[name, False]:>8}{quantiles(latencies[name])}")
+    print(f"{'all':<14}{'':>14}{quantiles([v for values in latencies.values() for v in values])}")
+
+    print(f"\n{'stage':<14}{'count':>6}{'':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    stages: dict[str, list[float]] = defaultdict(list)
+    for (stage, _), histogram in METRICS.histograms.items():
+        stages[stage].extend(value for _, value in histogram.samples)
+    for stage, values in sorted(stages.items()):
+        print(f"{stage:<14}{len(values):>6}{'':>8}{quantiles(values)}")
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"\n内存峰值 {peak_rss:.0f} MiB, 文件描述符 峰值 {sampler.peak_fds}, 开始 {fds_before}, 结束 {fds_after}")
+    unexpected = sum(count for (name, ok), count in outcomes.items() if not ok and name != "weibo_418")
+    return 1 if unexpected else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200, help="消息总数")
+    parser.add_argument("--concurrency", type=int, default=16, help="同时处理的消息数")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"场景配比, 可选场景: {', '.join(SCENARIOS)}")
+    parser.add_argument("--seed", type=int, default=1, help="消息顺序的随机种子")
+    parser.add_argument("--video-kib", type=int, default=512, help="替身服务器返回的视频大小, 单位: KiB")
+    parser.add_argument("--slow-delay", type=float, default=2.0, help="慢响应场景的延迟, 单位: 秒")
+    parser.add_argument("--no-screenshot", action="store_true", help="以固定图片代替卡片截图")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    standin, port = start_standin(args)
+    try:
+        with tempfile.TemporaryDirectory(prefix="parser-load-") as store:
+            init_nonebot(Path(store), args)
+            return asyncio.run(run(args, port))
+    finally:
+        standin.terminate()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""基准测试用的合成页面与接口响应
+
+按各平台线上页面的结构和体量生成, 每个页面以自身名称作为随机种子, 生成的内容与调用顺序无关.
+除贴吧 protobuf 需要插件中的消息定义外只依赖标准库
+"""
+
+import json
+import random
+from functools import cache
+
+_rng = random.Random(20240501)
+
+_WORDS = ("测试", "内容", "分享", "今天", "abc", "视频", "#话题#", "@用户", "😀", "https://t.cn/x")
+
+
+def _seed(name: str):
+    _rng.seed(name)
+
+
+def _text(count: int) -> str:
+    return " ".join(_rng.choice(_WORDS) for _ in range(count))
+
+
+def _cdn(host: str, path: str, count: int = 3) -> list[str]:
+    return [f"https://{host}{i}.example.com/{path}?sign={'a' * 64}" for i in range(count)]
+
+
+def _page(*scripts: str, padding: int = 2000) -> str:
+    """SSR 页面: 若干无关的 script/style, 大段 DOM, 末尾是数据 script"""
+    head = "".join(f"<script>window.__c{i}=function(){{return {i}}};</script>" for i in range(20))
+    body = "".join(f'<div class="item-{i % 7}"><span>{i}</span></div>' for i in range(padding))
+    tail = "".join(f"<script>{script}</script>" for script in scripts)
+    return f"<!DOCTYPE html><html><head><style>.a{{color:red}}</style>{head}</head><body>{body}{tail}</body></html>"
+
+
+@cache
+def douyin_video_page() -> str:
+    """抖音视频分享页, window._ROUTER_DATA"""
+    _seed("douyin_video_page")
+    item = {
+        "aweme_id": "7350000000000000000",
+        "desc": _text(40),
+        "create_time": 1714521600,
+        "author": {
+            "nickname": "作者",
+            "sec_uid": "MS4wLjABAAAA" + "x" * 40,
+            "avatar_thumb": {"url_list": _cdn("p3-sign", "avatar.jpeg")},
+            "avatar_medium": {"url_list": _cdn("p3-sign", "avatar-m.jpeg")},
+        },
+        "video": {
+            "play_addr": {"url_list": _cdn("aweme", "playwm/?video_id=v0200f")},
+            "cover": {"url_list": _cdn("p3-sign", "cover.jpeg")},
+            "duration": 15000,
+            "bit_rate": [{"gear_name": f"gear_{i}", "bit_rate": 1000 * i} for i in range(8)],
+        },
+        "images": None,
+        "statistics": {"digg_count": 123456, "comment_count": 789, "share_count": 42},
+        "music": {"title": "原声", "play_url": {"url_list": _cdn("sf3", "music.mp3")}},
+        "text_extra": [{"hashtag_name": f"话题{i}", "start": i, "end": i + 3} for i in range(10)],
+    }
+    router_data = {
+        "loaderData": {
+            "video_(id)/page": {"videoInfoRes": {"item_list": [item], "status_code": 0}},
+            "layout": {"user": None, "settings": {f"k{i}": i for i in range(200)}},
+        },
+        "errors": None,
+    }
+    payload = json.dumps(router_data, ensure_ascii=False)
+    return _page(f"window._ROUTER_DATA = {payload}")
+
+
+@cache
+def xhs_explore_page(note_id: str = "68feefe40000000007030c4a") -> str:
+    """小红书笔记页, window.__INITIAL_STATE__"""
+    _seed("xhs_explore_page")
+    note = {
+        "noteId": note_id,
+        "type": "normal",
+        "title": _text(6),
+        "desc": _text(120),
+        "time": 1714521600000,
+        "user": {"nickname": "作者", "avatar": _cdn("sns-avatar", "avatar.jpg", 1)[0], "userId": "5f" + "0" * 22},
+        "imageList": [
+            {"urlDefault": f"https://sns-webpic.example.com/{i}.jpg", "width": 1080, "height": 1440}
+            for i in range(9)
+        ],
+        "tagList": [{"id": str(i), "name": f"标签{i}"} for i in range(10)],
+        "interactInfo": {"likedCount": "1.2万", "collectedCount": "3456", "commentCount": "789"},
+    }
+    state = {
+        "global": {"appSettings": {f"flag{i}": i % 2 == 0 for i in range(300)}},
+        "user": {"loggedIn": False, "userInfo": None},
+        "note": {"noteDetailMap": {note_id: {"note": note, "comments": {"list": [], "cursor": ""}}}},
+        "feed": {"feeds": [{"id": f"{i:024x}", "display_title": _text(5)} for i in range(60)]},
+    }
+    payload = json.dumps(state, ensure_ascii=False).replace("null", "undefined")
+    return _page(f"window.__INITIAL_STATE__={payload}")
+
+
+@cache
+def kuaishou_photo_page() -> str:
+    """快手分享页, window.INIT_STATE"""
+    _seed("kuaishou_photo_page")
+    photo = {
+        "caption": _text(40),
+        "timestamp": 1714521600000,
+        "duration": 30000,
+        "userName": "ㅤ快手用户",
+        "headUrl": _cdn("p2", "head.jpg", 1)[0],
+        "coverUrls": [{"cdn": f"p{i}.a.yximgs.com", "url": url} for i, url in enumerate(_cdn("p", "cover.jpg"))],
+        "mainMvUrls": [{"cdn": f"v{i}.kwaicdn.com", "url": url} for i, url in enumerate(_cdn("v", "main.mp4"))],
+        "ext_params": {"atlas": {}},
+    }
+    state = {f"tusjoh{i}": {"result": 1} for i in range(30)}
+    state["tusjoh_photo"] = {"result": 1, "photo": photo}
+    state["config"] = {"result": 1, "settings": {f"k{i}": "v" * 20 for i in range(300)}}
+    payload = json.dumps(state, ensure_ascii=False)
+    return _page(f"window.INIT_STATE = {payload}")
+
+
+@cache
+def weibo_status_json() -> bytes:
+    """微博 m.weibo.cn statuses/show 接口响应"""
+    _seed("weibo_status_json")
+
+    def status(depth: int) -> dict:
+        data = {
+            "id": 5000000000000000 + depth,
+            "bid": f"Q{depth}abcdefg",
+            "created_at": "Thu Oct 02 14:39:33 +0800 2025",
+            "text": "<br />".join(f'{_text(10)} <a href="/n/{i}">@用户{i}</a>' for i in range(20)),
+            "source": "微博网页版",
+            "user": {
+                "id": 1000 + depth,
+                "screen_name": f"用户{depth}",
+                "profile_image_url": _cdn("tvax1.sinaimg", "avatar.jpg", 1)[0],
+                "followers_count": 123456,
+            },
+            "pics": [
+                {"url": f"https://wx1.sinaimg.cn/orj360/{i}.jpg", "large": {"url": f"https://wx1.sinaimg.cn/large/{i}.jpg"}}
+                for i in range(9)
+            ],
+            "reposts_count": 12,
+            "comments_count": 34,
+            "attitudes_count": 56,
+        }
+        if depth == 0:
+            data["retweeted_status"] = status(1)
+        return data
+
+    return json.dumps({"ok": 1, "data": status(0)}, ensure_ascii=False).encode()
+
+
+@cache
+def weibo_article_html() -> str:
+    """微博头条文章正文"""
+    _seed("weibo_article_html")
+    return "".join(
+        f"<p>段落 {i} {_text(40)}​</p>"
+        + (f'<p><img src="https://wx1.sinaimg.cn/large/{i}.jpg"></p>' if i % 5 == 0 else "")
+        for i in range(400)
+    )
+
+
+@cache
+def tieba_page_res() -> bytes:
+    """贴吧 pb/page 接口的 protobuf 响应, 30 层楼, 每层 4 条楼中楼"""
+    _seed("tieba_page_res")
+    from nonebot_plugin_parser.parsers.tieba.utils import get_message
+
+    res = get_message("PbPageResIdl")()
+    data = res.data
+    data.forum.id = 52
+    data.forum.name = "测试"
+    data.thread.id = 9000000000
+    data.thread.title = _text(8)
+    data.thread.author.id = 1
+    data.page.current_page = 1
+    data.page.total_page = 5
+    data.page.has_more = 1
+    for uid in range(1, 41):
+        user = data.user_list.add()
+        user.id = uid
+        user.name = f"user{uid}"
+        user.name_show = f"用户{uid}"
+        user.portrait = f"tb.1.{uid:08x}.portrait"
+    for floor in range(1, 31):
+        post = data.post_list.add()
+        post.id = 150000000000 + floor
+        post.floor = floor
+        post.author_id = floor % 40 + 1
+        post.time = 1714521600 + floor
+        for i in range(6):
+            frag = post.content.add()
+            frag.type = 0
+            frag.text = _text(20)
+        img = post.content.add()
+        img.type = 3
+        img.cdn_src = f"http://tiebapic.baidu.com/forum/w%3D720/sign={'0' * 32}/{floor:032x}.jpg"
+        img.big_cdn_src = img.cdn_src.replace("720", "960")
+        img.origin_src = img.cdn_src.replace("w%3D720", "pic/item")
+        img.bsize = "1080,1440"
+        for j in range(4):
+            sub = post.sub_post_list.sub_post_list.add()
+            sub.id = post.id * 10 + j
+            sub.author_id = (floor + j) % 40 + 1
+            frag = sub.content.add()
+            frag.type = 0
+            frag.text = _text(10)
+    return res.SerializeToString()
+
+
+@cache
+def nga_thread_html() -> str:
+    """NGA 帖子页, 60 层楼"""
+    _seed("nga_thread_html")
+    posts = []
+    for i in range(60):
+        body = _text(300).replace("abc", "[b]粗[/b]").replace("分享", "[url=x]链接[/url]")
+        posts.append(
+            f"<table class='forumbox postbox'><tr><td class='c1'>"
+            f"<a href='nuke.php?func=ucp&uid={1000 + i}' id='postauthor{i}' class='author b'>u{i}</a>"
+            f"<div class='stat'><span id='postdate{i}' title='reply time'>2024-05-0{1 + i % 9} 12:3{i % 10}</span>"
+            f"</div></td><td class='c2'><h3 id='postsubject{i}'>标题 {i}</h3>"
+            f"<span id='postcontent{i}' class='postcontent ubbcode'>{body}<br/>[img]./mon_2024/{i}.jpg[/img]<br/>"
+            f"{_text(100)}<br/>[quote]引用 {_text(20)}[/quote]</span></td></tr></table>"
+        )
+    users = {str(1000 + i): {"uid": 1000 + i, "username": f"用户{i}"} for i in range(60)}
+    nav = "<div class=nav>" + "<a href=x>nav</a>" * 500 + "</div>"
+    return (
+        "<html><head><meta charset='gbk'><script>var a=1</script></head><body>"
+        f"{nav}{''.join(posts)}"
+        f"<script>commonui.userInfo.setAll({json.dumps(users, ensure_ascii=False)})</script></body></html>"
+    )
+
+
+@cache
+def twitter_xdown_html() -> str:
+    """xdown 接口返回的推文下载页片段"""
+    _seed("twitter_xdown_html")
+    buttons = "".join(
+        f'<p><a class="tw-button-dl button" href="https://dl.example.com/{i}.jpg">下载图片</a></p>' for i in range(4)
+    )
+    return (
+        '<div><img src="https://pbs.twimg.com/media/cover.jpg"><h3>推文标题</h3>'
+        f'{buttons}<a class="abutton" href="https://dl.example.com/x.gif">下载 gif</a></div>'
+    )
+
+
+@cache
+def taptap_nuxt_page() -> str:
+    """TapTap 动态详情页, __NUXT_DATA__ 为扁平化的引用数组"""
+    _seed("taptap_nuxt_page")
+    data: list = [{"data": 1, "state": 2}, {"moment": 3}, {"user": 4}]
+    moment = {"id": 5, "author": 6, "contents": 7, "stat": 8}
+    data.append(moment)
+    data.append({"name": 9, "avatar": 10})
+    data.extend(["620000000", {"user": 4}])
+    contents_index = len(data)
+    data.append([])
+    data.append({"likes": 11, "comments": 12})
+    data.extend(["作者", "https://img.tapimg.com/avatar.png", 1234, 56])
+    for i in range(400):
+        data[contents_index].append(len(data))
+        data.append({"type": "paragraph", "children": len(data) + 1})
+        data.append([{"type": "text", "text": _text(20)}, {"type": "image", "url": f"https://img.tapimg.com/{i}.jpg"}])
+    payload = json.dumps(data, ensure_ascii=False)
+    return _page(
+        'document.getElementById("__NUXT_DATA__")',
+        padding=3000,
+    ).replace(
+        "</body>",
+        f'<script type="application/json" id="__NUXT_DATA__" data-ssr="true">{payload}</script></body>',
+    )
@@ -0,0 +1,166 @@
+"""各平台的本地替身服务器
+
+负载测试时所有 httpx 请求都被改写到这里, 按请求的 Host 和路径返回 payloads.py 中的合成页面,
+接口响应和媒体文件. 为了不占用被测进程的事件循环, 在独立进程中运行:
+
+    python tests/benchmarks/standin.py --port 8780
+
+路径中带 /slow 的请求会先等待 --slow-delay 秒, 用于模拟慢响应;
+微博 id 以 403 或 418 开头时返回对应的风控状态码; NGA 首次访问返回带 guestJs 的 403
+"""
+
+import sys
+import json
+import time
+import zlib
+import struct
+import argparse
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlsplit
+
+import payloads
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp", ".gif")
+
+
+def _png(width: int, height: int) -> bytes:
+    """生成纯色 PNG"""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    raw = b"".join(b"\x00" + b"\x4c\x8b\xf5" * width for _ in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
+
+
+class Response:
+    def __init__(self, status: int = 200, body: bytes = b"", content_type: str = "text/plain", **headers: str):
+        self.status = status
+        self.body = body
+        self.headers = {"Content-Type": content_type, **headers}
+
+
+def html(text: str) -> Response:
+    return Response(body=text.encode(), content_type="text/html; charset=utf-8")
+
+
+def redirect(location: str) -> Response:
+    return Response(HTTPStatus.FOUND, Location=location)
+
+
+class StandIn:
+    def __init__(self, video_kib: int, slow_delay: float):
+        self.image = _png(320, 240)
+        self.video = bytes(range(256)) * (video_kib * 4)
+        self.slow_delay = slow_delay
+
+    def route(self, method: str, host: str, path: str, query: dict[str, list[str]], cookie: str) -> Response:
+        if "/slow" in path:
+            time.sleep(self.slow_delay)
+        if path.endswith(IMAGE_SUFFIXES) or host.startswith(("p3-sign", "sns-avatar", "tvax1", "p2")):
+            return Response(body=self.image, content_type="image/png")
+        if path.endswith(".mp4") or path.startswith("/play/"):
+            return Response(body=self.video, content_type="video/mp4")
+
+        match host:
+            case "v.douyin.com":
+                code = path.strip("/").removeprefix("slow")
+                return redirect(f"https://www.douyin.com/video/7350{zlib.crc32(code.encode()):015d}")
+            case "m.douyin.com" | "www.iesdouyin.com":
+                return html(payloads.douyin_video_page())
+            case "v.kuaishou.com":
+                return redirect(f"https://v.m.chenzhongtech.com/fw/photo/3x{path.strip('/')}")
+            case "v.m.chenzhongtech.com":
+                return html(payloads.kuaishou_photo_page())
+            case "www.xiaohongshu.com":
+                return html(payloads.xhs_explore_page())
+            case "m.weibo.cn" if path == "/statuses/show":
+                weibo_id = query.get("id", [""])[0]
+                for status in (403, 418):
+                    if weibo_id.startswith(str(status)):
+                        return Response(status, b"risk control")
+                return Response(body=payloads.weibo_status_json(), content_type="application/json; charset=utf-8")
+            case "nga.178.com":
+                if "guestJs" not in cookie:
+                    body = "<script>document.cookie='guestJs=1714521600;path=/'</script>"
+                    return Response(HTTPStatus.FORBIDDEN, body.encode(), "text/html; charset=utf-8")
+                return html(payloads.nga_thread_html())
+            case "xdown.app" if method == "POST":
+                body = json.dumps({"status": "ok", "data": payloads.twitter_xdown_html()}).encode()
+                return Response(body=body, content_type="application/json")
+        return Response(HTTPStatus.NOT_FOUND, f"no stand-in for {host}{path}".encode())
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StandInServer"
+
+    def _handle(self, method: str):
+        if length := int(self.headers.get("Content-Length") or 0):
+            self.rfile.read(length)
+        url = urlsplit(self.path)
+        host = (self.headers.get("Host") or "").split(":")[0]
+        response = self.server.standin.route(
+            method, host, url.path, parse_qs(url.query), self.headers.get("Cookie") or ""
+        )
+        self.send_response(response.status)
+        for key, value in response.headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(response.body)))
+        self.end_headers()
+        if method != "HEAD":
+            self.wfile.write(response.body)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_HEAD(self):
+        self._handle("HEAD")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def log_message(self, format: str, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int, standin: StandIn):
+        super().__init__(("127.0.0.1", port), Handler)
+        self.standin = standin
+
+
+def main():
+    parser = argparse.ArgumentParser(description="各平台的本地替身服务器")
+    parser.add_argument("--port", type=int, default=0, help="监听端口, 0 表示随机端口")
+    parser.add_argument("--video-kib", type=int, default=512, help="视频文件大小, 单位: KiB")
+    parser.add_argument("--slow-delay", type=float, default=2.0, help="慢响应的延迟, 单位: 秒")
+    args = parser.parse_args()
+
+    # 贴吧之外的页面只依赖标准库, 这里预先生成, 避免首个请求变慢
+    for build in (
+        payloads.douyin_video_page,
+        payloads.kuaishou_photo_page,
+        payloads.xhs_explore_page,
+        payloads.weibo_status_json,
+        payloads.nga_thread_html,
+        payloads.twitter_xdown_html,
+    ):
+        build()
+
+    server = StandInServer(args.port, StandIn(args.video_kib, args.slow_delay))
+    # 负载测试从标准输出读取实际端口
+    print(server.server_address[1], flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+import nonebot
+from nonebug import NONEBOT_INIT_KWARGS, NONEBOT_START_LIFESPAN
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    store_dir = Path(tempfile.mkdtemp(prefix="parser-test-"))
+    config.stash[NONEBOT_INIT_KWARGS] = {
+        "driver": "~fastapi",
+        "log_level": "DEBUG",
+        "localstore_cache_dir": str(store_dir / "cache"),
+        "localstore_config_dir": str(store_dir / "config"),
+        "localstore_data_dir": str(store_dir / "data"),
+    }
+    # 启动钩子会拉起浏览器和 ffmpeg 探测, 测试按需手动调用
+    config.stash[NONEBOT_START_LIFESPAN] = False
+
+
+@pytest.fixture(scope="session", autouse=True)
+async def after_nonebot_init(after_nonebot_init: None):
+    from nonebot.adapters.onebot.v11 import Adapter as OnebotV11Adapter
+
+    driver = nonebot.get_driver()
+    driver.register_adapter(OnebotV11Adapter)
+
+    nonebot.require("nonebot_plugin_parser")
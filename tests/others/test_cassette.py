@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "benchmarks"))
+
+
+async def test_record_redact_and_replay(tmp_path: Path):
+    """录制时脱敏并按平台归档, 回放时忽略易变参数, 同一请求按录制顺序返回"""
+    from cassette import CassetteMiss, CassetteLibrary, RecordTransport, ReplayTransport, current_platform
+
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(
+            200,
+            headers={"set-cookie": "SESSDATA=secret; path=/", "content-type": "application/json"},
+            json={"calls": calls, "access_token": "secret", "url": "https://a.com/?SESSDATA=secret"},
+        )
+
+    library = CassetteLibrary(tmp_path)
+    async with httpx.AsyncClient(transport=RecordTransport(httpx.MockTransport(handler), library)) as client:
+        token = current_platform.set("bilibili")
+        try:
+            first = await client.get("https://api.bilibili.com/x/view?bvid=BV1&wts=1&w_rid=a&access_key=secret")
+            await client.get("https://api.bilibili.com/x/view?bvid=BV1&wts=2&w_rid=b&access_key=secret")
+        finally:
+            current_platform.reset(token)
+    assert first.json()["calls"] == 1
+    library.save()
+
+    saved = (tmp_path / "bilibili.json").read_text()
+    assert "secret" not in saved
+    assert "set-cookie" not in saved
+
+    replay = ReplayTransport(CassetteLibrary(tmp_path).load())
+    async with httpx.AsyncClient(transport=replay) as client:
+        url = "https://api.bilibili.com/x/view?access_key=other&w_rid=c&wts=3&bvid=BV1"
+        assert [(await client.get(url)).json()["calls"] for _ in range(3)] == [1, 2, 2]
+        try:
+            await client.get("https://api.bilibili.com/x/view?bvid=BV2")
+        except CassetteMiss:
+            pass
+        else:
+            raise AssertionError("未录制的请求应当报错")
@@ -0,0 +1,28 @@
+import time
+import asyncio
+
+
+async def test_block_in_traced_handler_task():
+    """在开启 trace 的处理器任务中同步阻塞, 应归属于该 trace"""
+    from nonebot import logger
+
+    from nonebot_plugin_parser.metrics import METRICS
+    from nonebot_plugin_parser.loop_monitor import LoopMonitor
+
+    messages: list[str] = []
+    sink_id = logger.add(lambda msg: messages.append(str(msg)), level="WARNING")
+    monitor = LoopMonitor(threshold=0.05)
+    before = METRICS.counter("loop_blocks", platform="test")
+    await monitor.start()
+    try:
+        with METRICS.trace("test", "https://example.com/handler") as trace:
+            time.sleep(0.2)  # noqa: ASYNC251 有意阻塞事件循环, 触发阻塞检测
+            await asyncio.sleep(0.1)
+    finally:
+        await monitor.stop()
+        logger.remove(sink_id)
+
+    assert METRICS.counter("loop_blocks", platform="test") == before + 1
+    blocked = [msg for msg in messages if "事件循环已阻塞" in msg]
+    assert blocked
+    assert f"[{trace.trace_id}] https://example.com/handler" in blocked[0]
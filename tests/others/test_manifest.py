@@ -0,0 +1,67 @@
+import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+HEAVY_MODULES = ("bilibili_api", "yt_dlp", "bs4", "lxml", "google.protobuf", "qrcode")
+"""插件加载时不应导入的重依赖, 由对应解析器在第一次匹配到链接时导入"""
+
+IMPORT_BUDGET = 1.5
+"""插件加载耗时上限 (nonebot 已初始化), 单位: 秒, 目前约 0.4s"""
+
+LOAD_SCRIPT = """
+import sys
+import json
+import time
+
+import nonebot
+
+nonebot.init(
+    driver="~fastapi",
+    localstore_cache_dir=sys.argv[1] + "/cache",
+    localstore_config_dir=sys.argv[1] + "/config",
+    localstore_data_dir=sys.argv[1] + "/data",
+)
+started_at = time.perf_counter()
+nonebot.load_plugin("nonebot_plugin_parser")
+seconds = time.perf_counter() - started_at
+print(json.dumps({"seconds": seconds, "modules": sorted(sys.modules)}))
+"""
+
+
+def test_manifest_matches_handle():
+    """清单中的关键词和正则与解析器的 @handle 一致, 且每个解析器都在清单中"""
+    from nonebot_plugin_parser.parsers import BaseParser
+    from nonebot_plugin_parser.parsers.manifest import MANIFEST, load_parser_class
+
+    for entry in MANIFEST:
+        if not entry.available:
+            continue
+        cls = load_parser_class(entry)
+        assert cls.platform == entry.platform, entry.class_name
+        handled = {(keyword, pattern.pattern) for keyword, pattern in cls._key_patterns}
+        assert handled == set(entry.key_patterns), entry.class_name
+
+    class_names = {entry.class_name for entry in MANIFEST}
+    for cls in BaseParser.get_all_subclass():
+        assert cls.__name__ in class_names, f"{cls.__name__} 不在 parsers/manifest.py 中"
+
+
+def test_import_time_budget(tmp_path: Path):
+    """插件加载耗时不超过预算, 且不导入重依赖"""
+    src_dir = Path(__file__).parents[2] / "src"
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(src_dir), os.environ.get("PYTHONPATH")]))}
+    result = subprocess.run(
+        [sys.executable, "-c", LOAD_SCRIPT, str(tmp_path)],
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=60,
+        check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    loaded = [name for name in HEAVY_MODULES if name in report["modules"]]
+    assert not loaded, f"插件加载时导入了 {loaded}"
+    assert report["seconds"] < IMPORT_BUDGET, f"插件加载耗时 {report['seconds']:.3f}s"